@@ -0,0 +1,92 @@
+"""Auction analytics benchmark: folding millions of bids and reading the aggregates
+
+Generates completed lots with their bid logs, folds them in refresh-sized
+batches the way the analytics service does, then times each read with a
+cold cache (right after a fold) and a warm one. Needs no database.
+
+    cd backend && python -m benchmarks.auction_analytics --lots 100000 --bids-per-lot 20
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List, Tuple
+
+from services.auction_analytics import LOAD_BATCH_SIZE, AuctionAnalytics
+
+ROLES = ["Batsman", "Bowler", "All-rounder", "Wicket-keeper"]
+TEAMS = ["India", "Australia", "England", "Pakistan", "South Africa", "New Zealand", "Sri Lanka", "West Indies"]
+
+def lots_with_bids(lots: int, bids_per_lot: int, rooms: int) -> Tuple[List[dict], List[List[dict]]]:
+    """Completed results and each one's bid log, about bids_per_lot bids long"""
+    opened = datetime(2026, 1, 1)
+    results, bids = [], []
+    for lot in range(lots):
+        starting = random.choice([1_000_000, 2_000_000])
+        count = random.randint(0, 2 * bids_per_lot)
+        price = starting + count * 1_000_000
+        results.append({
+            "auction_id": f"auction-{lot}",
+            "room_id": f"room-{lot % rooms}",
+            "player_position": random.choice(ROLES),
+            "player_team": random.choice(TEAMS),
+            "base_price": starting,
+            "starting_bid": starting,
+            "winning_bid": price,
+            "winner_user_id": f"user-{random.randrange(1000)}" if count else None,
+            "total_bids": count,
+            "auction_duration": random.randint(10, 330),
+            "created_at": opened + timedelta(seconds=lot),
+        })
+        offsets = sorted(random.uniform(0, 330) for _ in range(count))
+        bids.append([
+            {"auction_id": f"auction-{lot}", "amount": starting + (bid + 1) * 1_000_000, "offset_seconds": offset}
+            for bid, offset in enumerate(offsets)
+        ])
+    return results, bids
+
+def timed_ms(operation: Callable[[], object]) -> float:
+    started = time.perf_counter()
+    operation()
+    return (time.perf_counter() - started) * 1e3
+
+def main(lots: int, bids_per_lot: int, rooms: int):
+    results, bid_logs = lots_with_bids(lots, bids_per_lot, rooms)
+    total_bids = sum(len(log) for log in bid_logs)
+    print(f"Generated {len(results):,} lots with {total_bids:,} bids")
+
+    analytics = AuctionAnalytics()
+    started = time.perf_counter()
+    for batch in range(0, len(results), LOAD_BATCH_SIZE):
+        batch_bids = [bid for log in bid_logs[batch:batch + LOAD_BATCH_SIZE] for bid in log]
+        analytics.fold(results[batch:batch + LOAD_BATCH_SIZE], batch_bids)
+    elapsed = time.perf_counter() - started
+    print(f"Folded in {elapsed:.2f}s ({total_bids / elapsed:,.0f} bids/s)")
+
+    reads = {
+        "inflation by role": lambda: analytics.inflation("role"),
+        "inflation by team": lambda: analytics.inflation("team"),
+        "bid velocity": lambda: analytics.bid_velocity(),
+        "bowler velocity": lambda: analytics.bid_velocity("Bowler"),
+        "top 20 rooms": lambda: analytics.room_spending(20),
+        "room trend": lambda: analytics.room_trend("room-0"),
+    }
+    for name, read in reads.items():
+        cold = timed_ms(read)
+        warm = timed_ms(read)
+        print(f"  {name:<18} cold {cold:8.3f} ms   warm {warm:6.3f} ms")
+
+    if analytics.bids_folded != total_bids:
+        raise SystemExit(f"Folded {analytics.bids_folded} bids, expected {total_bids}")
+    if sum(bucket["bids"] for bucket in analytics.bid_velocity()["buckets"]) != total_bids:
+        raise SystemExit("Velocity buckets don't account for every bid")
+    print("Every bid accounted for")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark auction analytics folding and reads")
+    parser.add_argument("--lots", type=int, default=100_000, help="Completed lots")
+    parser.add_argument("--bids-per-lot", type=int, default=20, help="Average bids per lot")
+    parser.add_argument("--rooms", type=int, default=2_000, help="Auction rooms the lots are spread over")
+    args = parser.parse_args()
+
+    main(args.lots, args.bids_per_lot, args.rooms)
@@ -0,0 +1,115 @@
+"""Contention benchmark for REST bids on a single player
+
+Hundreds of bidders bid on one player at once, through the conditional update
+the bid routes use and through the read-then-write it replaced. Each round
+checks the stored bid against the highest bid placed, and reports throughput
+and latency. Runs against MONGO_URL in a scratch database that is dropped
+afterwards.
+
+    cd backend && python -m benchmarks.bid_contention --bidders 500 --rounds 5
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from services.bids import place_player_bid
+from services.database import DatabaseService
+from services.mongo import client, close_client
+
+PLAYER_ID = "benchmark-player"
+
+async def conditional_bid(collection, amount: int, bidder: str) -> bool:
+    """The single conditional update the bid routes use"""
+    return await place_player_bid(collection, PLAYER_ID, amount, bidder) is not None
+
+async def read_then_write_bid(collection, amount: int, bidder: str) -> bool:
+    """The check-then-write the bid routes used to do"""
+    player = await DatabaseService.get_document(collection, PLAYER_ID, {"current_bid": 1})
+    if amount <= player["current_bid"]:
+        return False
+    await collection.update_one(
+        {"id": PLAYER_ID},
+        {"$set": {"current_bid": amount}, "$addToSet": {"bidders": bidder}}
+    )
+    return True
+
+STRATEGIES: Dict[str, Callable[..., Awaitable[bool]]] = {
+    "conditional": conditional_bid,
+    "read-then-write": read_then_write_bid,
+}
+
+async def run_round(collection, strategy: Callable[..., Awaitable[bool]], bidders: int) -> dict:
+    """Reset the player, fire one bid per bidder at once and check what was stored"""
+    await collection.replace_one(
+        {"id": PLAYER_ID},
+        {"id": PLAYER_ID, "name": "Benchmark Player", "current_bid": 0, "bidders": []},
+        upsert=True
+    )
+    # Distinct amounts, so the winner is unambiguous
+    amounts = random.sample(range(1, bidders * 100), bidders)
+    latencies: List[float] = []
+
+    async def bid(index: int) -> bool:
+        started = time.perf_counter()
+        accepted = await strategy(collection, amounts[index], f"bidder-{index}")
+        latencies.append(time.perf_counter() - started)
+        return accepted
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(bid(index) for index in range(bidders)))
+    elapsed = time.perf_counter() - started
+
+    player = await DatabaseService.get_document(collection, PLAYER_ID)
+    latencies.sort()
+    return {
+        "elapsed": elapsed,
+        "accepted": sum(results),
+        "expected_bid": max(amounts),
+        "stored_bid": player["current_bid"],
+        # Every accepted bid names its bidder; a bidder whose bid was overwritten by a lower one still does
+        "bidders_recorded": len(player["bidders"]),
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+
+async def main(bidders: int, rounds: int, strategies: List[str]):
+    database = client[f"{os.environ['DB_NAME']}_benchmarks"]
+    collection = database.players
+    await collection.create_index("id", unique=True)
+    failed = False
+    try:
+        for name in strategies:
+            reports = [await run_round(collection, STRATEGIES[name], bidders) for _ in range(rounds)]
+            lost = sum(report["stored_bid"] != report["expected_bid"] for report in reports)
+            bids_per_second = bidders * rounds / sum(report["elapsed"] for report in reports)
+            print(f"{name}: {bidders} concurrent bidders x {rounds} rounds")
+            print(f"  throughput      {bids_per_second:,.0f} bids/s")
+            print(f"  latency p50/p99 {statistics.median(r['p50_ms'] for r in reports):.1f} / "
+                  f"{max(r['p99_ms'] for r in reports):.1f} ms")
+            print(f"  accepted/round  {statistics.mean(r['accepted'] for r in reports):.1f}")
+            print(f"  highest bid lost in {lost}/{rounds} rounds")
+            if name == "conditional":
+                # The conditional path must never lose the highest bid
+                failed = failed or lost > 0 or any(r["accepted"] != r["bidders_recorded"] for r in reports)
+    finally:
+        await client.drop_database(database.name)
+        close_client()
+
+    if failed:
+        raise SystemExit("Conditional bids lost an update")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark concurrent REST bids on one player")
+    parser.add_argument("--bidders", type=int, default=500, help="Concurrent bidders per round")
+    parser.add_argument("--rounds", type=int, default=5, help="Rounds per strategy")
+    parser.add_argument(
+        "--strategy", choices=[*STRATEGIES, "all"], default="all", help="Bid implementation to run"
+    )
+    args = parser.parse_args()
+
+    strategies = list(STRATEGIES) if args.strategy == "all" else [args.strategy]
+    asyncio.run(main(args.bidders, args.rounds, strategies))
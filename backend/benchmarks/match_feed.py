@@ -0,0 +1,83 @@
+"""Match feed benchmark: folding many simultaneous matches into player writes
+
+Generates ball-by-ball feed lines for many matches at once, interleaved as
+they would arrive, folds them the way the ingester does and builds a flush
+every --flush-balls balls. Reports folding throughput and the player writes
+made against the one write per player per ball an unbatched ingester would
+make. Needs no database.
+
+    cd backend && python -m benchmarks.match_feed --matches 200 --balls 240
+"""
+import argparse
+import json
+import random
+import time
+from typing import List, Tuple
+
+from services.match_feed import StatFolder
+
+def match_lines(matches: int, balls: int) -> Tuple[List[str], int]:
+    """Feed lines for every match, one ball of each in turn, then each match's end
+
+    Returns the lines and the writes an unbatched ingester would make for them.
+    """
+    lines = []
+    unbatched = 0
+    # Per match: the two batters at the crease, striker first, and the next one in
+    creases = [[0, 1, 2] for _ in range(matches)]
+    for ball in range(balls):
+        batting, bowling = (0, 1) if ball < balls // 2 else (1, 0)
+        if ball == balls // 2:
+            creases = [[0, 1, 2] for _ in range(matches)]
+        for match in range(matches):
+            crease = creases[match]
+            runs = random.choice([0, 0, 1, 1, 2, 4, 6])
+            line = {
+                "match_id": f"match-{match}",
+                "batter_id": f"player-{match}-{batting}-{crease[0]}",
+                "bowler_id": f"player-{match}-{bowling}-{ball // 6 % 5}",
+                "runs": runs,
+            }
+            unbatched += 2
+            if random.random() < 0.05 and crease[2] < 11:
+                fielder = random.randrange(11)
+                line["wicket"] = {"kind": "caught", "fielder_id": f"player-{match}-{bowling}-{fielder}"}
+                unbatched += 1
+                crease[0], crease[2] = crease[2], crease[2] + 1
+            elif runs % 2:
+                crease[0], crease[1] = crease[1], crease[0]
+            if ball % 6 == 5:
+                crease[0], crease[1] = crease[1], crease[0]
+            lines.append(json.dumps(line))
+    lines.extend(json.dumps({"match_id": f"match-{match}", "type": "match_end"}) for match in range(matches))
+    return lines, unbatched
+
+def main(matches: int, balls: int, flush_balls: int):
+    lines, unbatched = match_lines(matches, balls)
+    folder = StatFolder()
+    writes = flushes = 0
+    started = time.perf_counter()
+    for index, line in enumerate(lines, 1):
+        folder.fold_line(line)
+        if index % flush_balls == 0:
+            operations, _ = folder.take()
+            writes += len(operations)
+            flushes += 1
+    operations, _ = folder.take()
+    writes += len(operations)
+    flushes += 1
+    elapsed = time.perf_counter() - started
+
+    print(f"{matches} matches x {balls} balls: {len(lines):,} lines in {elapsed:.2f}s "
+          f"({len(lines) / elapsed:,.0f} lines/s)")
+    print(f"  {flushes} flushes, {writes:,} player writes against {unbatched:,} unbatched "
+          f"({unbatched / writes:.1f}x fewer)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark match feed folding")
+    parser.add_argument("--matches", type=int, default=200, help="Simultaneous matches")
+    parser.add_argument("--balls", type=int, default=240, help="Balls per match")
+    parser.add_argument("--flush-balls", type=int, default=2_000, help="Balls folded between flushes")
+    args = parser.parse_args()
+
+    main(args.matches, args.balls, args.flush_balls)
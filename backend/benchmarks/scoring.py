@@ -0,0 +1,98 @@
+"""Live scoring benchmark: one ball at a time across thousands of leagues
+
+Builds leagues of teams whose rosters are drawn from the 22 players of one
+match, feeds the engine ball-by-ball events and reports the per-ball update
+latency, then checks every team's points against a full recomputation from
+the rosters. Needs no database.
+
+    cd backend && python -m benchmarks.scoring --leagues 5000 --teams 10 --balls 240
+"""
+import argparse
+import random
+import statistics
+import time
+
+import numpy as np
+
+from services.scoring import POINT_WEIGHTS, ROLE_MULTIPLIERS, ScoringEngine
+
+MATCH_PLAYERS = [f"player-{index}" for index in range(22)]
+
+def random_roster(size: int) -> list:
+    """A roster drawn from the match's players, with a captain and vice captain"""
+    roles = ["Captain", "Vice Captain"] + ["Player"] * (size - 2)
+    return [
+        {"player_id": player_id, "purchase_price": 1_000_000, "role": role}
+        for player_id, role in zip(random.sample(MATCH_PLAYERS, size), roles)
+    ]
+
+def random_ball() -> dict:
+    """One ball's worth of performance for one player"""
+    event = {"player_id": random.choice(MATCH_PLAYERS)}
+    outcome = random.random()
+    if outcome < 0.05:
+        event["wickets"] = 1
+    elif outcome < 0.08:
+        event["catches"] = 1
+    elif outcome < 0.13:
+        event.update(runs=6, sixes=1)
+    elif outcome < 0.25:
+        event.update(runs=4, fours=1)
+    else:
+        event["runs"] = random.choice([0, 0, 1, 1, 2])
+    return event
+
+def recomputed_points(engine: ScoringEngine, rosters: dict) -> np.ndarray:
+    """Every team's points summed from scratch from its roster and its players' stats"""
+    player_points = engine.player_stats[:len(engine.player_ids)] @ POINT_WEIGHTS
+    points = np.zeros(len(engine.team_ids))
+    for team_id, roster in rosters.items():
+        points[engine.team_rows[team_id]] = sum(
+            player_points[engine.player_rows[player["player_id"]]] * ROLE_MULTIPLIERS.get(player["role"], 1.0)
+            for player in roster
+        )
+    return points
+
+def main(leagues: int, teams_per_league: int, roster_size: int, balls: int):
+    engine = ScoringEngine()
+    rosters = {}
+    started = time.perf_counter()
+    for league in range(leagues):
+        for team in range(teams_per_league):
+            team_id = f"team-{league}-{team}"
+            rosters[team_id] = random_roster(roster_size)
+            engine.set_roster(team_id, rosters[team_id])
+    print(f"Loaded {len(rosters):,} teams in {leagues:,} leagues in {time.perf_counter() - started:.2f}s")
+
+    latencies = []
+    for _ in range(balls):
+        event = random_ball()
+        started = time.perf_counter()
+        engine.apply([event])
+        latencies.append(time.perf_counter() - started)
+
+    batch = [random_ball() for _ in range(balls)]
+    started = time.perf_counter()
+    engine.apply(batch)
+    batch_elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(f"Single ball  p50 {statistics.median(latencies) * 1000:.2f} ms  "
+          f"p99 {latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000:.2f} ms")
+    print(f"Batch of {balls} balls {batch_elapsed * 1000:.2f} ms")
+
+    expected = recomputed_points(engine, rosters)
+    drift = float(np.abs(engine.team_points[:len(engine.team_ids)] - expected).max())
+    print(f"Largest drift from a full recomputation: {drift}")
+    if drift > 1e-6:
+        raise SystemExit("Incremental team points drifted from the rosters")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark live fantasy scoring")
+    parser.add_argument("--leagues", type=int, default=5000, help="Leagues to score")
+    parser.add_argument("--teams", type=int, default=10, help="Teams per league")
+    parser.add_argument("--roster-size", type=int, default=11, help="Players per team, from the 22 in the match")
+    parser.add_argument("--balls", type=int, default=240, help="Balls to score, one event each")
+    args = parser.parse_args()
+
+    main(args.leagues, args.teams, args.roster_size, args.balls)
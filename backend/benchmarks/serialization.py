@@ -0,0 +1,123 @@
+"""Serialization benchmark for read endpoints
+
+Encodes a list of player documents the way read endpoints used to (building
+Player models and letting FastAPI validate them against response_model, or
+running raw dicts through jsonable_encoder) and the way they do now, straight
+to JSON bytes through a cached adapter. Needs no database.
+
+    cd backend && python -m benchmarks.serialization --items 10000 --repeat 5
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from models.player import Player
+from services.serialization import encode_trusted
+
+ROLES = ["Batsman", "Bowler", "All-rounder", "Wicket-Keeper"]
+
+def player_documents(items: int) -> List[dict]:
+    """Player documents shaped as they come back from the database"""
+    started = datetime(2024, 1, 1)
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "name": f"Player {index}",
+            "team": f"Team {index % 10}",
+            "role": random.choice(ROLES),
+            "base_price": random.randint(20, 200) * 10000,
+            "current_bid": random.randint(0, 2000) * 10000,
+            "image_url": f"https://example.com/players/{index}.jpg",
+            "stats": {
+                "matches": random.randint(0, 300),
+                "runs": random.randint(0, 12000),
+                "wickets": random.randint(0, 400),
+                "average": round(random.uniform(0, 60), 2),
+                "strike_rate": round(random.uniform(50, 180), 2),
+                "economy": round(random.uniform(4, 11), 2),
+                "centuries": random.randint(0, 40),
+                "fifties": random.randint(0, 80),
+                "best_figures": "4/20",
+                "balls_faced": random.randint(0, 9000),
+                "dismissals": random.randint(0, 250),
+                "fours": random.randint(0, 900),
+                "sixes": random.randint(0, 300),
+                "balls_bowled": random.randint(0, 6000),
+                "runs_conceded": random.randint(0, 8000),
+                "catches": random.randint(0, 150),
+                "stumpings": 0,
+                "run_outs": random.randint(0, 30),
+            },
+            "is_hot_pick": index % 7 == 0,
+            "bidders": [f"Team {bidder}" for bidder in range(index % 4)],
+            "auction_id": None,
+            "created_at": started + timedelta(minutes=index),
+            "updated_at": started + timedelta(minutes=index, seconds=30),
+        }
+        for index in range(items)
+    ]
+
+async def model_path(documents: List[dict]) -> bytes:
+    """Build Player models, then validate them against List[Player] as a response_model"""
+    field = create_response_field(name="Response", type_=List[Player])
+    content = await serialize_response(field=field, response_content=[Player(**document) for document in documents])
+    return json.dumps(content).encode()
+
+async def dict_path(documents: List[dict]) -> bytes:
+    """Validate raw documents against List[dict] as the list endpoints did"""
+    field = create_response_field(name="Response", type_=List[Dict[str, Any]])
+    content = await serialize_response(field=field, response_content=documents)
+    return json.dumps(content).encode()
+
+async def encoder_path(documents: List[dict]) -> bytes:
+    """Raw documents through jsonable_encoder alone, as the read cache did"""
+    return json.dumps(jsonable_encoder(documents), separators=(",", ":")).encode()
+
+async def trusted_path(documents: List[dict]) -> bytes:
+    """The trusted-read path read endpoints use now"""
+    return encode_trusted(documents)
+
+PATHS: Dict[str, Callable[[List[dict]], Any]] = {
+    "model": model_path,
+    "dict": dict_path,
+    "encoder": encoder_path,
+    "trusted": trusted_path,
+}
+
+def run(items: int, repeat: int) -> Dict[str, float]:
+    """Best per-item cost of each path in microseconds"""
+    documents = player_documents(items)
+    expected = json.loads(encode_trusted(documents))
+    results: Dict[str, float] = {}
+    for name, path in PATHS.items():
+        # Every path must produce the same JSON
+        if json.loads(asyncio.run(path(documents))) != expected:
+            raise SystemExit(f"{name} path produced different JSON")
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            asyncio.run(path(documents))
+            timings.append(time.perf_counter() - started)
+        results[name] = min(timings) / items * 1e6
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark serializing read responses")
+    parser.add_argument("--items", type=int, default=10000, help="Documents per response")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per path; the best is reported")
+    args = parser.parse_args()
+
+    results = run(args.items, args.repeat)
+    baseline = results["model"]
+    print(f"{args.items:,} documents, best of {args.repeat}")
+    for name, per_item in results.items():
+        print(f"  {name:<8} {per_item:8.2f} us/item  {baseline / per_item:5.1f}x")
@@ -0,0 +1,52 @@
+"""Leaderboard benchmark: updates, rank lookups and windows on a large board
+
+Fills a board with members, then times single point updates, rank lookups,
+top-K and "around me" reads against it, checking ranks against a full sort
+at the end. Needs no database.
+
+    cd backend && python -m benchmarks.standings --members 200000 --operations 20000
+"""
+import argparse
+import random
+import time
+from typing import Callable
+
+from services.leaderboard import Leaderboard
+
+def per_operation_us(operations: int, operation: Callable[[], object]) -> float:
+    started = time.perf_counter()
+    for _ in range(operations):
+        operation()
+    return (time.perf_counter() - started) / operations * 1e6
+
+def main(members: int, operations: int):
+    board = Leaderboard()
+    member_ids = [f"user-{index}" for index in range(members)]
+    started = time.perf_counter()
+    board.update({member: float(random.randint(0, 5000)) for member in member_ids})
+    print(f"Built a board of {members:,} members in {time.perf_counter() - started:.2f}s")
+
+    results = {
+        "update": per_operation_us(
+            operations, lambda: board.set(random.choice(member_ids), float(random.randint(0, 5000)))
+        ),
+        "rank": per_operation_us(operations, lambda: board.rank(random.choice(member_ids))),
+        "top 10": per_operation_us(operations, lambda: board.top(10)),
+        "around 5": per_operation_us(operations, lambda: board.around(random.choice(member_ids), 5)),
+    }
+    for name, cost in results.items():
+        print(f"  {name:<9} {cost:7.2f} us/op")
+
+    expected = sorted(member_ids, key=lambda member: (-board.points[member], member))
+    for member in random.sample(member_ids, 1000):
+        if board.rank(member) != expected.index(member) + 1:
+            raise SystemExit(f"Rank of {member} disagrees with a full sort")
+    print("Ranks agree with a full sort")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark leaderboard operations")
+    parser.add_argument("--members", type=int, default=200_000, help="Members on the board")
+    parser.add_argument("--operations", type=int, default=20_000, help="Timed operations of each kind")
+    args = parser.parse_args()
+
+    main(args.members, args.operations)
@@ -40,6 +40,7 @@ class PlayerAuction(BaseModel):
     player_position: str
     player_image: str
     player_stats: Dict[str, Any] = {}
+    base_price: Optional[int] = None
     
     # Bidding details
     starting_bid: int = 1_000_000  # £1M minimum
@@ -51,6 +52,7 @@ class PlayerAuction(BaseModel):
     current_winner: Optional[str] = None
     current_winner_username: Optional[str] = None
     total_bids: int = 0
+    version: int = 0  # bumped by the state store on every change
     
     # Timing
     auction_duration: int = 300  # 5 minutes total
@@ -79,12 +81,18 @@ class BidAttempt(BaseModel):
 
 class AuctionResult(BaseModel):
     auction_id: str
+    room_id: Optional[str] = None
     player_id: str
     player_name: str
+    player_team: Optional[str] = None
+    player_position: Optional[str] = None
+    base_price: Optional[int] = None  # None on results saved before it was recorded
+    starting_bid: int = 1_000_000
     winning_bid: int
     winner_user_id: Optional[str] = None
     winner_username: Optional[str] = None
     total_bids: int
     participants_count: int
     auction_duration: int  # actual duration in seconds
+    started_at: Optional[datetime] = None
     created_at: datetime = Field(default_factory=datetime.now)
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Optional
 from datetime import datetime
 from enum import Enum
 import uuid
@@ -21,7 +21,7 @@ class League(BaseModel):
     status: LeagueStatus
     creator_id: str
     creator_name: str
-    participants: List[str] = []  # team_ids
+    member_count: int = 0  # teams are listed in league_memberships
     max_participants: Optional[int] = None
     prize_pool: str
     entry_fee: str
@@ -42,5 +42,4 @@ class LeagueCreate(BaseModel):
 
 class LeagueUpdate(BaseModel):
     status: Optional[LeagueStatus] = None
-    participants: Optional[List[str]] = None
     updated_at: datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
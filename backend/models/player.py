@@ -13,6 +13,16 @@ class PlayerStats(BaseModel):
     centuries: int = 0
     fifties: int = 0
     best_figures: Optional[str] = None
+    # Running totals kept by match feeds, which average, strike rate and economy are derived from
+    balls_faced: int = 0
+    dismissals: int = 0
+    fours: int = 0
+    sixes: int = 0
+    balls_bowled: int = 0
+    runs_conceded: int = 0
+    catches: int = 0
+    stumpings: int = 0
+    run_outs: int = 0
 
 class Player(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -0,0 +1,19 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+import uuid
+
+class PerformanceEventCreate(BaseModel):
+    player_id: str
+    match_id: Optional[str] = None
+    runs: int = 0
+    fours: int = 0
+    sixes: int = 0
+    wickets: int = 0
+    catches: int = 0
+    stumpings: int = 0
+    run_outs: int = 0
+
+class PerformanceEvent(PerformanceEventCreate):
+    id: str = Field(default_factory=lambda: f"event_{uuid.uuid4().hex[:12]}")
+    created_at: datetime = Field(default_factory=datetime.utcnow)
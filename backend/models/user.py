@@ -23,6 +23,22 @@ class User(BaseModel):
     is_active: bool = True
     last_login: Optional[datetime] = None
 
+class UserCreate(BaseModel):
+    email: str
+    username: str
+    first_name: str
+    last_name: str
+    profile_image: Optional[str] = None
+
+class UserUpdate(BaseModel):
+    email: Optional[str] = None
+    username: Optional[str] = None
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    profile_image: Optional[str] = None
+    is_active: Optional[bool] = None
+    updated_at: datetime = Field(default_factory=datetime.now)
+
 class UserSession(BaseModel):
     user_id: str
     session_id: str
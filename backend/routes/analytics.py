@@ -0,0 +1,37 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+from enum import Enum
+
+from services.auction_analytics import auction_analytics
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+class InflationGrouping(str, Enum):
+    ROLE = "role"
+    TEAM = "team"
+
+@router.get("/inflation")
+async def get_price_inflation(by: InflationGrouping = InflationGrouping.ROLE):
+    """Sold prices against starting bids for each player role or team"""
+    return auction_analytics.inflation(by.value)
+
+@router.get("/bid-velocity")
+async def get_bid_velocity(role: Optional[str] = None):
+    """How bids arrive over a lot's clock, across every lot or one player role"""
+    velocity = auction_analytics.bid_velocity(role)
+    if velocity is None:
+        raise HTTPException(status_code=404, detail="No completed lots for this role")
+    return velocity
+
+@router.get("/rooms")
+async def get_room_spending(limit: int = Query(20, ge=1, le=100)):
+    """Auction rooms by total spend"""
+    return auction_analytics.room_spending(limit)
+
+@router.get("/rooms/{room_id}")
+async def get_room_trend(room_id: str):
+    """A room's spending lot by lot, with its rolling average price"""
+    trend = auction_analytics.room_trend(room_id)
+    if trend is None:
+        raise HTTPException(status_code=404, detail="No completed lots in this room")
+    return trend
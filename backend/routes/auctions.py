@@ -1,5 +1,6 @@
-from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, Depends, Query
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, Depends, Query, Request, Response
 from fastapi.responses import JSONResponse
+from starlette.websockets import WebSocketState
 from typing import List, Optional
 import json
 from datetime import datetime
@@ -8,9 +9,17 @@ import uuid
 from models.auction import AuctionRoom, PlayerAuction, AuctionEvent, BidAttempt, AuctionResult
 from models.user import User, Bid
 from services.websocket_manager import manager
+from services.single_flight import SingleFlight
+from services.conditional import (
+    STATIC_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL, make_etag, etag_matches, not_modified, set_validators
+)
+from routes.auth import verify_jwt_token
 
 router = APIRouter(prefix="/auctions", tags=["auctions"])
 
+# Identical concurrent room reads share one store lookup
+room_reads = SingleFlight("auction_rooms", timeout=2.0)
+
 # Sample cricket players for auctions
 CRICKET_PLAYERS = [
     {
@@ -95,15 +104,16 @@ CRICKET_PLAYERS = [
     }
 ]
 
-# In-memory storage for demo (in production, use database)
-auction_rooms: dict = {}
+# The player catalog only changes with a deploy
+CRICKET_PLAYERS_ETAG = make_etag(CRICKET_PLAYERS)
 
 @router.get("/")
 async def get_auctions():
     """Get list of available auction rooms"""
+    rooms = await manager.store.list_rooms()
     return {
-        "auctions": list(auction_rooms.values()),
-        "total": len(auction_rooms),
+        "auctions": rooms,
+        "total": len(rooms),
         "timestamp": datetime.now().isoformat()
     }
 
@@ -123,7 +133,7 @@ async def create_auction_room(
         auction_queue=[player["id"] for player in CRICKET_PLAYERS]  # Add all players to queue
     )
     
-    auction_rooms[room.id] = room
+    await manager.store.save_room(room)
     
     return {
         "success": True,
@@ -134,26 +144,32 @@ async def create_auction_room(
 @router.get("/rooms/{room_id}")
 async def get_auction_room(room_id: str):
     """Get auction room details"""
-    if room_id not in auction_rooms:
-        raise HTTPException(status_code=404, detail="Auction room not found")
-    
-    room = auction_rooms[room_id]
-    
-    # Get current auction if active
-    current_auction = None
-    if room_id in manager.active_auctions:
-        current_auction = manager.active_auctions[room_id].dict()
+    async def build() -> dict:
+        room = await manager.store.get_room(room_id)
+        if room is None:
+            raise HTTPException(status_code=404, detail="Auction room not found")
+        
+        # Get current auction if active
+        current_auction = None
+        if room_id in manager.active_auctions:
+            current_auction = manager.active_auctions[room_id].dict()
+        
+        return {
+            "room": room.dict(),
+            "current_auction": current_auction,
+            "participants_online": len(manager.room_participants.get(room_id, [])),
+            "timestamp": datetime.now().isoformat()
+        }
     
-    return {
-        "room": room.dict(),
-        "current_auction": current_auction,
-        "participants_online": len(manager.room_participants.get(room_id, [])),
-        "timestamp": datetime.now().isoformat()
-    }
+    # A lot closing sends every client here at once: they share one read
+    return await room_reads.do(("room", room_id), build)
 
 @router.get("/players")
-async def get_available_players():
+async def get_available_players(request: Request, response: Response):
     """Get list of cricket players available for auction"""
+    if etag_matches(request, CRICKET_PLAYERS_ETAG):
+        return not_modified(CRICKET_PLAYERS_ETAG, STATIC_CACHE_CONTROL)
+    set_validators(response, CRICKET_PLAYERS_ETAG, STATIC_CACHE_CONTROL)
     return {
         "players": CRICKET_PLAYERS,
         "total": len(CRICKET_PLAYERS),
@@ -175,11 +191,10 @@ async def get_player_details(player_id: str):
 @router.post("/rooms/{room_id}/start-auction")
 async def start_next_auction(room_id: str, player_id: Optional[str] = None):
     """Start auction for next player in queue or specific player"""
-    if room_id not in auction_rooms:
+    room = await manager.store.get_room(room_id)
+    if room is None:
         raise HTTPException(status_code=404, detail="Auction room not found")
     
-    room = auction_rooms[room_id]
-    
     # Check if there's already an active auction
     if room_id in manager.active_auctions:
         return {
@@ -208,35 +223,39 @@ async def start_next_auction(room_id: str, player_id: Optional[str] = None):
         if not player_data:
             # Remove invalid player from queue and try next
             room.auction_queue.pop(0)
+            await manager.store.save_room(room)
             return await start_next_auction(room_id)
     
-    # Start the auction
-    await manager.start_auction(room_id, player_data)
-    
-    # Update room state
-    room.status = "active"
-    room.current_auction = f"auction_{room_id}_{player_data['id']}"
-    if player_data["id"] in room.auction_queue:
-        room.auction_queue.remove(player_data["id"])
+    # Start the auction on the worker that owns the room, which also takes it off the queue
+    auction = await manager.start_auction(room_id, player_data)
     
     return {
         "success": True,
         "message": f"Auction started for {player_data['name']}",
-        "auction": manager.active_auctions[room_id].dict()
+        "auction": auction.dict() if auction else None
     }
 
 @router.get("/rooms/{room_id}/status")
-async def get_room_status(room_id: str):
+async def get_room_status(request: Request, response: Response, room_id: str):
     """Get current status of auction room"""
-    if room_id not in auction_rooms:
+    # Concurrent polls share one store read; each still gets its own 304 check
+    room = await room_reads.do(("status", room_id), lambda: manager.store.get_room(room_id))
+    if room is None:
         raise HTTPException(status_code=404, detail="Auction room not found")
-    
-    room = auction_rooms[room_id]
     participants_online = len(manager.room_participants.get(room_id, []))
+    auction = manager.active_auctions.get(room_id)
+    
+    # Every bid and tick bumps the auction version, so it versions the whole status
+    etag = make_etag(
+        room_id, room.name, room.status, room.max_participants, len(room.auction_queue),
+        len(room.completed_auctions), participants_online,
+        (auction.id, auction.version) if auction else None
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag, REVALIDATE_CACHE_CONTROL)
     
     current_auction = None
-    if room_id in manager.active_auctions:
-        auction = manager.active_auctions[room_id]
+    if auction:
         current_auction = {
             "id": auction.id,
             "player_name": auction.player_name,
@@ -247,6 +266,7 @@ async def get_room_status(room_id: str):
             "participants_count": len(auction.participants)
         }
     
+    set_validators(response, etag, REVALIDATE_CACHE_CONTROL)
     return {
         "room_id": room_id,
         "room_name": room.name,
@@ -259,12 +279,71 @@ async def get_room_status(room_id: str):
         "timestamp": datetime.now().isoformat()
     }
 
+async def handle_room_message(user_id: str, username: str, room_id: str, message: dict):
+    """Dispatch a room-scoped client message"""
+    message_type = message.get("type")
+    
+    if message_type == "place_bid":
+        bid_amount = message.get("amount", 0)
+        # Client bid IDs make retries after a network blip idempotent
+        bid_id = message.get("bid_id")
+        await manager.place_bid(user_id, username, room_id, bid_amount, bid_id)
+    
+    elif message_type == "get_status":
+        # Send current room status
+        await manager.send_room_state(user_id, room_id)
+    
+    elif message_type == "ping":
+        # Keep-alive ping
+        await manager.send_personal_message({
+            "type": "pong",
+            "timestamp": datetime.now().isoformat()
+        }, user_id)
+
+async def receive_messages(websocket: WebSocket, user_id: str, handler):
+    """Read JSON messages from a socket until it disconnects or is closed by the server"""
+    while True:
+        # Closed under us, e.g. superseded by the user's new connection (4009)
+        if (websocket.client_state != WebSocketState.CONNECTED
+                or websocket.application_state != WebSocketState.CONNECTED):
+            return
+        try:
+            # Receive message from client
+            data = await websocket.receive_text()
+        except RuntimeError:
+            return
+        
+        try:
+            message = json.loads(data)
+            await handler(message)
+        
+        except json.JSONDecodeError:
+            await manager.send_personal_message({
+                "type": "error",
+                "message": "Invalid JSON message format",
+                "timestamp": datetime.now().isoformat()
+            }, user_id)
+        
+        except Exception as e:
+            await manager.send_personal_message({
+                "type": "error",
+                "message": f"Error processing message: {str(e)}",
+                "timestamp": datetime.now().isoformat()
+            }, user_id)
+
 @router.websocket("/ws/{room_id}")
-async def websocket_endpoint(websocket: WebSocket, room_id: str, user_id: str = Query(...), username: str = Query(...)):
+async def websocket_endpoint(
+    websocket: WebSocket,
+    room_id: str,
+    user_id: str = Query(...),
+    username: str = Query(...),
+    last_seq: Optional[int] = Query(None),
+    epoch: Optional[str] = Query(None)
+):
     """WebSocket endpoint for real-time auction participation"""
     
     # Validate room exists
-    if room_id not in auction_rooms:
+    if await manager.store.get_room(room_id) is None:
         await websocket.close(code=4004, reason="Auction room not found")
         return
     
@@ -272,69 +351,118 @@ async def websocket_endpoint(websocket: WebSocket, room_id: str, user_id: str =
     await manager.connect(websocket, user_id, username)
     
     try:
-        # Join auction room
-        await manager.join_room(user_id, username, room_id)
+        if last_seq is not None:
+            # Reconnecting client: replay missed events instead of a fresh join
+            await manager.resume_room(user_id, room_id, last_seq, epoch)
+        else:
+            # Join auction room
+            await manager.join_room(user_id, username, room_id)
         
         # Listen for messages
-        while True:
-            try:
-                # Receive message from client
-                data = await websocket.receive_text()
-                message = json.loads(data)
-                
-                message_type = message.get("type")
-                
-                if message_type == "place_bid":
-                    bid_amount = message.get("amount", 0)
-                    success = await manager.place_bid(user_id, username, room_id, bid_amount)
-                    
-                    if success:
-                        # Send confirmation to bidder
-                        await manager.send_personal_message({
-                            "type": "bid_confirmed",
-                            "message": f"Bid of £{bid_amount:,} placed successfully",
-                            "new_budget": manager.user_budgets.get(user_id, 0),
-                            "timestamp": datetime.now().isoformat()
-                        }, user_id)
-                
-                elif message_type == "get_status":
-                    # Send current room status
-                    await manager.send_room_state(user_id, room_id)
-                
-                elif message_type == "ping":
-                    # Keep-alive ping
-                    await manager.send_personal_message({
-                        "type": "pong",
-                        "timestamp": datetime.now().isoformat()
-                    }, user_id)
-                
-            except json.JSONDecodeError:
-                await manager.send_personal_message({
-                    "type": "error",
-                    "message": "Invalid JSON message format",
-                    "timestamp": datetime.now().isoformat()
-                }, user_id)
-            
-            except Exception as e:
-                await manager.send_personal_message({
-                    "type": "error",
-                    "message": f"Error processing message: {str(e)}",
-                    "timestamp": datetime.now().isoformat()
-                }, user_id)
+        async def handle(message: dict):
+            await handle_room_message(user_id, username, room_id, message)
+        
+        await receive_messages(websocket, user_id, handle)
     
     except WebSocketDisconnect:
-        # Handle user disconnection
-        await manager.leave_room(user_id, room_id)
-        await manager.disconnect(user_id)
+        pass
     
     except Exception as e:
         print(f"WebSocket error for user {user_id}: {e}")
-        await manager.disconnect(user_id)
+    
+    finally:
+        # A no-op for a superseded socket, so it can't unregister its replacement
+        await manager.disconnect(user_id, websocket)
+
+@router.websocket("/ws")
+async def multiplexed_websocket_endpoint(
+    websocket: WebSocket,
+    token: str = Query(...),
+    username: Optional[str] = Query(None)
+):
+    """Single authenticated WebSocket that can subscribe to many auction rooms"""
+    payload = verify_jwt_token(token[7:] if token.startswith("Bearer ") else token)
+    if not payload:
+        await websocket.close(code=4001, reason="Invalid or expired token")
+        return
+    
+    user_id = payload["user_id"]
+    username = username or payload.get("email") or user_id
+    
+    # Connect user to WebSocket
+    await manager.connect(websocket, user_id, username)
+    
+    async def handle(message: dict):
+        message_type = message.get("type")
+        room_id = message.get("room_id")
+        
+        if message_type == "ping":
+            await handle_room_message(user_id, username, room_id, message)
+            return
+        
+        if not room_id or await manager.store.get_room(room_id) is None:
+            await manager.send_personal_message({
+                "type": "error",
+                "channel": room_id,
+                "message": "Auction room not found",
+                "timestamp": datetime.now().isoformat()
+            }, user_id)
+            return
+        
+        subscribed = room_id in manager.user_rooms.get(user_id, ())
+        
+        if message_type == "subscribe":
+            await manager.send_personal_message({
+                "type": "subscribed",
+                "channel": room_id,
+                "timestamp": datetime.now().isoformat()
+            }, user_id)
+            last_seq = message.get("last_seq")
+            if last_seq is not None:
+                await manager.resume_room(user_id, room_id, int(last_seq), message.get("epoch"))
+            elif subscribed:
+                # Subscription survived a reconnect, just resync the client
+                await manager.send_room_state(user_id, room_id)
+            else:
+                await manager.join_room(user_id, username, room_id)
+        
+        elif message_type == "unsubscribe":
+            if subscribed:
+                await manager.leave_room(user_id, room_id)
+            await manager.send_personal_message({
+                "type": "unsubscribed",
+                "channel": room_id,
+                "timestamp": datetime.now().isoformat()
+            }, user_id)
+        
+        elif not subscribed:
+            await manager.send_personal_message({
+                "type": "error",
+                "channel": room_id,
+                "message": "Not subscribed to this room",
+                "timestamp": datetime.now().isoformat()
+            }, user_id)
+        
+        else:
+            await handle_room_message(user_id, username, room_id, message)
+    
+    try:
+        await receive_messages(websocket, user_id, handle)
+    
+    except WebSocketDisconnect:
+        pass
+    
+    except Exception as e:
+        print(f"WebSocket error for user {user_id}: {e}")
+    
+    finally:
+        # A no-op for a superseded socket, so it can't unregister its replacement
+        await manager.disconnect(user_id, websocket)
 
 @router.get("/rooms/{room_id}/history")
 async def get_auction_history(room_id: str):
     """Get auction history for a room"""
-    if room_id not in auction_rooms:
+    if await manager.store.get_room(room_id) is None:
         raise HTTPException(status_code=404, detail="Auction room not found")
     
     # In a real app, this would query the database
@@ -358,7 +486,7 @@ async def create_test_room():
         auction_queue=[player["id"] for player in CRICKET_PLAYERS[:3]]  # First 3 players
     )
     
-    auction_rooms[room.id] = room
+    await manager.store.save_room(room)
     
     return {
         "success": True,
@@ -6,8 +6,9 @@ import uuid
 import jwt
 from typing import Optional
 import os
-from motor.motor_asyncio import AsyncIOMotorDatabase, AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorDatabase
 
+from services import mongo
 from models.user_auth import (
     UserCreate, UserLogin, PhoneCreate, PhoneLogin, 
     PhoneVerification, SocialLogin, GuestLogin, 
@@ -26,11 +27,8 @@ verification_codes = {}
 
 # Database dependency
 async def get_database() -> AsyncIOMotorDatabase:
-    """Get database instance"""
-    mongo_url = os.environ['MONGO_URL']
-    client = AsyncIOMotorClient(mongo_url)
-    db = client[os.environ['DB_NAME']]
-    return db
+    """Get the shared database instance"""
+    return mongo.get_database()
 
 def hash_password(password: str) -> str:
     """Hash password using SHA-256"""
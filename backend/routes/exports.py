@@ -0,0 +1,174 @@
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Dict, List, Optional
+from enum import Enum
+import csv
+import io
+import json
+
+from services.database import (
+    players_collection, teams_collection, leagues_collection, auction_results_collection,
+    league_memberships_collection, PLAYER_SUMMARY_PROJECTION
+)
+from services.memberships import league_team_ids
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+# Documents fetched per round trip, and rows written per chunk
+EXPORT_BATCH_SIZE = 500
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+PLAYER_COLUMNS = [
+    "id", "name", "team", "role", "base_price", "current_bid", "is_hot_pick", "bidders",
+    "stats.matches", "stats.runs", "stats.wickets", "stats.average", "stats.strike_rate",
+    "stats.economy", "stats.centuries", "stats.fifties", "stats.best_figures", "auction_id"
+]
+TEAM_COLUMNS = [
+    "id", "name", "owner_id", "owner_name", "budget", "spent", "remaining", "max_players",
+    "league_id", "players"
+]
+AUCTION_RESULT_COLUMNS = [
+    "auction_id", "room_id", "player_id", "player_name", "player_team", "player_position",
+    "starting_bid", "winning_bid", "winner_user_id", "winner_username", "total_bids",
+    "participants_count", "auction_duration", "started_at", "created_at"
+]
+LEAGUE_ROSTER_COLUMNS = [
+    "league_id", "league_name", "team_id", "team_name", "owner_name", "player_id",
+    "player_name", "player_role", "purchase_price"
+]
+
+def flatten(document: dict, prefix: str = "") -> dict:
+    """Flatten nested documents into dotted keys; lists become JSON"""
+    row = {}
+    for key, value in document.items():
+        if isinstance(value, dict):
+            row.update(flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, list):
+            row[f"{prefix}{key}"] = json.dumps(value, default=str)
+        else:
+            row[f"{prefix}{key}"] = value
+    return row
+
+def encode_rows(rows: List[dict], export_format: ExportFormat, columns: List[str]) -> bytes:
+    """Encode a batch of rows as one chunk of the export"""
+    if export_format == ExportFormat.NDJSON:
+        return "".join(json.dumps(row, default=str) + "\n" for row in rows).encode()
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        flat = flatten(row)
+        writer.writerow(["" if flat.get(column) is None else flat[column] for column in columns])
+    return buffer.getvalue().encode()
+
+async def document_batches(cursor) -> AsyncIterator[List[dict]]:
+    """Group a cursor's documents into batches without holding the whole result"""
+    batch = []
+    async for document in cursor.batch_size(EXPORT_BATCH_SIZE):
+        batch.append(document)
+        if len(batch) >= EXPORT_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+async def encode_export(
+    batches: AsyncIterator[List[dict]],
+    export_format: ExportFormat,
+    columns: List[str]
+) -> AsyncIterator[bytes]:
+    """Encode row batches into export chunks"""
+    if export_format == ExportFormat.CSV:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(columns)
+        yield buffer.getvalue().encode()
+    async for rows in batches:
+        yield encode_rows(rows, export_format, columns)
+
+def export_response(
+    name: str,
+    batches: AsyncIterator[List[dict]],
+    export_format: ExportFormat,
+    columns: List[str]
+) -> StreamingResponse:
+    """Stream an export as a file download"""
+    media_type = "text/csv" if export_format == ExportFormat.CSV else "application/x-ndjson"
+    return StreamingResponse(
+        encode_export(batches, export_format, columns),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{name}.{export_format.value}"'}
+    )
+
+@router.get("/players")
+async def export_players(format: ExportFormat = ExportFormat.NDJSON, include_images: bool = False):
+    """Export all players"""
+    projection = {"_id": 0} if include_images else {**PLAYER_SUMMARY_PROJECTION, "_id": 0}
+    cursor = players_collection.find({}, projection).sort("id", 1)
+    return export_response("players", document_batches(cursor), format, PLAYER_COLUMNS)
+
+@router.get("/teams")
+async def export_teams(format: ExportFormat = ExportFormat.NDJSON):
+    """Export all teams with their rosters"""
+    cursor = teams_collection.find({}, {"_id": 0}).sort("id", 1)
+    return export_response("teams", document_batches(cursor), format, TEAM_COLUMNS)
+
+@router.get("/auction-results")
+async def export_auction_results(format: ExportFormat = ExportFormat.NDJSON):
+    """Export the results of finished auctions"""
+    cursor = auction_results_collection.find({}, {"_id": 0}).sort("auction_id", 1)
+    return export_response("auction_results", document_batches(cursor), format, AUCTION_RESULT_COLUMNS)
+
+async def league_roster_rows(league_id: Optional[str]) -> AsyncIterator[List[dict]]:
+    """One row per league, team and rostered player, resolved a batch of leagues at a time"""
+    filter_dict = {"id": league_id} if league_id else {}
+    cursor = leagues_collection.find(filter_dict, {"_id": 0, "id": 1, "name": 1}).sort("id", 1)
+    async for leagues in document_batches(cursor):
+        members: Dict[str, List[str]] = {}
+        for member_league_id, team_id in await league_team_ids(
+            league_memberships_collection, [league["id"] for league in leagues]
+        ):
+            members.setdefault(member_league_id, []).append(team_id)
+        team_ids = list({team_id for member_ids in members.values() for team_id in member_ids})
+        teams: Dict[str, dict] = {
+            team["id"]: team
+            async for team in teams_collection.find(
+                {"id": {"$in": team_ids}}, {"_id": 0, "id": 1, "name": 1, "owner_name": 1, "players": 1}
+            )
+        }
+        player_ids = list({
+            player["player_id"] for team in teams.values() for player in team.get("players", [])
+        })
+        player_names: Dict[str, str] = {
+            player["id"]: player["name"]
+            async for player in players_collection.find({"id": {"$in": player_ids}}, {"_id": 0, "id": 1, "name": 1})
+        }
+
+        rows = []
+        for league in leagues:
+            for team_id in members.get(league["id"], []):
+                team = teams.get(team_id, {"id": team_id})
+                base = {
+                    "league_id": league["id"],
+                    "league_name": league.get("name"),
+                    "team_id": team_id,
+                    "team_name": team.get("name"),
+                    "owner_name": team.get("owner_name"),
+                }
+                roster = team.get("players") or [{}]
+                for player in roster:
+                    rows.append({
+                        **base,
+                        "player_id": player.get("player_id"),
+                        "player_name": player_names.get(player.get("player_id")),
+                        "player_role": player.get("role"),
+                        "purchase_price": player.get("purchase_price"),
+                    })
+        yield rows
+
+@router.get("/league-rosters")
+async def export_league_rosters(format: ExportFormat = ExportFormat.NDJSON, league_id: Optional[str] = None):
+    """Export league rosters: every league's teams and their players"""
+    return export_response("league_rosters", league_roster_rows(league_id), format, LEAGUE_ROSTER_COLUMNS)
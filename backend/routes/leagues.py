@@ -1,11 +1,18 @@
 from fastapi import APIRouter, HTTPException
-from typing import List, Optional
-from models.league import League, LeagueCreate, LeagueUpdate
-from services.database import DatabaseService, leagues_collection
+from typing import Optional
+from models.league import League, LeagueCreate, LeagueUpdate, LeagueStatus
+from services.database import DatabaseService, leagues_collection, league_memberships_collection, parse_fields
+from services.pagination import paginated_response
+from services.serialization import TrustedJSONResponse
+from services.cache import read_cache
+from services import memberships
+from services.standings import league_standings
 import random
 import string
 
 router = APIRouter(prefix="/api/leagues", tags=["leagues"])
+# Joining and leaving are conditional writes and are served on their own; the league CRUD is not mounted
+membership_router = APIRouter(prefix="/api/leagues", tags=["leagues"])
 
 def generate_league_code() -> str:
     """Generate a random league code"""
@@ -22,16 +29,19 @@ async def create_league(league_data: LeagueCreate):
     
     league = League(**league_dict)
     await DatabaseService.create_document(leagues_collection, league.dict())
+    await read_cache.invalidate("leagues", league.id)
     return league
 
-@router.get("/", response_model=List[League])
+@router.get("/")
 async def get_leagues(
     limit: int = 50,
+    cursor: Optional[str] = None,
     type: Optional[str] = None,
     status: Optional[str] = None,
-    creator_id: Optional[str] = None
+    creator_id: Optional[str] = None,
+    fields: Optional[str] = None
 ):
-    """Get all leagues with optional filtering"""
+    """Get a page of leagues with optional filtering"""
     filter_dict = {}
     if type:
         filter_dict["type"] = type
@@ -40,42 +50,36 @@ async def get_leagues(
     if creator_id:
         filter_dict["creator_id"] = creator_id
     
-    leagues_data = await DatabaseService.get_documents(leagues_collection, filter_dict, limit)
-    return [League(**league) for league in leagues_data]
+    return await paginated_response(leagues_collection, filter_dict, limit, cursor, parse_fields(fields))
 
-@router.get("/{league_id}", response_model=League)
-async def get_league(league_id: str):
-    """Get a specific league by ID"""
-    league_data = await DatabaseService.get_document(leagues_collection, league_id)
-    if not league_data:
-        raise HTTPException(status_code=404, detail="League not found")
-    return League(**league_data)
-
-@router.get("/code/{code}", response_model=League)
+@router.get("/code/{code}")
 async def get_league_by_code(code: str):
     """Get a league by its code"""
     leagues_data = await DatabaseService.get_documents(leagues_collection, {"code": code.upper()}, 1)
     if not leagues_data:
         raise HTTPException(status_code=404, detail="League not found")
-    return League(**leagues_data[0])
+    return TrustedJSONResponse(leagues_data[0])
 
 @router.put("/{league_id}", response_model=League)
 async def update_league(league_id: str, update_data: LeagueUpdate):
     """Update a league"""
-    existing_league = await DatabaseService.get_document(leagues_collection, league_id)
-    if not existing_league:
+    changes = update_data.dict(exclude_unset=True)
+    if not changes:
+        raise HTTPException(status_code=400, detail="No fields to update")
+    
+    league_data = None
+    if changes.get("status") == LeagueStatus.COMPLETED:
+        # Only the update that completes the league settles its result
+        league_data = await DatabaseService.find_and_update(
+            leagues_collection, {"id": league_id, "status": {"$ne": LeagueStatus.COMPLETED}}, {"$set": changes}
+        )
+        if league_data:
+            await league_standings.record_result(league_id)
+    if not league_data:
+        league_data = await DatabaseService.update_and_get(leagues_collection, league_id, changes)
+    if not league_data:
         raise HTTPException(status_code=404, detail="League not found")
-    
-    updated = await DatabaseService.update_document(
-        leagues_collection, 
-        league_id, 
-        update_data.dict(exclude_unset=True)
-    )
-    
-    if not updated:
-        raise HTTPException(status_code=400, detail="Update failed")
-    
-    league_data = await DatabaseService.get_document(leagues_collection, league_id)
+    await read_cache.invalidate("leagues", league_id)
     return League(**league_data)
 
 @router.delete("/{league_id}")
@@ -84,81 +88,53 @@ async def delete_league(league_id: str):
     deleted = await DatabaseService.delete_document(leagues_collection, league_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="League not found")
+    await league_memberships_collection.delete_many({"league_id": league_id})
+    await read_cache.invalidate("leagues", league_id)
+    await league_standings.remove_league(league_id)
     return {"message": "League deleted successfully"}
 
-@router.post("/{league_id}/join")
+@membership_router.post("/{league_id}/join")
 async def join_league(league_id: str, team_id: str):
     """Join a league with a team"""
-    league_data = await DatabaseService.get_document(leagues_collection, league_id)
-    if not league_data:
-        raise HTTPException(status_code=404, detail="League not found")
-    
-    league = League(**league_data)
-    
-    if team_id in league.participants:
-        raise HTTPException(status_code=400, detail="Team already joined league")
-    
-    # Check if league is full
-    if league.max_participants and len(league.participants) >= league.max_participants:
-        raise HTTPException(status_code=400, detail="League is full")
-    
-    # Add team to participants
-    updated_participants = league.participants + [team_id]
-    
-    await DatabaseService.update_document(
-        leagues_collection, 
-        league_id, 
-        {"participants": updated_participants}
-    )
+    await memberships.join_league(leagues_collection, league_memberships_collection, league_id, team_id)
+    await read_cache.invalidate("leagues", league_id)
+    await league_standings.update_membership(league_id, team_id, joined=True)
     
     return {"message": "Successfully joined league"}
 
-@router.post("/join-by-code")
+@membership_router.post("/join-by-code")
 async def join_league_by_code(code: str, team_id: str):
     """Join a league using league code"""
-    leagues_data = await DatabaseService.get_documents(leagues_collection, {"code": code.upper()}, 1)
+    leagues_data = await DatabaseService.get_documents(leagues_collection, {"code": code.upper()}, 1, {"id": 1})
     if not leagues_data:
         raise HTTPException(status_code=404, detail="Invalid league code")
     
-    league = League(**leagues_data[0])
-    
-    if team_id in league.participants:
-        raise HTTPException(status_code=400, detail="Team already joined league")
-    
-    # Check if league is full
-    if league.max_participants and len(league.participants) >= league.max_participants:
-        raise HTTPException(status_code=400, detail="League is full")
-    
-    # Add team to participants
-    updated_participants = league.participants + [team_id]
+    league_id = leagues_data[0]["id"]
+    league_data = await memberships.join_league(leagues_collection, league_memberships_collection, league_id, team_id)
+    await read_cache.invalidate("leagues", league_id)
+    await league_standings.update_membership(league_id, team_id, joined=True)
     
-    await DatabaseService.update_document(
-        leagues_collection, 
-        league.id, 
-        {"participants": updated_participants}
-    )
-    
-    return {"message": "Successfully joined league", "league": league}
+    return {"message": "Successfully joined league", "league": League(**league_data)}
 
-@router.delete("/{league_id}/leave")
+@membership_router.delete("/{league_id}/leave")
 async def leave_league(league_id: str, team_id: str):
     """Leave a league"""
-    league_data = await DatabaseService.get_document(leagues_collection, league_id)
-    if not league_data:
-        raise HTTPException(status_code=404, detail="League not found")
-    
-    league = League(**league_data)
+    await memberships.leave_league(leagues_collection, league_memberships_collection, league_id, team_id)
+    await read_cache.invalidate("leagues", league_id)
+    await league_standings.update_membership(league_id, team_id, joined=False)
     
-    if team_id not in league.participants:
-        raise HTTPException(status_code=400, detail="Team not in league")
-    
-    # Remove team from participants
-    updated_participants = [p for p in league.participants if p != team_id]
-    
-    await DatabaseService.update_document(
-        leagues_collection, 
-        league_id, 
-        {"participants": updated_participants}
-    )
-    
-    return {"message": "Successfully left league"}
\ No newline at end of file
+    return {"message": "Successfully left league"}
+
+@membership_router.get("/{league_id}/members")
+async def get_league_members(
+    league_id: str,
+    limit: int = 50,
+    cursor: Optional[str] = None
+):
+    """Get a page of a league's member teams, in team order"""
+    if not await DatabaseService.get_document(leagues_collection, league_id, {"id": 1}):
+        raise HTTPException(status_code=404, detail="League not found")
+    return await paginated_response(
+        league_memberships_collection, {"league_id": league_id}, limit, cursor,
+        {"id": 1, "team_id": 1, "joined_at": 1}
+    )
\ No newline at end of file
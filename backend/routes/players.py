@@ -5,7 +5,10 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from models.player import Player, PlayerCreate, PlayerUpdate
-from services.database import DatabaseService, db
+from services.database import DatabaseService, db, PLAYER_SUMMARY_PROJECTION, parse_fields
+from services.pagination import paginated_response
+from services.player_search import player_search
+from services.cache import read_cache
 
 router = APIRouter(prefix="/api/players", tags=["players"])
 players_collection = db.players
@@ -15,16 +18,20 @@ async def create_player(player_data: PlayerCreate):
     """Create a new player"""
     player = Player(**player_data.dict())
     await DatabaseService.create_document(players_collection, player.dict())
+    await player_search.index(player.dict())
+    await read_cache.invalidate("players", player.id)
     return player
 
-@router.get("/", response_model=List[Player])
+@router.get("/")
 async def get_players(
     limit: int = 50,
+    cursor: Optional[str] = None,
     is_hot_pick: Optional[bool] = None,
     role: Optional[str] = None,
-    team: Optional[str] = None
+    team: Optional[str] = None,
+    fields: Optional[str] = None
 ):
-    """Get all players with optional filtering"""
+    """Get a page of players with optional filtering (summary fields unless fields= lists the ones wanted)"""
     filter_dict = {}
     if is_hot_pick is not None:
         filter_dict["is_hot_pick"] = is_hot_pick
@@ -33,37 +40,22 @@ async def get_players(
     if team:
         filter_dict["team"] = team
     
-    players_data = await DatabaseService.get_documents(players_collection, filter_dict, limit)
-    return [Player(**player) for player in players_data]
-
-@router.get("/{player_id}", response_model=Player)
-async def get_player(player_id: str):
-    """Get a specific player by ID"""
-    player_data = await DatabaseService.get_document(players_collection, player_id)
-    if not player_data:
-        raise HTTPException(status_code=404, detail="Player not found")
-    return Player(**player_data)
+    return await paginated_response(
+        players_collection, filter_dict, limit, cursor, parse_fields(fields, PLAYER_SUMMARY_PROJECTION)
+    )
 
 @router.put("/{player_id}", response_model=Player)
 async def update_player(player_id: str, update_data: PlayerUpdate):
     """Update a player"""
-    # Check if player exists
-    existing_player = await DatabaseService.get_document(players_collection, player_id)
-    if not existing_player:
-        raise HTTPException(status_code=404, detail="Player not found")
-    
-    # Update the player
-    updated = await DatabaseService.update_document(
-        players_collection, 
-        player_id, 
-        update_data.dict(exclude_unset=True)
-    )
+    changes = update_data.dict(exclude_unset=True)
+    if not changes:
+        raise HTTPException(status_code=400, detail="No fields to update")
     
-    if not updated:
-        raise HTTPException(status_code=400, detail="Update failed")
-    
-    # Return updated player
-    player_data = await DatabaseService.get_document(players_collection, player_id)
+    player_data = await DatabaseService.update_and_get(players_collection, player_id, changes)
+    if not player_data:
+        raise HTTPException(status_code=404, detail="Player not found")
+    await player_search.index(player_data)
+    await read_cache.invalidate("players", player_id)
     return Player(**player_data)
 
 @router.delete("/{player_id}")
@@ -72,39 +64,17 @@ async def delete_player(player_id: str):
     deleted = await DatabaseService.delete_document(players_collection, player_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Player not found")
+    await player_search.unindex(player_id)
+    await read_cache.invalidate("players", player_id)
     return {"message": "Player deleted successfully"}
 
-@router.get("/search/{query}", response_model=List[Player])
+@router.get("/search/{query}", response_model=List[dict])
 async def search_players(query: str, limit: int = 20):
-    """Search players by name or team"""
-    players_data = await DatabaseService.search_documents(
-        players_collection, 
-        query, 
-        ["name", "team"], 
-        limit
-    )
-    return [Player(**player) for player in players_data]
+    """Search players by name, team or role, ranked and tolerant of typos"""
+    return player_search.search(query, min(limit, 100))
+
+@router.get("/suggest/{prefix}", response_model=List[dict])
+async def suggest_players(prefix: str, limit: int = 8):
+    """Autocomplete suggestions for a partially typed player search"""
+    return player_search.suggest(prefix, min(limit, 20))
 
-@router.post("/{player_id}/bid")
-async def place_bid(player_id: str, bid_amount: int, team_name: str):
-    """Place a bid on a player"""
-    player_data = await DatabaseService.get_document(players_collection, player_id)
-    if not player_data:
-        raise HTTPException(status_code=404, detail="Player not found")
-    
-    player = Player(**player_data)
-    
-    if bid_amount <= player.current_bid:
-        raise HTTPException(status_code=400, detail="Bid must be higher than current bid")
-    
-    # Update player with new bid
-    update_data = {
-        "current_bid": bid_amount,
-        "bidders": list(set(player.bidders + [team_name]))  # Add team to bidders if not already present
-    }
-    
-    await DatabaseService.update_document(players_collection, player_id, update_data)
-    
-    # Return updated player
-    updated_player_data = await DatabaseService.get_document(players_collection, player_id)
-    return Player(**updated_player_data)
\ No newline at end of file
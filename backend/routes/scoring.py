@@ -0,0 +1,42 @@
+from fastapi import APIRouter, HTTPException
+from typing import List
+
+from models.scoring import PerformanceEvent, PerformanceEventCreate
+from services.database import (
+    DatabaseService, leagues_collection, league_memberships_collection, performance_events_collection
+)
+from services.scoring import scoring_engine
+
+router = APIRouter(prefix="/scoring", tags=["scoring"])
+
+@router.post("/events")
+async def record_events(events: List[PerformanceEventCreate]):
+    """Record player performance events (one per ball, or a batch) and update fantasy points"""
+    if not events:
+        raise HTTPException(status_code=400, detail="No events to record")
+    documents = [PerformanceEvent(**event.dict()).dict() for event in events]
+    # Recorded first, so a restart replays exactly the events that were scored
+    await performance_events_collection.insert_many(documents)
+    players = await scoring_engine.record(documents)
+    return {"recorded": len(documents), "players": players}
+
+@router.get("/players/{player_id}")
+async def get_player_score(player_id: str):
+    """A player's fantasy points and stat totals"""
+    return scoring_engine.player_score(player_id)
+
+@router.get("/teams/{team_id}")
+async def get_team_score(team_id: str):
+    """A team's fantasy points with each player's contribution"""
+    score = scoring_engine.team_score(team_id)
+    if score is None:
+        raise HTTPException(status_code=404, detail="Team not found")
+    return score
+
+@router.get("/leagues/{league_id}")
+async def get_league_scores(league_id: str):
+    """Fantasy points of every team in a league, highest first"""
+    if not await DatabaseService.get_document(leagues_collection, league_id, {"id": 1}):
+        raise HTTPException(status_code=404, detail="League not found")
+    members = league_memberships_collection.find({"league_id": league_id}, {"_id": 0, "team_id": 1})
+    return scoring_engine.team_scores([member["team_id"] async for member in members])
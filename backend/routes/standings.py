@@ -0,0 +1,34 @@
+from fastapi import APIRouter, HTTPException, Query
+
+from services.standings import league_standings
+
+router = APIRouter(prefix="/standings", tags=["standings"])
+
+@router.get("/global")
+async def get_global_leaderboard(limit: int = Query(10, ge=1, le=100)):
+    """Top users by the points of all their teams"""
+    return league_standings.users.top(limit)
+
+@router.get("/global/users/{user_id}")
+async def get_user_standing(user_id: str, window: int = Query(5, ge=0, le=50)):
+    """A user's global rank with the users just above and below them"""
+    position = league_standings.user_position(user_id, window)
+    if position is None:
+        raise HTTPException(status_code=404, detail="User has no ranked teams")
+    return position
+
+@router.get("/leagues/{league_id}")
+async def get_league_standings(league_id: str, limit: int = Query(10, ge=1, le=100)):
+    """A league's top teams by points"""
+    standings = league_standings.league_standings(league_id, limit)
+    if standings is None:
+        raise HTTPException(status_code=404, detail="League has no standings")
+    return standings
+
+@router.get("/leagues/{league_id}/teams/{team_id}")
+async def get_team_standing(league_id: str, team_id: str, window: int = Query(5, ge=0, le=50)):
+    """A team's rank in a league with the teams just above and below it"""
+    position = league_standings.league_position(league_id, team_id, window)
+    if position is None:
+        raise HTTPException(status_code=404, detail="Team not in league")
+    return position
@@ -1,9 +1,14 @@
 from fastapi import APIRouter, HTTPException
-from typing import List, Optional
+from typing import Optional
 from models.user import User, UserCreate, UserUpdate
-from services.database import DatabaseService, users_collection
+from services.database import DatabaseService, users_collection, parse_fields
+from services.pagination import paginated_response
+from services.serialization import TrustedJSONResponse
+from services.cache import read_cache
 
 router = APIRouter(prefix="/api/users", tags=["users"])
+# Linking teams is a conditional write and is served on its own; the user CRUD is not mounted
+membership_router = APIRouter(prefix="/api/users", tags=["users"])
 
 @router.post("/", response_model=User)
 async def create_user(user_data: UserCreate):
@@ -12,7 +17,8 @@ async def create_user(user_data: UserCreate):
     existing_users = await DatabaseService.get_documents(
         users_collection, 
         {"$or": [{"username": user_data.username}, {"email": user_data.email}]}, 
-        1
+        1,
+        {"id": 1}
     )
     
     if existing_users:
@@ -20,47 +26,37 @@ async def create_user(user_data: UserCreate):
     
     user = User(**user_data.dict())
     await DatabaseService.create_document(users_collection, user.dict())
+    await read_cache.invalidate("users", user.id)
     return user
 
-@router.get("/", response_model=List[User])
-async def get_users(limit: int = 50):
-    """Get all users"""
-    users_data = await DatabaseService.get_documents(users_collection, {}, limit)
-    return [User(**user) for user in users_data]
+@router.get("/")
+async def get_users(
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None
+):
+    """Get a page of users"""
+    return await paginated_response(users_collection, {}, limit, cursor, parse_fields(fields))
 
-@router.get("/{user_id}", response_model=User)
-async def get_user(user_id: str):
-    """Get a specific user by ID"""
-    user_data = await DatabaseService.get_document(users_collection, user_id)
-    if not user_data:
-        raise HTTPException(status_code=404, detail="User not found")
-    return User(**user_data)
-
-@router.get("/username/{username}", response_model=User)
+@router.get("/username/{username}")
 async def get_user_by_username(username: str):
     """Get a user by username"""
     users_data = await DatabaseService.get_documents(users_collection, {"username": username}, 1)
     if not users_data:
         raise HTTPException(status_code=404, detail="User not found")
-    return User(**users_data[0])
+    return TrustedJSONResponse(users_data[0])
 
 @router.put("/{user_id}", response_model=User)
 async def update_user(user_id: str, update_data: UserUpdate):
     """Update a user"""
-    existing_user = await DatabaseService.get_document(users_collection, user_id)
-    if not existing_user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    updated = await DatabaseService.update_document(
-        users_collection, 
-        user_id, 
-        update_data.dict(exclude_unset=True)
-    )
-    
-    if not updated:
-        raise HTTPException(status_code=400, detail="Update failed")
+    changes = update_data.dict(exclude_unset=True)
+    if not changes:
+        raise HTTPException(status_code=400, detail="No fields to update")
     
-    user_data = await DatabaseService.get_document(users_collection, user_id)
+    user_data = await DatabaseService.update_and_get(users_collection, user_id, changes)
+    if not user_data:
+        raise HTTPException(status_code=404, detail="User not found")
+    await read_cache.invalidate("users", user_id)
     return User(**user_data)
 
 @router.delete("/{user_id}")
@@ -69,48 +65,40 @@ async def delete_user(user_id: str):
     deleted = await DatabaseService.delete_document(users_collection, user_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="User not found")
+    await read_cache.invalidate("users", user_id)
     return {"message": "User deleted successfully"}
 
-@router.post("/{user_id}/teams/{team_id}")
+@membership_router.post("/{user_id}/teams/{team_id}")
 async def add_team_to_user(user_id: str, team_id: str):
     """Add a team to user's team list"""
-    user_data = await DatabaseService.get_document(users_collection, user_id)
+    # Only matches while the team isn't listed yet, so the check and the write are one operation
+    user_data = await DatabaseService.find_and_update(
+        users_collection,
+        {"id": user_id, "team_ids": {"$ne": team_id}},
+        {"$push": {"team_ids": team_id}},
+        {"id": 1}
+    )
     if not user_data:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    user = User(**user_data)
-    
-    if team_id in user.team_ids:
+        if not await DatabaseService.get_document(users_collection, user_id, {"id": 1}):
+            raise HTTPException(status_code=404, detail="User not found")
         raise HTTPException(status_code=400, detail="Team already added to user")
-    
-    updated_team_ids = user.team_ids + [team_id]
-    
-    await DatabaseService.update_document(
-        users_collection, 
-        user_id, 
-        {"team_ids": updated_team_ids}
-    )
+    await read_cache.invalidate("users", user_id)
     
     return {"message": "Team added to user successfully"}
 
-@router.delete("/{user_id}/teams/{team_id}")
+@membership_router.delete("/{user_id}/teams/{team_id}")
 async def remove_team_from_user(user_id: str, team_id: str):
     """Remove a team from user's team list"""
-    user_data = await DatabaseService.get_document(users_collection, user_id)
+    user_data = await DatabaseService.find_and_update(
+        users_collection,
+        {"id": user_id, "team_ids": team_id},
+        {"$pull": {"team_ids": team_id}},
+        {"id": 1}
+    )
     if not user_data:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    user = User(**user_data)
-    
-    if team_id not in user.team_ids:
+        if not await DatabaseService.get_document(users_collection, user_id, {"id": 1}):
+            raise HTTPException(status_code=404, detail="User not found")
         raise HTTPException(status_code=400, detail="Team not found in user's teams")
-    
-    updated_team_ids = [tid for tid in user.team_ids if tid != team_id]
-    
-    await DatabaseService.update_document(
-        users_collection, 
-        user_id, 
-        {"team_ids": updated_team_ids}
-    )
+    await read_cache.invalidate("users", user_id)
     
     return {"message": "Team removed from user successfully"}
\ No newline at end of file
@@ -1,7 +1,6 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, Depends, HTTPException, Request, Response
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
 from typing import List, Optional
 from datetime import datetime
 import os
@@ -12,14 +11,32 @@ from pathlib import Path
 # Import auth routes
 from routes import auth
 from routes import auctions
+from routes import exports
+from routes import scoring
+from routes import standings
+from routes import analytics
+from routes import teams, leagues, users
+from services.websocket_manager import manager
+from services import mongo
+from services.database import PLAYER_SUMMARY_PROJECTION, parse_fields
+from services.pagination import NEXT_CURSOR_HEADER, paginate, paginated_response
+from services.serialization import TrustedJSONResponse
+from services.player_search import player_search
+from services.bids import place_player_bid, rejected_bid
+from services.memberships import membership_document
+from services.cache import read_cache, collection_tag, document_tag
+from services.single_flight import single_flight_stats
+from services.scoring import scoring_engine
+from services.standings import league_standings
+from services.auction_analytics import auction_analytics
+from services.loaders import Loaders, get_loaders, expand_team, expand_league, expand_user
+from services.migrations import run_migrations, check_query_plans, backfill_player_stat_counters
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# MongoDB connection (one pooled client for the whole app)
+db = mongo.db
 
 # Create the main app
 app = FastAPI(title="Sports X Pro Cricket Auctions API", version="1.0.0")
@@ -36,123 +53,205 @@ async def root():
 async def health_check():
     return {"status": "healthy", "service": "Sports X API"}
 
+@api_router.get("/metrics/database")
+async def database_metrics():
+    """MongoDB connection pool and command latency metrics"""
+    return mongo.metrics.snapshot()
+
+@api_router.get("/metrics/cache")
+async def cache_metrics():
+    """Read cache hit rates and sizes"""
+    return read_cache.stats()
+
+@api_router.get("/metrics/single-flight")
+async def single_flight_metrics():
+    """How many concurrent identical reads were collapsed into one"""
+    return single_flight_stats()
+
+@api_router.get("/metrics/scoring")
+async def scoring_metrics():
+    """Players, teams and events the live scoring engine holds"""
+    return scoring_engine.stats()
+
+@api_router.get("/metrics/analytics")
+async def analytics_metrics():
+    """Lots and bids folded into the auction analytics, and when they were last refreshed"""
+    return auction_analytics.stats()
+
+@api_router.get("/metrics/query-plans")
+async def query_plans():
+    """Index usage of the app's known queries, from explain()"""
+    return await check_query_plans(db)
+
 # Simple endpoints for players
 @api_router.get("/players")
-async def get_players():
-    """Get all players"""
-    players = await db.players.find().to_list(100)
-    for player in players:
-        player.pop('_id', None)
-    return players
+async def get_players(
+    request: Request,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None
+):
+    """Get a page of players (summary fields unless fields= lists the ones wanted)"""
+    async def build(response: Response):
+        return await paginate(
+            response, db.players, {}, limit, cursor, parse_fields(fields, PLAYER_SUMMARY_PROJECTION)
+        )
+    return await read_cache.serve(request, [collection_tag("players")], build)
+
+@api_router.get("/players/search")
+async def search_players(q: str, limit: int = 20):
+    """Ranked, typo-tolerant player search over names, teams and roles"""
+    return player_search.search(q, min(limit, 100))
+
+@api_router.get("/players/suggest")
+async def suggest_players(q: str, limit: int = 8):
+    """Autocomplete suggestions for the player search box"""
+    return player_search.suggest(q, min(limit, 20))
 
 @api_router.get("/players/{player_id}")
-async def get_player(player_id: str):
+async def get_player(request: Request, player_id: str, fields: Optional[str] = None):
     """Get a specific player"""
-    player = await db.players.find_one({"id": player_id})
-    if not player:
-        raise HTTPException(status_code=404, detail="Player not found")
-    player.pop('_id', None)
-    return player
+    async def build(response: Response):
+        player = await read_cache.get_document(db.players, player_id, parse_fields(fields))
+        if not player:
+            raise HTTPException(status_code=404, detail="Player not found")
+        return player
+    return await read_cache.serve(request, [document_tag("players", player_id)], build)
 
 @api_router.post("/players/{player_id}/bid")
 async def place_bid(player_id: str, bid_amount: int, team_name: str):
     """Place a bid on a player"""
-    player = await db.players.find_one({"id": player_id})
-    if not player:
-        raise HTTPException(status_code=404, detail="Player not found")
-    
-    if bid_amount <= player.get("current_bid", 0):
-        raise HTTPException(status_code=400, detail="Bid must be higher than current bid")
-    
-    # Update player with new bid
-    await db.players.update_one(
-        {"id": player_id},
-        {
-            "$set": {
-                "current_bid": bid_amount,
-                "updated_at": datetime.utcnow()
-            },
-            "$addToSet": {"bidders": team_name}
-        }
-    )
+    # Compare and write in one operation, so a lower concurrent bid can't overwrite a higher one
+    updated_player = await place_player_bid(db.players, player_id, bid_amount, team_name)
+    if not updated_player:
+        raise await rejected_bid(db.players, player_id)
     
-    # Return updated player
-    updated_player = await db.players.find_one({"id": player_id})
-    updated_player.pop('_id', None)
+    await read_cache.invalidate("players", player_id)
     return updated_player
 
 # Simple endpoints for teams
 @api_router.get("/teams")
-async def get_teams():
-    """Get all teams"""
-    teams = await db.teams.find().to_list(100)
-    for team in teams:
-        team.pop('_id', None)
-    return teams
+async def get_teams(
+    request: Request,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None
+):
+    """Get a page of teams"""
+    async def build(response: Response):
+        return await paginate(response, db.teams, {}, limit, cursor, parse_fields(fields))
+    return await read_cache.serve(request, [collection_tag("teams")], build)
 
 @api_router.get("/teams/{team_id}")
-async def get_team(team_id: str):
+async def get_team(request: Request, team_id: str, fields: Optional[str] = None):
     """Get a specific team"""
-    team = await db.teams.find_one({"id": team_id})
+    async def build(response: Response):
+        team = await read_cache.get_document(db.teams, team_id, parse_fields(fields))
+        if not team:
+            raise HTTPException(status_code=404, detail="Team not found")
+        return team
+    return await read_cache.serve(request, [document_tag("teams", team_id)], build)
+
+@api_router.get("/teams/{team_id}/expanded")
+async def get_team_expanded(team_id: str, loaders: Loaders = Depends(get_loaders)):
+    """Get a team with its players, in a constant number of queries"""
+    team = await loaders.teams.load(team_id)
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
-    team.pop('_id', None)
-    return team
+    return TrustedJSONResponse(await expand_team(loaders, team))
 
 # Simple endpoints for auctions
 @api_router.get("/auctions")
-async def get_auctions():
-    """Get all auctions"""
-    auctions = await db.auctions.find().to_list(100)
-    for auction in auctions:
-        auction.pop('_id', None)
-    return auctions
+async def get_auctions(
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None
+):
+    """Get a page of auctions"""
+    return await paginated_response(db.auctions, {}, limit, cursor, parse_fields(fields))
 
 @api_router.get("/auctions/{auction_id}")
-async def get_auction(auction_id: str):
+async def get_auction(auction_id: str, fields: Optional[str] = None):
     """Get a specific auction"""
-    auction = await db.auctions.find_one({"id": auction_id})
+    auction = await read_cache.get_document(db.auctions, auction_id, parse_fields(fields))
     if not auction:
         raise HTTPException(status_code=404, detail="Auction not found")
-    auction.pop('_id', None)
-    return auction
+    return TrustedJSONResponse(auction)
 
 # Simple endpoints for leagues
 @api_router.get("/leagues")
-async def get_leagues():
-    """Get all leagues"""
-    leagues = await db.leagues.find().to_list(100)
-    for league in leagues:
-        league.pop('_id', None)
-    return leagues
+async def get_leagues(
+    request: Request,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None
+):
+    """Get a page of leagues"""
+    async def build(response: Response):
+        return await paginate(response, db.leagues, {}, limit, cursor, parse_fields(fields))
+    return await read_cache.serve(request, [collection_tag("leagues")], build)
 
 @api_router.get("/leagues/{league_id}")
-async def get_league(league_id: str):
+async def get_league(request: Request, league_id: str, fields: Optional[str] = None):
     """Get a specific league"""
-    league = await db.leagues.find_one({"id": league_id})
+    async def build(response: Response):
+        league = await read_cache.get_document(db.leagues, league_id, parse_fields(fields))
+        if not league:
+            raise HTTPException(status_code=404, detail="League not found")
+        return league
+    return await read_cache.serve(request, [document_tag("leagues", league_id)], build)
+
+@api_router.get("/leagues/{league_id}/expanded")
+async def get_league_expanded(league_id: str, loaders: Loaders = Depends(get_loaders)):
+    """Get a league with its teams and their players, in a constant number of queries"""
+    league = await loaders.leagues.load(league_id)
     if not league:
         raise HTTPException(status_code=404, detail="League not found")
-    league.pop('_id', None)
-    return league
+    return TrustedJSONResponse(await expand_league(loaders, league))
 
 # Simple endpoints for users
 @api_router.get("/users/{user_id}")
-async def get_user(user_id: str):
+async def get_user(user_id: str, fields: Optional[str] = None):
     """Get a specific user"""
-    user = await db.users.find_one({"id": user_id})
+    user = await read_cache.get_document(db.users, user_id, parse_fields(fields))
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return TrustedJSONResponse(user)
+
+@api_router.get("/users/{user_id}/expanded")
+async def get_user_expanded(user_id: str, loaders: Loaders = Depends(get_loaders)):
+    """Get a user with their teams and their players, in a constant number of queries"""
+    user = await loaders.users.load(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    user.pop('_id', None)
-    return user
+    return TrustedJSONResponse(await expand_user(loaders, user))
+
+# Include auction routes first, so /auctions/{auction_id} doesn't shadow /auctions/players
+app.include_router(auctions.router, prefix="/api")
 
 # Include the router in the main app
 app.include_router(api_router)
 
+# Include only the roster and membership writes of the resource routers (they carry their
+# own /api prefix); their create, update and delete routes have no authentication
+app.include_router(teams.roster_router)
+app.include_router(leagues.membership_router)
+app.include_router(users.membership_router)
+
 # Include auth routes
 app.include_router(auth.router, prefix="/api")
 
-# Include auction routes
-app.include_router(auctions.router, prefix="/api")
+# Include export routes
+app.include_router(exports.router, prefix="/api")
+
+# Include live scoring routes
+app.include_router(scoring.router, prefix="/api")
+
+# Include standings and leaderboard routes
+app.include_router(standings.router, prefix="/api")
+
+# Include auction analytics routes
+app.include_router(analytics.router, prefix="/api")
 
 app.add_middleware(
     CORSMiddleware,
@@ -160,6 +259,7 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
 # Configure logging
@@ -172,11 +272,62 @@ logger = logging.getLogger(__name__)
 @app.on_event("startup")
 async def startup_event():
     logger.info("Sports X Pro Cricket Auctions API starting up...")
+    await manager.start()
+    await read_cache.start(manager.backplane, manager.worker_id)
+    await player_search.start(manager.backplane, manager.worker_id)
+    await migrate_database()
     await seed_database()
+    await load_search_index()
+    await load_scoring_engine()
+    await load_standings()
+    await load_auction_analytics()
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
+    await league_standings.stop()
+    await auction_analytics.stop()
+    await manager.stop()
+    mongo.close_client()
+
+async def migrate_database():
+    """Apply pending migrations, including index creation"""
+    try:
+        applied = await run_migrations(db)
+        if applied:
+            logger.info(f"Applied migrations {applied}")
+    except Exception as e:
+        logger.error(f"Error migrating database: {e}")
+
+async def load_search_index():
+    """Build the in-memory player search index"""
+    try:
+        await player_search.load(db.players)
+    except Exception as e:
+        logger.error(f"Error building player search index: {e}")
+
+async def load_scoring_engine():
+    """Score every team from the recorded performance events, then follow other workers' updates"""
+    try:
+        await scoring_engine.load(db.teams, db.performance_events)
+        await scoring_engine.start(manager.backplane, manager.worker_id)
+    except Exception as e:
+        logger.error(f"Error loading scoring engine: {e}")
+
+async def load_standings():
+    """Materialize league standings and the global leaderboard from the scored teams"""
+    try:
+        await league_standings.load(db.league_memberships, db.teams)
+        await league_standings.start(manager.backplane, manager.worker_id, db.users, db.league_standings)
+    except Exception as e:
+        logger.error(f"Error loading standings: {e}")
+
+async def load_auction_analytics():
+    """Aggregate every completed auction lot and its bids, then keep folding in new ones"""
+    try:
+        await auction_analytics.load(db.auction_results, db.auction_bids)
+        auction_analytics.start()
+    except Exception as e:
+        logger.error(f"Error loading auction analytics: {e}")
 
 async def seed_database():
     """Seed database with initial data"""
@@ -189,6 +340,8 @@ async def seed_database():
 
         # Seed players using imported data
         await db.players.insert_many(PLAYERS_DATA)
+        # Migrations ran before the seed, so seeded players get the match feed counters here
+        await backfill_player_stat_counters(db)
         logger.info(f"Seeded {len(PLAYERS_DATA)} players")
 
         # Seed a sample user
@@ -297,7 +450,7 @@ async def seed_database():
                 "status": "active",
                 "creator_id": "user-1",
                 "creator_name": "Cricket Fan",
-                "participants": ["team-1"],
+                "member_count": 1,
                 "max_participants": 8,
                 "prize_pool": "₹50,000",
                 "entry_fee": "₹1,000",
@@ -313,7 +466,7 @@ async def seed_database():
                 "status": "joining",
                 "creator_id": "system",
                 "creator_name": "Sports X",
-                "participants": ["team-1", "team-2"],
+                "member_count": 2,
                 "max_participants": 1000,
                 "prize_pool": "₹10,00,000",
                 "entry_fee": "₹5,000",
@@ -324,6 +477,11 @@ async def seed_database():
         ]
 
         await db.leagues.insert_many(leagues_data)
+        await db.league_memberships.insert_many([
+            membership_document("league-1", "team-1"),
+            membership_document("league-2", "team-1"),
+            membership_document("league-2", "team-2"),
+        ])
         logger.info(f"Seeded {len(leagues_data)} leagues")
 
         logger.info("Database seeding completed successfully!")
@@ -0,0 +1,420 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+from pymongo import ASCENDING
+
+from services.scoring import grow
+
+logger = logging.getLogger(__name__)
+
+# Seconds between folding newly completed lots into the analytics
+REFRESH_INTERVAL = 30.0
+
+# How far behind the newest result seen each refresh re-reads, for results another worker saved late
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+# Results folded per batch, their bids fetched in one round trip
+LOAD_BATCH_SIZE = 5_000
+
+# Bid velocity buckets: seconds since the lot opened; later bids land in the last bucket
+VELOCITY_BUCKET_SECONDS = 10
+VELOCITY_BUCKETS = 36  # six minutes, the five-minute clock plus its extensions
+
+# Sold lots averaged over in a room's rolling price
+TREND_WINDOW = 5
+
+# Starting bid of results saved before it was recorded
+DEFAULT_STARTING_BID = 1_000_000
+
+# Label of results saved before role, team or room were recorded
+UNKNOWN = "Unknown"
+
+RESULT_COLUMNS = [
+    "auction_id", "room_id", "player_position", "player_team", "base_price", "starting_bid",
+    "winning_bid", "winner_user_id", "total_bids", "auction_duration", "created_at"
+]
+BID_COLUMNS = ["auction_id", "amount", "offset_seconds"]
+
+class Codes:
+    """Dense integer codes for labels, assigned in order of first appearance"""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.labels: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def encode(self, labels: pd.Series) -> np.ndarray:
+        # Only labels never seen before are touched one by one
+        for label in labels.unique():
+            if label not in self.codes:
+                self.codes[label] = len(self.labels)
+                self.labels.append(label)
+        return labels.map(self.codes).to_numpy(np.int64)
+
+def sums(codes: np.ndarray, weights: np.ndarray, groups: int) -> np.ndarray:
+    return np.bincount(codes, weights=weights, minlength=groups)
+
+def ratio(numerator: float, denominator: float, digits: int = 2) -> Optional[float]:
+    return round(numerator / denominator, digits) if denominator else None
+
+class AuctionAnalytics:
+    """Price inflation, bid velocity and room spending over every completed lot
+
+    Completed results and their bid logs are read in columnar batches and
+    folded into running per-group sums with vectorized scatter-adds, so a
+    refresh only touches lots completed since the last one and a read only
+    touches the group totals, however many bids have been folded. Rendered
+    reads are cached until the next refresh folds something.
+    """
+
+    def __init__(self):
+        self.roles = Codes()
+        self.teams = Codes()
+        self.rooms = Codes()
+        # Role and team pairs; the per-role and per-team figures are sums over them
+        self.pairs = Codes()
+        self.pair_roles = np.zeros(0, dtype=np.int64)
+        self.pair_teams = np.zeros(0, dtype=np.int64)
+        self.pair_lots = np.zeros(0)
+        self.pair_sold = np.zeros(0)
+        self.pair_spent = np.zeros(0)
+        self.pair_base = np.zeros(0)
+        self.pair_multiples = np.zeros(0)
+        self.pair_max_multiple = np.zeros(0)
+        # Bids by role and seconds since the lot opened: [role, bucket]
+        self.velocity_bids = np.zeros((0, VELOCITY_BUCKETS))
+        self.velocity_multiples = np.zeros((0, VELOCITY_BUCKETS))
+        self.room_lots = np.zeros(0)
+        self.room_sold = np.zeros(0)
+        self.room_spent = np.zeros(0)
+        self.room_bids = np.zeros(0)
+        self.room_durations = np.zeros(0)
+        # One row per lot, in the order folded
+        self.lot_ids: List[str] = []
+        self.lot_rooms = np.zeros(0, dtype=np.int64)
+        self.lot_times = np.zeros(0, dtype="datetime64[ms]")
+        self.lot_prices = np.zeros(0)
+        self.lot_multiples = np.zeros(0)
+        self.lot_sold = np.zeros(0, dtype=bool)
+        self.seen: Set[str] = set()
+        self.bids_folded = 0
+        # Newest result folded; refreshes read from just behind it
+        self.watermark: Optional[datetime] = None
+        self.refreshed_at: Optional[datetime] = None
+        # Rendered reads: {(name, *arguments): result}, cleared whenever a fold changes the sums
+        self.cache: Dict[tuple, object] = {}
+        self.results_collection = None
+        self.bids_collection = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def lots(self) -> int:
+        return len(self.lot_ids)
+
+    async def load(self, results, bids):
+        """Build the analytics from every completed result and its bids"""
+        self.__init__()
+        self.results_collection = results
+        self.bids_collection = bids
+        await self.refresh()
+        logger.info(f"Built auction analytics over {self.lots} lots and {self.bids_folded} bids")
+
+    def start(self):
+        """Keep folding in newly completed lots"""
+        self.task = asyncio.create_task(self.refresh_loop())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+    async def refresh_loop(self):
+        while True:
+            await asyncio.sleep(REFRESH_INTERVAL)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Error refreshing auction analytics: {e}")
+
+    async def refresh(self) -> int:
+        """Fold in the results completed since the last refresh, returning how many"""
+        query = {}
+        if self.watermark is not None:
+            query = {"created_at": {"$gte": self.watermark - WATERMARK_OVERLAP}}
+        projection = {"_id": 0, **{column: 1 for column in RESULT_COLUMNS}}
+        cursor = self.results_collection.find(query, projection).sort("created_at", ASCENDING)
+        folded = 0
+        batch: List[dict] = []
+        async for result in cursor.batch_size(LOAD_BATCH_SIZE):
+            if result["auction_id"] in self.seen:
+                continue
+            batch.append(result)
+            if len(batch) >= LOAD_BATCH_SIZE:
+                folded += await self.fold_batch(batch)
+                batch = []
+        if batch:
+            folded += await self.fold_batch(batch)
+        self.refreshed_at = datetime.utcnow()
+        return folded
+
+    async def fold_batch(self, results: List[dict]) -> int:
+        auction_ids = [result["auction_id"] for result in results]
+        bids = await self.bids_collection.find(
+            {"auction_id": {"$in": auction_ids}}, {"_id": 0, **{column: 1 for column in BID_COLUMNS}}
+        ).to_list(length=None)
+        self.fold(results, bids)
+        return len(results)
+
+    def fold(self, results: List[dict], bids: List[dict]):
+        """Add completed lots and their bids to the running sums"""
+        results = [result for result in results if result["auction_id"] not in self.seen]
+        if not results:
+            return
+        lots = pd.DataFrame.from_records(results, columns=RESULT_COLUMNS)
+        roles = lots["player_position"].fillna(UNKNOWN)
+        teams = lots["player_team"].fillna(UNKNOWN)
+        role_codes = self.roles.encode(roles)
+        team_codes = self.teams.encode(teams)
+        room_codes = self.rooms.encode(lots["room_id"].fillna(UNKNOWN))
+
+        pairs_before = len(self.pairs)
+        pair_codes = self.pairs.encode(roles + "\x1f" + teams)
+        self.pair_roles = grow(self.pair_roles, len(self.pairs))
+        self.pair_teams = grow(self.pair_teams, len(self.pairs))
+        new_pairs = pair_codes >= pairs_before
+        self.pair_roles[pair_codes[new_pairs]] = role_codes[new_pairs]
+        self.pair_teams[pair_codes[new_pairs]] = team_codes[new_pairs]
+
+        # Prices are measured against the player's base price; results saved before
+        # it was recorded fall back to their starting bid
+        starting = lots["starting_bid"].fillna(DEFAULT_STARTING_BID).to_numpy(float)
+        starting = np.where(starting > 0, starting, DEFAULT_STARTING_BID)
+        base = lots["base_price"].to_numpy(float)
+        base = np.where(base > 0, base, starting)
+        prices = lots["winning_bid"].fillna(0).to_numpy(float)
+        multiples = prices / base
+        sold = lots["winner_user_id"].notna().to_numpy()
+        spent = np.where(sold, prices, 0.0)
+
+        # Inflation only counts lots that sold; an unsold lot "closes" at its base price
+        pairs = len(self.pairs)
+        for name, weights in [
+            ("pair_lots", None),
+            ("pair_sold", sold.astype(float)),
+            ("pair_spent", spent),
+            ("pair_base", np.where(sold, base, 0.0)),
+            ("pair_multiples", np.where(sold, multiples, 0.0)),
+        ]:
+            totals = grow(getattr(self, name), pairs)
+            totals[:pairs] += sums(pair_codes, weights, pairs)
+            setattr(self, name, totals)
+        self.pair_max_multiple = grow(self.pair_max_multiple, pairs)
+        np.maximum.at(self.pair_max_multiple, pair_codes[sold], multiples[sold])
+
+        rooms = len(self.rooms)
+        for name, weights in [
+            ("room_lots", None),
+            ("room_sold", sold.astype(float)),
+            ("room_spent", spent),
+            ("room_bids", lots["total_bids"].fillna(0).to_numpy(float)),
+            ("room_durations", lots["auction_duration"].fillna(0).to_numpy(float)),
+        ]:
+            totals = grow(getattr(self, name), rooms)
+            totals[:rooms] += sums(room_codes, weights, rooms)
+            setattr(self, name, totals)
+
+        start, end = self.lots, self.lots + len(lots)
+        self.lot_rooms = grow(self.lot_rooms, end)
+        self.lot_times = grow(self.lot_times, end)
+        self.lot_prices = grow(self.lot_prices, end)
+        self.lot_multiples = grow(self.lot_multiples, end)
+        self.lot_sold = grow(self.lot_sold, end)
+        self.lot_rooms[start:end] = room_codes
+        self.lot_times[start:end] = pd.to_datetime(lots["created_at"]).to_numpy("datetime64[ms]")
+        self.lot_prices[start:end] = prices
+        self.lot_multiples[start:end] = multiples
+        self.lot_sold[start:end] = sold
+        self.lot_ids.extend(lots["auction_id"])
+        self.seen.update(lots["auction_id"])
+
+        self.fold_bids(bids, lots["auction_id"], role_codes, base)
+
+        newest = pd.Timestamp(lots["created_at"].max()).to_pydatetime()
+        if self.watermark is None or newest > self.watermark:
+            self.watermark = newest
+        self.cache.clear()
+
+    def fold_bids(self, bids: List[dict], auction_ids: pd.Series, role_codes: np.ndarray, base: np.ndarray):
+        """Add a batch's bids to the velocity curves of their lots' roles"""
+        roles = len(self.roles)
+        self.velocity_bids = grow(self.velocity_bids, roles)
+        self.velocity_multiples = grow(self.velocity_multiples, roles)
+        if not bids:
+            return
+        frame = pd.DataFrame.from_records(bids, columns=BID_COLUMNS).dropna()
+        lot_index = pd.Series(np.arange(len(auction_ids)), index=auction_ids.to_numpy())
+        lots = frame["auction_id"].map(lot_index)
+        frame, lots = frame[lots.notna()], lots[lots.notna()].to_numpy(np.int64)
+        buckets = np.clip(
+            frame["offset_seconds"].to_numpy(float) // VELOCITY_BUCKET_SECONDS, 0, VELOCITY_BUCKETS - 1
+        ).astype(np.int64)
+        # One flat scatter-add over [role, bucket]
+        cells = role_codes[lots] * VELOCITY_BUCKETS + buckets
+        shape = (roles, VELOCITY_BUCKETS)
+        self.velocity_bids[:roles] += sums(cells, None, roles * VELOCITY_BUCKETS).reshape(shape)
+        self.velocity_multiples[:roles] += sums(
+            cells, frame["amount"].to_numpy(float) / base[lots], roles * VELOCITY_BUCKETS
+        ).reshape(shape)
+        self.bids_folded += len(frame)
+
+    def cached(self, key: tuple, build):
+        if key not in self.cache:
+            self.cache[key] = build()
+        return self.cache[key]
+
+    def inflation(self, by: str) -> List[dict]:
+        """Sold prices against base prices for each role or team, biggest spend first"""
+        return self.cached(("inflation", by), lambda: self.build_inflation(by))
+
+    def build_inflation(self, by: str) -> List[dict]:
+        codes, labels = (self.pair_roles, self.roles) if by == "role" else (self.pair_teams, self.teams)
+        pairs, groups = len(self.pairs), len(labels)
+        codes = codes[:pairs]
+        lots = sums(codes, self.pair_lots[:pairs], groups)
+        sold = sums(codes, self.pair_sold[:pairs], groups)
+        spent = sums(codes, self.pair_spent[:pairs], groups)
+        base = sums(codes, self.pair_base[:pairs], groups)
+        multiples = sums(codes, self.pair_multiples[:pairs], groups)
+        max_multiple = np.zeros(groups)
+        np.maximum.at(max_multiple, codes, self.pair_max_multiple[:pairs])
+        return [
+            {
+                by: labels.labels[group],
+                "lots": int(lots[group]),
+                "sold": int(sold[group]),
+                "unsold": int(lots[group] - sold[group]),
+                "spent": int(spent[group]),
+                "average_price": ratio(spent[group], sold[group], 0),
+                # Spend-weighted: how far total prices ran over total base prices
+                "inflation_pct": round((spent[group] / base[group] - 1) * 100, 1) if base[group] else None,
+                "average_multiple": ratio(multiples[group], sold[group]),
+                "max_multiple": round(float(max_multiple[group]), 2) if sold[group] else None,
+            }
+            for group in np.argsort(-spent, kind="stable").tolist()
+        ]
+
+    def bid_velocity(self, role: Optional[str] = None) -> Optional[dict]:
+        """Bids per lot and their price against the base price, by seconds since the lot opened
+
+        Across every role, or one role; None if no lot of that role has completed.
+        """
+        if role is not None and role not in self.roles.codes:
+            return None
+        return self.cached(("bid_velocity", role), lambda: self.build_bid_velocity(role))
+
+    def build_bid_velocity(self, role: Optional[str]) -> dict:
+        roles = len(self.roles)
+        role_lots = sums(self.pair_roles[:len(self.pairs)], self.pair_lots[:len(self.pairs)], roles)
+        if role is None:
+            lots = role_lots.sum()
+            bids = self.velocity_bids[:roles].sum(axis=0)
+            multiples = self.velocity_multiples[:roles].sum(axis=0)
+        else:
+            code = self.roles.codes[role]
+            lots, bids, multiples = role_lots[code], self.velocity_bids[code], self.velocity_multiples[code]
+        return {
+            "role": role,
+            "lots": int(lots),
+            "bucket_seconds": VELOCITY_BUCKET_SECONDS,
+            "buckets": [
+                {
+                    "start_seconds": bucket * VELOCITY_BUCKET_SECONDS,
+                    "bids": int(bids[bucket]),
+                    "bids_per_lot": ratio(bids[bucket], lots, 3),
+                    "average_multiple": ratio(multiples[bucket], bids[bucket]),
+                }
+                for bucket in range(VELOCITY_BUCKETS)
+            ],
+        }
+
+    def room_spending(self, limit: int) -> List[dict]:
+        """Rooms by total spend, with their lots, bids and average prices"""
+        return self.cached(("room_spending", limit), lambda: self.build_room_spending(limit))
+
+    def build_room_spending(self, limit: int) -> List[dict]:
+        rooms = len(self.rooms)
+        spent = self.room_spent[:rooms]
+        if limit < rooms:
+            top = np.argpartition(-spent, limit)[:limit]
+            top = top[np.argsort(-spent[top], kind="stable")]
+        else:
+            top = np.argsort(-spent, kind="stable")
+        return [self.room_summary(room) for room in top.tolist()]
+
+    def room_summary(self, room: int) -> dict:
+        lots, sold = self.room_lots[room], self.room_sold[room]
+        return {
+            "room_id": self.rooms.labels[room],
+            "lots": int(lots),
+            "sold": int(sold),
+            "spent": int(self.room_spent[room]),
+            "average_price": ratio(self.room_spent[room], sold, 0),
+            "bids": int(self.room_bids[room]),
+            "bids_per_lot": ratio(self.room_bids[room], lots),
+            "average_duration": ratio(self.room_durations[room], lots, 1),
+        }
+
+    def room_trend(self, room_id: str) -> Optional[dict]:
+        """A room's sold lots in order, with its cumulative spend and rolling average price
+
+        None if no lot in the room has completed.
+        """
+        if room_id not in self.rooms.codes:
+            return None
+        return self.cached(("room_trend", room_id), lambda: self.build_room_trend(room_id))
+
+    def build_room_trend(self, room_id: str) -> dict:
+        room = self.rooms.codes[room_id]
+        rows = np.flatnonzero((self.lot_rooms[:self.lots] == room) & self.lot_sold[:self.lots])
+        rows = rows[np.argsort(self.lot_times[rows], kind="stable")]
+        prices = self.lot_prices[rows]
+        cumulative = np.cumsum(prices)
+        # Rolling mean over the last TREND_WINDOW sold lots, from the running sums
+        window = np.minimum(np.arange(1, len(rows) + 1), TREND_WINDOW)
+        behind = np.concatenate([np.zeros(TREND_WINDOW), cumulative])[:len(rows)]
+        rolling = (cumulative - behind) / window
+        times = np.datetime_as_string(self.lot_times[rows], unit="s")
+        return {
+            **self.room_summary(room),
+            "trend": [
+                {
+                    "auction_id": self.lot_ids[row],
+                    "completed_at": times[index],
+                    "price": int(prices[index]),
+                    "multiple": round(float(self.lot_multiples[row]), 2),
+                    "cumulative_spent": int(cumulative[index]),
+                    "rolling_average_price": round(float(rolling[index])),
+                }
+                for index, row in enumerate(rows.tolist())
+            ],
+        }
+
+    def stats(self) -> dict:
+        return {
+            "lots": self.lots,
+            "bids": self.bids_folded,
+            "rooms": len(self.rooms),
+            "roles": len(self.roles),
+            "teams": len(self.teams),
+            "cached_reads": len(self.cache),
+            "refreshed_at": self.refreshed_at.isoformat() if self.refreshed_at else None,
+        }
+
+auction_analytics = AuctionAnalytics()
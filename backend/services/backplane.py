@@ -0,0 +1,260 @@
+import argparse
+import asyncio
+import json
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# Handler signature: async handler(channel, message)
+Handler = Callable[[str, dict], Awaitable[None]]
+
+DEFAULT_BROKER_PORT = 7400
+
+class Backplane:
+    """Pub/sub transport that carries room events between worker processes"""
+
+    # Whether other processes can be on the other end
+    distributed = False
+
+    def __init__(self):
+        # Local handlers: {channel: [handler, ...]}
+        self.subscribers: Dict[str, List[Handler]] = {}
+
+    async def start(self):
+        """Open the transport"""
+
+    async def close(self):
+        """Close the transport"""
+
+    async def publish(self, channel: str, message: dict):
+        """Publish a message to every subscriber of a channel"""
+        raise NotImplementedError
+
+    async def subscribe(self, channel: str, handler: Handler):
+        """Register a handler for a channel"""
+        self.subscribers.setdefault(channel, []).append(handler)
+
+    async def unsubscribe(self, channel: str, handler: Handler):
+        """Remove a handler from a channel"""
+        handlers = self.subscribers.get(channel)
+        if handlers and handler in handlers:
+            handlers.remove(handler)
+        if not handlers:
+            self.subscribers.pop(channel, None)
+
+    async def dispatch(self, channel: str, message: dict):
+        """Deliver a message to the local handlers of a channel"""
+        for handler in list(self.subscribers.get(channel, ())):
+            try:
+                await handler(channel, message)
+            except Exception as e:
+                logger.error(f"Backplane handler error on {channel}: {e}")
+
+class LocalBackplane(Backplane):
+    """In-process backplane, used for single-worker deployments"""
+
+    async def publish(self, channel: str, message: dict):
+        """Publish a message to every subscriber of a channel"""
+        await self.dispatch(channel, message)
+
+class TcpBackplane(Backplane):
+    """Networked backplane speaking newline-delimited JSON to a BackplaneBroker"""
+
+    distributed = True
+
+    def __init__(self, host: str, port: int = DEFAULT_BROKER_PORT, reconnect_delay: float = 1.0):
+        super().__init__()
+        self.host = host
+        self.port = port
+        self.reconnect_delay = reconnect_delay
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.reader_task: Optional[asyncio.Task] = None
+        self.write_lock = asyncio.Lock()
+        self.closing = False
+
+    async def start(self):
+        """Connect to the broker and start reading"""
+        await self.connect()
+        self.reader_task = asyncio.create_task(self.read_loop())
+
+    async def close(self):
+        """Disconnect from the broker"""
+        self.closing = True
+        if self.reader_task:
+            self.reader_task.cancel()
+            self.reader_task = None
+        if self.writer:
+            self.writer.close()
+            self.writer = None
+
+    async def connect(self):
+        """Open the broker connection and restore subscriptions"""
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        for channel in list(self.subscribers):
+            await self.send_frame({"op": "sub", "channel": channel})
+        logger.info(f"Backplane connected to {self.host}:{self.port}")
+
+    async def reconnect(self):
+        """Reconnect to the broker until it succeeds or the backplane closes"""
+        self.writer = None
+        while not self.closing:
+            await asyncio.sleep(self.reconnect_delay)
+            try:
+                await self.connect()
+                return
+            except OSError as e:
+                logger.warning(f"Backplane reconnect to {self.host}:{self.port} failed: {e}")
+
+    async def read_loop(self):
+        """Dispatch messages received from the broker"""
+        while not self.closing:
+            try:
+                line = await self.reader.readline()
+                if not line:
+                    raise ConnectionError("Broker closed the connection")
+                frame = json.loads(line)
+                await self.dispatch(frame["channel"], frame["data"])
+            except asyncio.CancelledError:
+                raise
+            except (ConnectionError, OSError) as e:
+                if self.closing:
+                    break
+                logger.warning(f"Backplane connection lost: {e}")
+                await self.reconnect()
+            except Exception as e:
+                logger.error(f"Backplane failed to process frame: {e}")
+
+    async def send_frame(self, frame: dict) -> bool:
+        """Write a frame to the broker"""
+        if self.writer is None:
+            return False
+        data = (json.dumps(frame, default=str) + "\n").encode()
+        try:
+            async with self.write_lock:
+                self.writer.write(data)
+                await self.writer.drain()
+            return True
+        except (ConnectionError, OSError) as e:
+            logger.warning(f"Backplane write failed: {e}")
+            return False
+
+    async def publish(self, channel: str, message: dict):
+        """Publish a message to every subscriber of a channel"""
+        # Best effort, like any pub/sub bus: messages published while disconnected are dropped
+        await self.send_frame({"op": "pub", "channel": channel, "data": message})
+
+    async def subscribe(self, channel: str, handler: Handler):
+        """Register a handler and tell the broker on first interest in a channel"""
+        first = channel not in self.subscribers
+        await super().subscribe(channel, handler)
+        if first:
+            await self.send_frame({"op": "sub", "channel": channel})
+
+    async def unsubscribe(self, channel: str, handler: Handler):
+        """Remove a handler and tell the broker once nothing listens on the channel"""
+        await super().unsubscribe(channel, handler)
+        if channel not in self.subscribers:
+            await self.send_frame({"op": "unsub", "channel": channel})
+
+class BackplaneBroker:
+    """Minimal fan-out broker for TcpBackplane, a local stand-in for a real message bus"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_BROKER_PORT):
+        self.host = host
+        self.port = port
+        self.server: Optional[asyncio.AbstractServer] = None
+        # Subscribed connections: {channel: {writer, ...}}
+        self.channels: Dict[str, Set[asyncio.StreamWriter]] = {}
+        # Client connection handlers
+        self.client_tasks: Set[asyncio.Task] = set()
+
+    async def start(self):
+        """Start listening for backplane clients"""
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        logger.info(f"Backplane broker listening on {self.host}:{self.port}")
+
+    async def close(self):
+        """Stop the broker"""
+        if self.server:
+            self.server.close()
+            for task in list(self.client_tasks):
+                task.cancel()
+            await asyncio.gather(*self.client_tasks, return_exceptions=True)
+            await self.server.wait_closed()
+            self.server = None
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve one worker connection"""
+        task = asyncio.current_task()
+        self.client_tasks.add(task)
+        subscribed: Set[str] = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                frame = json.loads(line)
+                op = frame.get("op")
+                channel = frame.get("channel")
+
+                if op == "sub":
+                    self.channels.setdefault(channel, set()).add(writer)
+                    subscribed.add(channel)
+                elif op == "unsub":
+                    self.remove_subscriber(channel, writer)
+                    subscribed.discard(channel)
+                elif op == "pub":
+                    # Forward the frame as received: workers only pay for channels they follow
+                    for subscriber in list(self.channels.get(channel, ())):
+                        try:
+                            subscriber.write(line)
+                            await subscriber.drain()
+                        except (ConnectionError, OSError):
+                            self.remove_subscriber(channel, subscriber)
+        except asyncio.CancelledError:
+            pass
+        except (ConnectionError, OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Backplane client dropped: {e}")
+        finally:
+            for channel in subscribed:
+                self.remove_subscriber(channel, writer)
+            writer.close()
+            self.client_tasks.discard(task)
+
+    def remove_subscriber(self, channel: str, writer: asyncio.StreamWriter):
+        """Drop one connection from a channel"""
+        writers = self.channels.get(channel)
+        if writers is not None:
+            writers.discard(writer)
+            if not writers:
+                del self.channels[channel]
+
+def create_backplane(url: Optional[str]) -> Backplane:
+    """Build a backplane from a URL such as tcp://127.0.0.1:7400 (empty means in-process)"""
+    if not url or url == "local":
+        return LocalBackplane()
+
+    parsed = urlparse(url)
+    if parsed.scheme == "tcp":
+        return TcpBackplane(parsed.hostname or "127.0.0.1", parsed.port or DEFAULT_BROKER_PORT)
+
+    raise ValueError(f"Unsupported backplane URL: {url}")
+
+async def run_broker(host: str, port: int):
+    """Run a broker until interrupted"""
+    broker = BackplaneBroker(host, port)
+    await broker.start()
+    await asyncio.Event().wait()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local backplane broker")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_BROKER_PORT)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    asyncio.run(run_broker(args.host, args.port))
@@ -0,0 +1,37 @@
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException
+
+from services.database import DatabaseService
+
+async def place_player_bid(collection, player_id: str, bid_amount: int, team_name: str) -> Optional[dict]:
+    """Raise a player's bid only if it beats the stored one, returning the player as updated
+
+    The comparison happens inside the update, so of any number of concurrent
+    bids exactly the ones that are higher than the bid before them apply, and
+    the highest always ends up stored. None means the bid lost (or the player
+    doesn't exist). A player nobody has bid on yet, with a null or missing
+    current_bid, counts as standing at 0.
+    """
+    return await DatabaseService.find_and_update(
+        collection,
+        {"id": player_id, "$expr": {"$lt": [{"$ifNull": ["$current_bid", 0]}, bid_amount]}},
+        {
+            "$set": {
+                "current_bid": bid_amount,
+                "updated_at": datetime.utcnow()
+            },
+            "$addToSet": {"bidders": team_name}
+        }
+    )
+
+async def rejected_bid(collection, player_id: str) -> HTTPException:
+    """Explain why a conditional bid didn't apply"""
+    player = await DatabaseService.get_document(collection, player_id, {"current_bid": 1})
+    if not player:
+        return HTTPException(status_code=404, detail="Player not found")
+    return HTTPException(
+        status_code=400,
+        detail=f"Bid must be higher than current bid of {player.get('current_bid') or 0}"
+    )
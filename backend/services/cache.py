@@ -0,0 +1,246 @@
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from fastapi import Request, Response
+
+from services.backplane import Backplane
+from services.conditional import REVALIDATE_CACHE_CONTROL, etag_matches, make_etag, not_modified
+from services.database import DatabaseService
+from services.serialization import encode_trusted
+from services.single_flight import SingleFlight
+
+# Backplane channel carrying invalidations to the other workers
+CACHE_CHANNEL = "cache:invalidate"
+
+class LRUCache:
+    """Size-bounded LRU map with per-entry TTL and tag-based invalidation"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # Entries in recency order: {key: (expires_at, value, tags)}
+        self.entries: "OrderedDict[Any, Tuple[float, Any, Tuple[str, ...]]]" = OrderedDict()
+        # Keys carrying each tag: {tag: {key, ...}}
+        self.tagged: Dict[str, Set[Any]] = {}
+        # Bumped by every invalidation, so a fill that raced one can be dropped
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Any) -> Optional[Any]:
+        """Get a live entry, refreshing its recency"""
+        entry = self.entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                self.discard(key)
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: Any, value: Any, tags: Iterable[str] = ()):
+        """Store an entry under some tags, evicting the least recently used ones"""
+        self.discard(key)
+        tags = tuple(tags)
+        self.entries[key] = (time.monotonic() + self.ttl_seconds, value, tags)
+        for tag in tags:
+            self.tagged.setdefault(tag, set()).add(key)
+        while len(self.entries) > self.max_entries:
+            self.discard(next(iter(self.entries)))
+            self.evictions += 1
+
+    def discard(self, key: Any):
+        """Remove one entry"""
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self.tagged.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.tagged[tag]
+
+    def invalidate(self, tag: str):
+        """Remove every entry carrying a tag"""
+        self.generation += 1
+        for key in list(self.tagged.get(tag, ())):
+            self.discard(key)
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        """Hit rate and size counters"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+def collection_tag(collection_name: str) -> str:
+    """Tag of entries built from a whole collection, such as list pages"""
+    return collection_name
+
+def document_tag(collection_name: str, document_id: str) -> str:
+    """Tag of entries built from one document"""
+    return f"{collection_name}:{document_id}"
+
+def document_key(collection_name: str, document_id: str, projection: Optional[Dict[str, int]]) -> tuple:
+    """Document tier key of one projection of a document"""
+    return (collection_name, document_id, tuple(sorted((projection or {}).items())))
+
+class ReadCache:
+    """Read-through cache in front of DatabaseService
+
+    The document tier holds decoded documents; the response tier holds
+    pre-encoded response bodies for hot endpoints. Writes invalidate both tiers
+    on every worker through the backplane.
+    """
+
+    def __init__(
+        self,
+        document_entries: int = 10_000,
+        document_ttl: float = 30.0,
+        response_entries: int = 2_000,
+        response_ttl: float = 10.0
+    ):
+        self.documents = LRUCache(document_entries, document_ttl)
+        self.responses = LRUCache(response_entries, response_ttl)
+        # Concurrent misses on one key share a single fill
+        self.document_fills = SingleFlight("document_cache")
+        self.response_fills = SingleFlight("response_cache")
+        self.backplane: Optional[Backplane] = None
+        self.worker_id: Optional[str] = None
+
+    async def start(self, backplane: Backplane, worker_id: str):
+        """Receive invalidations published by other workers"""
+        self.backplane = backplane
+        self.worker_id = worker_id
+        await backplane.subscribe(CACHE_CHANNEL, self.handle_remote_invalidation)
+
+    async def get_document(self, collection, document_id: str, projection: Optional[Dict[str, int]] = None) -> Optional[dict]:
+        """Get a document by ID through the document tier (shared, so callers must not mutate it)"""
+        key = document_key(collection.name, document_id, projection)
+        document = self.documents.get(key)
+        if document is None:
+            async def fill() -> Optional[dict]:
+                generation = self.documents.generation
+                document = await DatabaseService.get_document(collection, document_id, projection)
+                if document is not None:
+                    self.remember_documents(collection.name, [document], projection, generation)
+                return document
+            document = await self.document_fills.do(key, fill)
+        return document
+
+    def cached_documents(
+        self,
+        collection_name: str,
+        document_ids: Iterable[str],
+        projection: Optional[Dict[str, int]] = None
+    ) -> Dict[str, dict]:
+        """The documents among some ids the document tier holds, by id"""
+        found = {}
+        for document_id in document_ids:
+            document = self.documents.get(document_key(collection_name, document_id, projection))
+            if document is not None:
+                found[document_id] = document
+        return found
+
+    def remember_documents(
+        self,
+        collection_name: str,
+        documents: List[dict],
+        projection: Optional[Dict[str, int]],
+        generation: int
+    ):
+        """Keep documents read at a generation, unless a write has invalidated anything since"""
+        if generation != self.documents.generation:
+            return
+        for document in documents:
+            self.documents.put(
+                document_key(collection_name, document["id"], projection),
+                document,
+                [document_tag(collection_name, document["id"])]
+            )
+
+    async def serve(
+        self,
+        request: Request,
+        tags: Iterable[str],
+        build: Callable[[Response], Awaitable[Any]],
+        cache_control: str = REVALIDATE_CACHE_CONTROL
+    ) -> Response:
+        """Serve a GET endpoint from the response tier, building and encoding it on a miss
+
+        build gets a Response to set headers on (kept with the cached body) and
+        returns the content, or raises to skip caching. Cached bodies carry an
+        ETag, so a client revalidating an unchanged body gets a 304 without
+        the endpoint being built.
+        """
+        key = (request.url.path, tuple(sorted(request.query_params.multi_items())))
+        cached = self.responses.get(key)
+        if cached is None:
+            async def fill() -> Tuple[bytes, Dict[str, str], str]:
+                generation = self.responses.generation
+                response = Response()
+                content = await build(response)
+                body = encode_trusted(content)
+                headers = {
+                    name: value for name, value in response.headers.items()
+                    if name not in ("content-length", "content-type")
+                }
+                cached = (body, headers, make_etag(body))
+                if generation == self.responses.generation:
+                    self.responses.put(key, cached, tags)
+                return cached
+            cached = await self.response_fills.do(key, fill)
+        body, headers, etag = cached
+        if etag_matches(request, etag):
+            return not_modified(etag, cache_control)
+        return Response(
+            content=body,
+            media_type="application/json",
+            headers={**headers, "ETag": etag, "Cache-Control": cache_control}
+        )
+
+    def evict(self, collection_name: str, document_ids: Iterable[str] = ()):
+        """Drop this worker's entries affected by a write"""
+        for tier in (self.documents, self.responses):
+            tier.invalidate(collection_tag(collection_name))
+            for document_id in document_ids:
+                tier.invalidate(document_tag(collection_name, document_id))
+
+    async def invalidate(self, collection_name: str, document_id: Optional[str] = None):
+        """Invalidate entries affected by a write, here and on every other worker"""
+        await self.invalidate_many(collection_name, [document_id] if document_id is not None else [])
+
+    async def invalidate_many(self, collection_name: str, document_ids: List[str]):
+        """Invalidate entries affected by a batch of writes, with one message to the other workers"""
+        self.evict(collection_name, document_ids)
+        if self.backplane is not None:
+            await self.backplane.publish(CACHE_CHANNEL, {
+                "origin": self.worker_id,
+                "collection": collection_name,
+                "document_ids": document_ids
+            })
+
+    async def handle_remote_invalidation(self, channel: str, message: dict):
+        """Apply an invalidation published by another worker"""
+        if message.get("origin") != self.worker_id:
+            self.evict(message["collection"], message.get("document_ids", ()))
+
+    def stats(self) -> dict:
+        """Counters for both tiers"""
+        return {"documents": self.documents.stats(), "responses": self.responses.stats()}
+
+# Global read cache
+read_cache = ReadCache()
@@ -0,0 +1,38 @@
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+# Cache-Control for data that only changes with a deploy
+STATIC_CACHE_CONTROL = "public, max-age=300"
+# Cache-Control for data that changes at any time: clients must revalidate, which is cheap with an ETag
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+def make_etag(*versions) -> str:
+    """Weak ETag over whatever versions a response"""
+    digest = hashlib.blake2b(repr(versions).encode(), digest_size=8).hexdigest()
+    return f'W/"{digest}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match already names this ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison: W/ prefixes don't matter for GET revalidation
+    candidates = {candidate.strip().removeprefix("W/") for candidate in header.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+def not_modified(etag: str, cache_control: Optional[str] = None) -> Response:
+    """Empty 304 telling the client its copy is still current"""
+    headers = {"ETag": etag}
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    return Response(status_code=304, headers=headers)
+
+def set_validators(response: Response, etag: str, cache_control: Optional[str] = None):
+    """Attach the ETag and Cache-Control headers to a full response"""
+    response.headers["ETag"] = etag
+    if cache_control:
+        response.headers["Cache-Control"] = cache_control
@@ -1,17 +1,11 @@
-from motor.motor_asyncio import AsyncIOMotorClient
-from typing import List, Optional
-from dotenv import load_dotenv
-from pathlib import Path
-import os
+from typing import Dict, List, Optional, Tuple
+from pymongo import ASCENDING, ReturnDocument
+import base64
+import binascii
+import json
 
-# Load environment variables
-ROOT_DIR = Path(__file__).parent.parent
-load_dotenv(ROOT_DIR / '.env')
-
-# Database connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Database connection, shared with the rest of the app
+from services.mongo import db
 
 # Collections
 players_collection = db.players
@@ -19,6 +13,42 @@ teams_collection = db.teams
 auctions_collection = db.auctions
 leagues_collection = db.leagues
 users_collection = db.users
+auction_results_collection = db.auction_results
+league_memberships_collection = db.league_memberships
+performance_events_collection = db.performance_events
+league_standings_collection = db.league_standings
+auction_bids_collection = db.auction_bids
+
+# Lean projections used by list endpoints when no fields are requested
+PLAYER_SUMMARY_PROJECTION = {"image_url": 0}  # inline base64 images can be several KB each
+
+def parse_fields(fields: Optional[str], default: Optional[Dict[str, int]] = None) -> Optional[Dict[str, int]]:
+    """Turn a comma-separated fields= query parameter into a projection"""
+    if not fields:
+        return default
+    projection = {field.strip(): 1 for field in fields.split(",") if field.strip()}
+    # Documents are always addressable by id
+    projection["id"] = 1
+    return projection
+
+# Largest page a list endpoint will return
+MAX_PAGE_SIZE = 500
+
+def encode_cursor(last_id: str) -> str:
+    """Opaque cursor pointing just after a document id"""
+    return base64.urlsafe_b64encode(json.dumps({"id": last_id}).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> str:
+    """Get the document id a cursor points after; ValueError if it's malformed"""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return str(data["id"])
+    except (binascii.Error, ValueError, TypeError, KeyError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def without_object_id(projection: Optional[Dict[str, int]]) -> Dict[str, int]:
+    """Add the _id exclusion every read uses to a projection"""
+    return {**(projection or {}), "_id": 0}
 
 class DatabaseService:
     @staticmethod
@@ -28,21 +58,46 @@ class DatabaseService:
         return str(result.inserted_id)
     
     @staticmethod
-    async def get_document(collection, document_id: str) -> Optional[dict]:
-        """Get a document by ID"""
-        document = await collection.find_one({"id": document_id})
-        if document:
-            document.pop('_id', None)
-        return document
+    async def get_document(collection, document_id: str, projection: Optional[Dict[str, int]] = None) -> Optional[dict]:
+        """Get a document by ID, optionally only the projected fields"""
+        return await collection.find_one({"id": document_id}, without_object_id(projection))
     
     @staticmethod
-    async def get_documents(collection, filter_dict: dict = {}, limit: int = 100) -> List[dict]:
-        """Get multiple documents with optional filtering"""
-        cursor = collection.find(filter_dict).limit(limit)
-        documents = await cursor.to_list(length=limit)
-        for doc in documents:
-            doc.pop('_id', None)
-        return documents
+    async def get_documents(
+        collection,
+        filter_dict: dict = {},
+        limit: int = 100,
+        projection: Optional[Dict[str, int]] = None
+    ) -> List[dict]:
+        """Get multiple documents with optional filtering and projection"""
+        cursor = collection.find(filter_dict, without_object_id(projection)).limit(limit)
+        return await cursor.to_list(length=limit)
+    
+    @staticmethod
+    async def get_page(
+        collection,
+        filter_dict: dict = {},
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        projection: Optional[Dict[str, int]] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Get one page of documents in id order and the cursor of the next page, if any
+
+        Pages seek past the last id through the index instead of skipping, so
+        every page costs the same however deep it is.
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        if cursor:
+            after = {"id": {"$gt": decode_cursor(cursor)}}
+            filter_dict = {"$and": [filter_dict, after]} if filter_dict else after
+        
+        # One extra document tells whether another page follows
+        query = collection.find(filter_dict, without_object_id(projection)).sort("id", ASCENDING).limit(limit + 1)
+        documents = await query.to_list(length=limit + 1)
+        if len(documents) > limit:
+            documents = documents[:limit]
+            return documents, encode_cursor(documents[-1]["id"])
+        return documents, None
     
     @staticmethod
     async def update_document(collection, document_id: str, update_data: dict) -> bool:
@@ -53,20 +108,33 @@ class DatabaseService:
         )
         return result.modified_count > 0
     
+    @staticmethod
+    async def find_and_update(
+        collection,
+        filter_dict: dict,
+        update: dict,
+        projection: Optional[Dict[str, int]] = None
+    ) -> Optional[dict]:
+        """Atomically apply an update to the first matching document and return it as updated, or None if none matched"""
+        return await collection.find_one_and_update(
+            filter_dict,
+            update,
+            projection=without_object_id(projection),
+            return_document=ReturnDocument.AFTER
+        )
+    
+    @staticmethod
+    async def update_and_get(
+        collection,
+        document_id: str,
+        update_data: dict,
+        projection: Optional[Dict[str, int]] = None
+    ) -> Optional[dict]:
+        """Update a document by ID and return it as updated in the same round trip, or None if it doesn't exist"""
+        return await DatabaseService.find_and_update(collection, {"id": document_id}, {"$set": update_data}, projection)
+    
     @staticmethod
     async def delete_document(collection, document_id: str) -> bool:
         """Delete a document by ID"""
         result = await collection.delete_one({"id": document_id})
         return result.deleted_count > 0
-    
-    @staticmethod
-    async def search_documents(collection, search_query: str, fields: List[str], limit: int = 20) -> List[dict]:
-        """Search documents by text in specified fields"""
-        regex_query = {"$regex": search_query, "$options": "i"}
-        or_conditions = [{field: regex_query} for field in fields]
-        
-        cursor = collection.find({"$or": or_conditions}).limit(limit)
-        documents = await cursor.to_list(length=limit)
-        for doc in documents:
-            doc.pop('_id', None)
-        return documents
\ No newline at end of file
@@ -0,0 +1,43 @@
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+class IdempotencyTable:
+    """Bounded, expiring table of operation outcomes keyed by client-supplied IDs"""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 120.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # Outcomes in insertion order: {key: (expires_at, outcome)}
+        self.entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get the recorded outcome for a key, if it hasn't expired"""
+        entry = self.entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: str, outcome: Any):
+        """Record the outcome for a key, evicting expired and overflow entries"""
+        now = time.monotonic()
+        self.entries[key] = (now + self.ttl_seconds, outcome)
+        self.entries.move_to_end(key)
+
+        # TTL is fixed, so the oldest insertions expire first
+        while self.entries:
+            oldest_key, (expires_at, _) = next(iter(self.entries.items()))
+            if expires_at > now and len(self.entries) <= self.max_entries:
+                break
+            del self.entries[oldest_key]
+
+    def discard(self, key: str):
+        """Forget the outcome recorded for a key"""
+        self.entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self.entries)
@@ -0,0 +1,193 @@
+from bisect import bisect_left, insort
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+# Target sublist length; a sublist splits at twice this
+LOAD_FACTOR = 512
+
+# Fraction of a board changing at once above which re-sorting it beats updating entries one by one
+REBUILD_FRACTION = 0.25
+
+class RankedList:
+    """Sorted list with O(log n) insert, removal, rank and positional lookups
+
+    Keys live in short sorted sublists with a Fenwick tree over their
+    lengths, so an update shifts at most one short list and a rank is a
+    bisect plus a prefix sum.
+    """
+
+    def __init__(self, keys: Iterable = ()):
+        self.rebuild(sorted(keys))
+
+    def __len__(self) -> int:
+        return self.size
+
+    def rebuild(self, keys: List):
+        """Replace the contents with already sorted keys"""
+        self.lists: List[List] = [keys[start:start + LOAD_FACTOR] for start in range(0, len(keys), LOAD_FACTOR)]
+        self.maxes: List = [sublist[-1] for sublist in self.lists]
+        self.size = len(keys)
+        self.build_tree()
+
+    def build_tree(self):
+        """Rebuild the Fenwick tree over sublist lengths, after sublists are added or dropped"""
+        tree = [0] + [len(sublist) for sublist in self.lists]
+        for index in range(1, len(tree)):
+            parent = index + (index & -index)
+            if parent < len(tree):
+                tree[parent] += tree[index]
+        self.tree = tree
+
+    def tree_add(self, position: int, delta: int):
+        index = position + 1
+        while index < len(self.tree):
+            self.tree[index] += delta
+            index += index & -index
+
+    def count_before(self, position: int) -> int:
+        """Keys in the sublists before a position"""
+        total = 0
+        while position > 0:
+            total += self.tree[position]
+            position -= position & -position
+        return total
+
+    def add(self, key):
+        if not self.lists:
+            self.rebuild([key])
+            return
+        position = bisect_left(self.maxes, key)
+        if position == len(self.maxes):
+            position -= 1
+            self.lists[position].append(key)
+            self.maxes[position] = key
+        else:
+            insort(self.lists[position], key)
+        self.size += 1
+
+        sublist = self.lists[position]
+        if len(sublist) > 2 * LOAD_FACTOR:
+            upper = sublist[LOAD_FACTOR:]
+            del sublist[LOAD_FACTOR:]
+            self.lists.insert(position + 1, upper)
+            self.maxes[position] = sublist[-1]
+            self.maxes.insert(position + 1, upper[-1])
+            self.build_tree()
+        else:
+            self.tree_add(position, 1)
+
+    def remove(self, key):
+        """Remove a key; KeyError if it isn't present"""
+        position = bisect_left(self.maxes, key)
+        sublist = self.lists[position] if position < len(self.lists) else []
+        index = bisect_left(sublist, key)
+        if index == len(sublist) or sublist[index] != key:
+            raise KeyError(key)
+        del sublist[index]
+        self.size -= 1
+        if sublist:
+            self.maxes[position] = sublist[-1]
+            self.tree_add(position, -1)
+        else:
+            del self.lists[position]
+            del self.maxes[position]
+            self.build_tree()
+
+    def rank(self, key) -> int:
+        """How many keys sort before a key"""
+        position = bisect_left(self.maxes, key)
+        if position == len(self.maxes):
+            return self.size
+        return self.count_before(position) + bisect_left(self.lists[position], key)
+
+    def locate(self, index: int) -> Tuple[int, int]:
+        """(sublist, offset) of the key at an index, by descending the Fenwick tree"""
+        position = 0
+        step = 1 << (len(self.lists).bit_length() - 1) if self.lists else 0
+        while step:
+            candidate = position + step
+            if candidate < len(self.tree) and self.tree[candidate] <= index:
+                position = candidate
+                index -= self.tree[candidate]
+            step >>= 1
+        return position, index
+
+    def slice(self, start: int, stop: int) -> List:
+        """Keys from index start up to stop"""
+        start, stop = max(start, 0), min(stop, self.size)
+        if start >= stop:
+            return []
+        position, offset = self.locate(start)
+        keys: List = []
+        while len(keys) < stop - start:
+            keys.extend(self.lists[position][offset:offset + stop - start - len(keys)])
+            position, offset = position + 1, 0
+        return keys
+
+class Leaderboard:
+    """Members ranked by points, highest first, ties broken by member id"""
+
+    def __init__(self):
+        self.points: Dict[Hashable, float] = {}
+        self.ranking = RankedList()
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def __contains__(self, member: Hashable) -> bool:
+        return member in self.points
+
+    def set(self, member: Hashable, points: float):
+        previous = self.points.get(member)
+        if previous == points:
+            return
+        if previous is not None:
+            self.ranking.remove((-previous, member))
+        self.points[member] = points
+        self.ranking.add((-points, member))
+
+    def discard(self, member: Hashable):
+        previous = self.points.pop(member, None)
+        if previous is not None:
+            self.ranking.remove((-previous, member))
+
+    def update(self, changes: Dict[Hashable, Optional[float]]):
+        """Apply many members' new points (None removes), re-sorting instead if most of the board moved"""
+        if len(changes) <= REBUILD_FRACTION * max(len(self.points), 1):
+            for member, points in changes.items():
+                if points is None:
+                    self.discard(member)
+                else:
+                    self.set(member, points)
+            return
+        for member, points in changes.items():
+            if points is None:
+                self.points.pop(member, None)
+            else:
+                self.points[member] = points
+        self.ranking.rebuild(sorted((-points, member) for member, points in self.points.items()))
+
+    def rank(self, member: Hashable) -> Optional[int]:
+        """A member's 1-based rank, or None if it isn't on the board"""
+        points = self.points.get(member)
+        if points is None:
+            return None
+        return self.ranking.rank((-points, member)) + 1
+
+    def entries(self, start: int, stop: int) -> List[dict]:
+        """Ranked entries from 0-based position start up to stop"""
+        start = max(start, 0)
+        return [
+            {"rank": start + offset + 1, "id": member, "points": -negated}
+            for offset, (negated, member) in enumerate(self.ranking.slice(start, stop))
+        ]
+
+    def top(self, k: int) -> List[dict]:
+        return self.entries(0, k)
+
+    def around(self, member: Hashable, window: int) -> Optional[List[dict]]:
+        """The entries up to window places either side of a member, or None if it isn't on the board"""
+        rank = self.rank(member)
+        if rank is None:
+            return None
+        start = max(rank - 1 - window, 0)
+        return self.entries(start, rank + window)
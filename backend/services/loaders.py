@@ -0,0 +1,146 @@
+import asyncio
+from typing import Any, Awaitable, Dict, Iterable, List, Optional, Set
+
+from services.database import (
+    players_collection, teams_collection, leagues_collection, users_collection,
+    league_memberships_collection, PLAYER_SUMMARY_PROJECTION, without_object_id
+)
+from services.cache import ReadCache, read_cache
+
+# Most keys sent in one $in query
+MAX_BATCH_SIZE = 1000
+
+class DataLoader:
+    """Coalesces the lookups made in one event loop turn into a single $in query
+
+    Results are memoized for the loader's lifetime, so a loader should live
+    for one request: an id asked for twice is fetched once, and never served
+    stale to a later request. Given a cache, lookups by id are served from its
+    document tier first and only the misses are queried.
+    """
+
+    def __init__(
+        self,
+        collection,
+        key: str = "id",
+        projection: Optional[Dict[str, int]] = None,
+        many: bool = False,
+        cache: Optional[ReadCache] = None
+    ):
+        self.collection = collection
+        self.key = key
+        self.cache_projection = projection
+        self.projection = without_object_id(projection)
+        # Whether a key maps to a list of documents rather than one
+        self.many = many
+        # Only single documents looked up by id share the read cache's keys
+        self.cache = cache if key == "id" and not many else None
+        # Memoized lookups: {key: future of the document(s)}
+        self.futures: Dict[Any, asyncio.Future] = {}
+        self.pending: List[Any] = []
+        self.tasks: Set[asyncio.Task] = set()
+        self.queries = 0
+
+    def load(self, key: Any) -> Awaitable[Any]:
+        """Get the document for a key (a list of them if many), or None"""
+        future = self.futures.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self.futures[key] = loop.create_future()
+            if not self.pending:
+                # Everything else asked for before the loop comes back round joins this batch
+                loop.call_soon(self.dispatch_soon)
+            self.pending.append(key)
+        # Shielded, so one cancelled caller doesn't fail the others sharing the lookup
+        return asyncio.shield(future)
+
+    async def load_many(self, keys: Iterable[Any]) -> List[Any]:
+        """Get the documents for many keys, in order"""
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def dispatch_soon(self):
+        task = asyncio.ensure_future(self.dispatch())
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def dispatch(self):
+        """Fetch every pending key and resolve the lookups waiting on them"""
+        keys, self.pending = self.pending, []
+        for start in range(0, len(keys), MAX_BATCH_SIZE):
+            batch = keys[start:start + MAX_BATCH_SIZE]
+            found: Dict[Any, Any] = {}
+            if self.cache is not None:
+                found.update(self.cache.cached_documents(self.collection.name, batch, self.cache_projection))
+                generation = self.cache.documents.generation
+            missing = [key for key in batch if key not in found]
+            documents = []
+            if missing:
+                self.queries += 1
+                try:
+                    documents = await self.collection.find(
+                        {self.key: {"$in": missing}}, self.projection
+                    ).to_list(length=None)
+                except Exception as e:
+                    for key in missing:
+                        # Forget the failure, so a retry queries again
+                        self.futures.pop(key).set_exception(e)
+                    for key in batch:
+                        if key in found:
+                            self.futures[key].set_result(found[key])
+                    continue
+                if self.cache is not None:
+                    self.cache.remember_documents(self.collection.name, documents, self.cache_projection, generation)
+
+            for document in documents:
+                if self.many:
+                    found.setdefault(document[self.key], []).append(document)
+                else:
+                    found[document[self.key]] = document
+            for key in batch:
+                self.futures[key].set_result(found.get(key, [] if self.many else None))
+
+class Loaders:
+    """The loaders one request uses to resolve related teams, leagues, users and players"""
+
+    def __init__(self):
+        self.players = DataLoader(players_collection, projection=PLAYER_SUMMARY_PROJECTION, cache=read_cache)
+        self.teams = DataLoader(teams_collection, cache=read_cache)
+        self.leagues = DataLoader(leagues_collection, cache=read_cache)
+        self.users = DataLoader(users_collection, cache=read_cache)
+        # League id -> its memberships
+        self.league_members = DataLoader(
+            league_memberships_collection, key="league_id", projection={"league_id": 1, "team_id": 1}, many=True
+        )
+
+    @property
+    def queries(self) -> int:
+        """Database queries made so far"""
+        return sum(
+            loader.queries
+            for loader in (self.players, self.teams, self.leagues, self.users, self.league_members)
+        )
+
+def get_loaders() -> Loaders:
+    """Dependency giving each request its own loaders"""
+    return Loaders()
+
+async def expand_team(loaders: Loaders, team: dict) -> dict:
+    """A team with each roster entry's player document alongside it"""
+    roster = team.get("players") or []
+    players = await loaders.players.load_many(entry["player_id"] for entry in roster)
+    return {**team, "players": [{**entry, "player": player} for entry, player in zip(roster, players)]}
+
+async def expand_teams(loaders: Loaders, team_ids: Iterable[str]) -> List[dict]:
+    """Expanded teams for some ids, skipping any that no longer exist"""
+    teams = await loaders.teams.load_many(team_ids)
+    # Gathered, so every team's players are fetched in one query
+    return list(await asyncio.gather(*(expand_team(loaders, team) for team in teams if team)))
+
+async def expand_league(loaders: Loaders, league: dict) -> dict:
+    """A league with its member teams, each with its players"""
+    members = await loaders.league_members.load(league["id"])
+    return {**league, "teams": await expand_teams(loaders, [member["team_id"] for member in members])}
+
+async def expand_user(loaders: Loaders, user: dict) -> dict:
+    """A user with their teams, each with its players"""
+    return {**user, "teams": await expand_teams(loaders, user.get("team_ids") or [])}
@@ -0,0 +1,438 @@
+"""Streaming ingestion of ball-by-ball match feeds into player stats
+
+Feeds are newline-delimited JSON, one ball per line:
+
+    {"match_id": "m1", "batter_id": "player-1", "bowler_id": "player-9", "runs": 4,
+     "extras": 0, "extra_type": null,
+     "wicket": {"player_out_id": "player-1", "kind": "caught", "fielder_id": "player-12"}}
+
+extra_type is one of wide, no_ball, bye or leg_bye, and a line
+{"match_id": "m1", "type": "match_end"} closes a match. Balls are read from
+files or from any number of local socket connections (one per match, say),
+folded into per-player counters in memory, and flushed to the players
+collection every FLUSH_INTERVAL as one write per touched player, however
+many balls touched it. The same balls feed fantasy scoring.
+
+    cd backend && python -m services.match_feed --file feed.ndjson
+    cd backend && python -m services.match_feed --listen 127.0.0.1:7500
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import uuid
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from pymongo import UpdateOne
+
+from models.scoring import PerformanceEvent
+from services.scoring import ScoringEngine
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FEED_PORT = 7500
+
+# Lines buffered between the sources and the folder; a full queue makes sources wait
+QUEUE_SIZE = 10_000
+
+# Seconds between flushes, and touched players that bring one forward
+FLUSH_INTERVAL = 1.0
+FLUSH_MAX_PLAYERS = 1_000
+
+# Bytes read from a feed file per read, and seconds between polls of a followed file
+READ_CHUNK_BYTES = 1 << 20
+FOLLOW_POLL_INTERVAL = 0.5
+
+# Dismissals credited to the bowler
+BOWLER_DISMISSALS = {"bowled", "caught", "caught and bowled", "lbw", "stumped", "hit wicket"}
+
+# Counters that move average and strike rate, and economy
+BATTING_COUNTERS = {"runs", "balls_faced", "dismissals"}
+BOWLING_COUNTERS = {"balls_bowled", "runs_conceded"}
+# Counters a player's history must be backfilled into (see migrations); a match alone can't start them
+BACKFILLED_COUNTERS = {"balls_faced", "dismissals", "balls_bowled", "runs_conceded"}
+
+def counter(name: str) -> dict:
+    """A stats counter in an update pipeline, zero if the player has none yet"""
+    return {"$ifNull": [f"$stats.{name}", 0]}
+
+def has_counter(name: str) -> dict:
+    """Whether the player has a stats counter, in an update pipeline"""
+    return {"$ne": [{"$ifNull": [f"$stats.{name}", None]}, None]}
+
+def counter_after(name: str, deltas: Dict[str, int]) -> dict:
+    """A stats counter with this flush's delta added, in an update pipeline"""
+    return {"$add": [counter(name), deltas.get(name, 0)]}
+
+def increment(name: str, deltas: Dict[str, int]) -> dict:
+    """Add a counter's delta, leaving a missing backfilled counter missing for the backfill to estimate"""
+    if name in BACKFILLED_COUNTERS:
+        return {"$cond": [has_counter(name), counter_after(name, deltas), "$$REMOVE"]}
+    return counter_after(name, deltas)
+
+def ratio(numerator, denominator: dict, scale: float, otherwise) -> dict:
+    """numerator * scale / denominator to 2 places, or otherwise when the denominator is zero"""
+    return {"$cond": [
+        {"$gt": [denominator, 0]},
+        {"$round": [{"$divide": [{"$multiply": [numerator, scale]}, denominator]}, 2]},
+        otherwise,
+    ]}
+
+def derived(field: str, numerator: str, denominator: str, deltas: Dict[str, int], scale: float, otherwise) -> dict:
+    """A ratio of two counters after this flush, or the stored field while the player lacks the denominator"""
+    return {"$cond": [
+        has_counter(denominator),
+        ratio(counter_after(numerator, deltas), counter_after(denominator, deltas), scale, otherwise),
+        f"$stats.{field}",
+    ]}
+
+def as_int(value) -> dict:
+    """An int in an update pipeline, zero if the value doesn't parse"""
+    return {"$convert": {"input": value, "to": "int", "onError": 0, "onNull": 0}}
+
+def best_figures_stage(wickets: int, runs: int) -> dict:
+    """Pipeline stage keeping the better of a player's best figures ("4/20") and a finished match's"""
+    best = {"$split": [{"$ifNull": ["$stats.best_figures", "0/0"]}, "/"]}
+    return {"$set": {"stats.best_figures": {"$let": {
+        "vars": {"best": best},
+        "in": {"$let": {
+            "vars": {
+                "wickets": as_int({"$arrayElemAt": ["$$best", 0]}),
+                "runs": as_int({"$arrayElemAt": ["$$best", 1]}),
+            },
+            "in": {"$cond": [
+                {"$or": [
+                    {"$gt": [wickets, "$$wickets"]},
+                    {"$and": [{"$eq": [wickets, "$$wickets"]}, {"$lt": [runs, "$$runs"]}]},
+                ]},
+                f"{wickets}/{runs}",
+                "$stats.best_figures",
+            ]},
+        }},
+    }}}}
+
+def better_figures(first: Optional[Tuple[int, int]], second: Tuple[int, int]) -> Tuple[int, int]:
+    """The better of two (wickets, runs) bowling figures"""
+    if first is None:
+        return second
+    return min(first, second, key=lambda figures: (-figures[0], figures[1]))
+
+class LiveMatch:
+    """What a match in progress needs remembered beyond the current flush"""
+
+    def __init__(self):
+        self.players: Set[str] = set()
+        # Each batter's runs so far, for fifties and centuries
+        self.innings_runs: Dict[str, int] = {}
+        # Each bowler's (wickets, runs conceded) so far
+        self.figures: Dict[str, List[int]] = {}
+
+class StatFolder:
+    """Folds balls into pending per-player counter deltas until they're taken for a flush"""
+
+    def __init__(self):
+        self.matches: Dict[str, LiveMatch] = {}
+        self.reset()
+        self.balls = 0
+        self.rejected = 0
+
+    def reset(self):
+        # Counter deltas: {player_id: {counter: delta}}
+        self.counters: Dict[str, Dict[str, int]] = {}
+        # Fantasy stat deltas: {(match_id, player_id): {stat: delta}}
+        self.scoring: Dict[Tuple[str, str], Dict[str, int]] = {}
+        # Best figures of bowlers whose matches finished: {player_id: (wickets, runs)}
+        self.figures: Dict[str, Tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        """Players with pending changes"""
+        return len(self.counters.keys() | self.figures.keys())
+
+    def add(self, player_id: str, name: str, delta: int = 1):
+        counters = self.counters.setdefault(player_id, {})
+        counters[name] = counters.get(name, 0) + delta
+
+    def score(self, match_id: str, player_id: str, stat: str, delta: int = 1):
+        stats = self.scoring.setdefault((match_id, player_id), {})
+        stats[stat] = stats.get(stat, 0) + delta
+
+    def appear(self, match: LiveMatch, player_id: str):
+        """Count a match for a player the first time they feature in it"""
+        if player_id not in match.players:
+            match.players.add(player_id)
+            self.add(player_id, "matches")
+
+    def fold_line(self, line: str):
+        """Fold one feed line, counting it as rejected if it isn't a ball or match end"""
+        try:
+            self.fold(json.loads(line))
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            self.rejected += 1
+            logger.warning(f"Rejected feed line {line[:200]!r}: {e}")
+
+    def fold(self, ball: dict):
+        match_id = ball["match_id"]
+        if ball.get("type") == "match_end":
+            self.finish(match_id)
+            return
+
+        match = self.matches.setdefault(match_id, LiveMatch())
+        batter, bowler = ball["batter_id"], ball["bowler_id"]
+        runs, extras = int(ball.get("runs") or 0), int(ball.get("extras") or 0)
+        extra_type = ball.get("extra_type")
+        self.appear(match, batter)
+        self.appear(match, bowler)
+
+        if extra_type != "wide":
+            self.add(batter, "balls_faced")
+        if runs:
+            self.add(batter, "runs", runs)
+            self.score(match_id, batter, "runs", runs)
+            before = match.innings_runs.get(batter, 0)
+            after = match.innings_runs[batter] = before + runs
+            if before < 50 <= after:
+                self.add(batter, "fifties")
+            if before < 100 <= after:
+                # A hundred counts as a century, not also a fifty
+                self.add(batter, "centuries")
+                self.add(batter, "fifties", -1)
+            boundary = {4: "fours", 6: "sixes"}.get(runs)
+            if boundary:
+                self.add(batter, boundary)
+                self.score(match_id, batter, boundary)
+
+        figures = match.figures.setdefault(bowler, [0, 0])
+        if extra_type not in ("wide", "no_ball"):
+            self.add(bowler, "balls_bowled")
+        # Byes and leg byes aren't the bowler's
+        conceded = runs + (extras if extra_type in ("wide", "no_ball") else 0)
+        if conceded:
+            self.add(bowler, "runs_conceded", conceded)
+            figures[1] += conceded
+
+        wicket = ball.get("wicket")
+        if wicket:
+            out = wicket.get("player_out_id") or batter
+            kind = wicket.get("kind") or "bowled"
+            self.appear(match, out)
+            self.add(out, "dismissals")
+            if kind in BOWLER_DISMISSALS:
+                self.add(bowler, "wickets")
+                self.score(match_id, bowler, "wickets")
+                figures[0] += 1
+            fielder = wicket.get("fielder_id") or (bowler if kind == "caught and bowled" else None)
+            fielding = {"caught": "catches", "caught and bowled": "catches", "stumped": "stumpings",
+                        "run out": "run_outs"}.get(kind)
+            if fielder and fielding:
+                self.appear(match, fielder)
+                self.add(fielder, fielding)
+                self.score(match_id, fielder, fielding)
+        self.balls += 1
+
+    def finish(self, match_id: str):
+        """Forget a finished match, keeping its bowlers' figures for their best"""
+        match = self.matches.pop(match_id, None)
+        if match is None:
+            return
+        for bowler, (wickets, runs) in match.figures.items():
+            if wickets:
+                self.figures[bowler] = better_figures(self.figures.get(bowler), (wickets, runs))
+
+    def take(self) -> Tuple[Dict[str, UpdateOne], List[dict]]:
+        """The pending changes as one update per player plus fantasy events, starting afresh"""
+        now = datetime.utcnow()
+        operations: Dict[str, UpdateOne] = {}
+        for player_id in self.counters.keys() | self.figures.keys():
+            deltas = {name: delta for name, delta in self.counters.get(player_id, {}).items() if delta}
+            changes = {f"stats.{name}": increment(name, deltas) for name in deltas}
+            # Derived fields are recomputed from the totals, and only where their inputs moved. They
+            # share the counters' stage, so they see which counters the player had before this flush
+            if deltas.keys() & BATTING_COUNTERS:
+                changes["stats.average"] = derived(
+                    "average", "runs", "dismissals", deltas, 1, counter_after("runs", deltas)
+                )
+                changes["stats.strike_rate"] = derived("strike_rate", "runs", "balls_faced", deltas, 100, 0.0)
+            if deltas.keys() & BOWLING_COUNTERS:
+                changes["stats.economy"] = derived("economy", "runs_conceded", "balls_bowled", deltas, 6, None)
+            pipeline = [{"$set": {**changes, "updated_at": now}}]
+            if player_id in self.figures:
+                pipeline.append(best_figures_stage(*self.figures[player_id]))
+            operations[player_id] = UpdateOne({"id": player_id}, pipeline)
+
+        events = [
+            {"match_id": match_id, "player_id": player_id, **stats}
+            for (match_id, player_id), stats in self.scoring.items()
+        ]
+        self.reset()
+        return operations, events
+
+class MatchFeedIngester:
+    """Reads feed lines from any number of sources and flushes their stats in batches"""
+
+    def __init__(self, players, events, engine: Optional[ScoringEngine] = None, cache=None):
+        self.players = players
+        self.events = events
+        self.engine = engine
+        self.cache = cache
+        self.folder = StatFolder()
+        self.queue: asyncio.Queue = asyncio.Queue(QUEUE_SIZE)
+        self.flush_due = asyncio.Event()
+        self.writes = 0
+        self.players_written = 0
+
+    async def pump(self, lines: AsyncIterator[str]):
+        """Feed a source's lines into the queue"""
+        async for line in lines:
+            if line.strip():
+                await self.queue.put(line)
+
+    async def consume(self):
+        """Fold queued lines as they arrive"""
+        while True:
+            line = await self.queue.get()
+            self.folder.fold_line(line)
+            self.queue.task_done()
+            if len(self.folder) >= FLUSH_MAX_PLAYERS:
+                self.flush_due.set()
+
+    async def flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.flush_due.wait(), FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self.flush_due.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Write pending stat changes, one update per touched player, and score their events"""
+        operations, events = self.folder.take()
+        if operations:
+            try:
+                await self.players.bulk_write(list(operations.values()), ordered=False)
+                self.writes += 1
+                self.players_written += len(operations)
+            except Exception as e:
+                # Counter updates aren't idempotent, so a failed batch is reported rather than retried
+                logger.error(f"Error writing stats for {len(operations)} players: {e}")
+            if self.cache is not None:
+                await self.cache.invalidate_many("players", list(operations))
+        if events:
+            documents = [PerformanceEvent(**event).dict() for event in events]
+            try:
+                await self.events.insert_many(documents)
+            except Exception as e:
+                logger.error(f"Error recording {len(documents)} performance events: {e}")
+                return
+            if self.engine is not None:
+                await self.engine.record(documents)
+
+    async def run(self, sources: List[AsyncIterator[str]]):
+        """Ingest sources until they're all exhausted, then flush what's left"""
+        consumer = asyncio.create_task(self.consume())
+        flusher = asyncio.create_task(self.flush_loop())
+        try:
+            await asyncio.gather(*(self.pump(source) for source in sources))
+            await self.queue.join()
+        finally:
+            consumer.cancel()
+            flusher.cancel()
+            await asyncio.gather(consumer, flusher, return_exceptions=True)
+            await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "balls": self.folder.balls,
+            "rejected": self.folder.rejected,
+            "live_matches": len(self.folder.matches),
+            "writes": self.writes,
+            "players_written": self.players_written,
+            "balls_per_player_write": (
+                round(self.folder.balls / self.players_written, 2) if self.players_written else 0.0
+            ),
+        }
+
+async def file_lines(path: str, follow: bool = False) -> AsyncIterator[str]:
+    """A feed file's lines, read off the event loop; with follow, wait for more like tail -f"""
+    partial = ""
+    with open(path) as feed:
+        while True:
+            lines = await asyncio.to_thread(feed.readlines, READ_CHUNK_BYTES)
+            if not lines:
+                if not follow:
+                    break
+                await asyncio.sleep(FOLLOW_POLL_INTERVAL)
+                continue
+            lines[0] = partial + lines[0]
+            # A followed file's last line may still be being written
+            partial = lines.pop() if follow and not lines[-1].endswith("\n") else ""
+            for line in lines:
+                yield line
+    if partial:
+        yield partial
+
+async def socket_lines(reader: asyncio.StreamReader) -> AsyncIterator[str]:
+    """A socket connection's lines until the feed disconnects"""
+    async for line in reader:
+        yield line.decode()
+
+async def serve_feeds(ingester: MatchFeedIngester, host: str, port: int):
+    """Accept feed connections and ingest each until it disconnects, forever"""
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            await ingester.pump(socket_lines(reader))
+        finally:
+            writer.close()
+
+    consumer = asyncio.create_task(ingester.consume())
+    flusher = asyncio.create_task(ingester.flush_loop())
+    server = await asyncio.start_server(handle, host, port)
+    logger.info(f"Listening for match feeds on {host}:{port}")
+    try:
+        async with server:
+            while True:
+                await asyncio.sleep(60)
+                logger.info(f"Match feed: {ingester.stats()}")
+    finally:
+        consumer.cancel()
+        flusher.cancel()
+        await ingester.flush()
+
+async def main(files: List[str], follow: bool, listen: Optional[str]):
+    from services.backplane import create_backplane
+    from services.cache import read_cache
+    from services.mongo import db, close_client
+    from services.scoring import scoring_engine
+
+    # Score updates and cache invalidations reach the API workers over the backplane
+    backplane = create_backplane(os.environ.get("BACKPLANE_URL"))
+    await backplane.start()
+    worker_id = f"match_feed_{uuid.uuid4().hex[:8]}"
+    await scoring_engine.start(backplane, worker_id)
+    await read_cache.start(backplane, worker_id)
+
+    ingester = MatchFeedIngester(db.players, db.performance_events, scoring_engine, read_cache)
+    try:
+        if listen:
+            host, _, port = listen.rpartition(":")
+            await serve_feeds(ingester, host or "127.0.0.1", int(port or DEFAULT_FEED_PORT))
+        else:
+            await ingester.run([file_lines(path, follow) for path in files])
+    finally:
+        print(f"Match feed: {ingester.stats()}")
+        await backplane.close()
+        close_client()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest ball-by-ball match feeds into player stats")
+    parser.add_argument("--file", action="append", default=[], help="NDJSON feed file (repeatable)")
+    parser.add_argument("--follow", action="store_true", help="Keep reading files as they grow")
+    parser.add_argument("--listen", help=f"host:port to accept feed connections on (e.g. 127.0.0.1:{DEFAULT_FEED_PORT})")
+    args = parser.parse_args()
+    if not args.file and not args.listen:
+        parser.error("give --file or --listen")
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    asyncio.run(main(args.file, args.follow, args.listen))
@@ -0,0 +1,76 @@
+from datetime import datetime
+from typing import List, Tuple
+
+from fastapi import HTTPException
+from pymongo.errors import DuplicateKeyError
+
+from services.database import DatabaseService
+
+def membership_document(league_id: str, team_id: str) -> dict:
+    """A team's membership of a league"""
+    return {
+        # Sorts by team within a league, for keyset pages of members
+        "id": f"{league_id}:{team_id}",
+        "league_id": league_id,
+        "team_id": team_id,
+        "joined_at": datetime.utcnow(),
+    }
+
+async def join_league(leagues, memberships, league_id: str, team_id: str) -> dict:
+    """Add a team to a league and return the league with its new member count
+
+    The membership insert is unique per (league_id, team_id), and the seat is
+    taken by a guarded increment of member_count, so a join costs O(1)
+    whatever the league's size and concurrent joins can neither duplicate a
+    team nor overfill the league.
+    """
+    try:
+        await memberships.insert_one(membership_document(league_id, team_id))
+    except DuplicateKeyError:
+        if not await DatabaseService.get_document(leagues, league_id, {"id": 1}):
+            raise HTTPException(status_code=404, detail="League not found")
+        raise HTTPException(status_code=400, detail="Team already joined league")
+
+    league = await DatabaseService.find_and_update(
+        leagues,
+        {
+            "id": league_id,
+            "$or": [
+                {"max_participants": None},
+                {"$expr": {"$lt": [{"$ifNull": ["$member_count", 0]}, "$max_participants"]}},
+            ],
+        },
+        {"$inc": {"member_count": 1}, "$set": {"updated_at": datetime.utcnow()}}
+    )
+    if league:
+        return league
+
+    # No seat: give the membership back
+    await memberships.delete_one({"league_id": league_id, "team_id": team_id})
+    if not await DatabaseService.get_document(leagues, league_id, {"id": 1}):
+        raise HTTPException(status_code=404, detail="League not found")
+    raise HTTPException(status_code=400, detail="League is full")
+
+async def leave_league(leagues, memberships, league_id: str, team_id: str) -> dict:
+    """Remove a team from a league and return the league with its new member count"""
+    result = await memberships.delete_one({"league_id": league_id, "team_id": team_id})
+    if not result.deleted_count:
+        if not await DatabaseService.get_document(leagues, league_id, {"id": 1}):
+            raise HTTPException(status_code=404, detail="League not found")
+        raise HTTPException(status_code=400, detail="Team not in league")
+
+    league = await DatabaseService.find_and_update(
+        leagues,
+        {"id": league_id},
+        {"$inc": {"member_count": -1}, "$set": {"updated_at": datetime.utcnow()}}
+    )
+    if not league:
+        raise HTTPException(status_code=404, detail="League not found")
+    return league
+
+async def league_team_ids(memberships, league_ids: List[str]) -> List[Tuple[str, str]]:
+    """(league_id, team_id) pairs for the members of some leagues, in league then team order"""
+    cursor = memberships.find(
+        {"league_id": {"$in": league_ids}}, {"_id": 0, "league_id": 1, "team_id": 1}
+    ).sort([("league_id", 1), ("team_id", 1)])
+    return [(membership["league_id"], membership["team_id"]) async for membership in cursor]
@@ -0,0 +1,264 @@
+import argparse
+import asyncio
+import logging
+from datetime import datetime
+from typing import Awaitable, Callable, List, Tuple
+
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from services.memberships import membership_document
+
+logger = logging.getLogger(__name__)
+
+# Applied migrations are recorded here: {"version", "name", "applied_at"}
+MIGRATIONS_COLLECTION = "schema_migrations"
+
+async def create_initial_indexes(db):
+    """Index the id lookups and the filters used by the list routes"""
+    await db.players.create_indexes([
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("role", ASCENDING)]),
+        IndexModel([("team", ASCENDING)]),
+        IndexModel([("is_hot_pick", ASCENDING)]),
+    ])
+    await db.teams.create_indexes([
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("owner_id", ASCENDING)]),
+    ])
+    await db.leagues.create_indexes([
+        IndexModel([("id", ASCENDING)], unique=True),
+        # Only private leagues have a code
+        IndexModel([("code", ASCENDING)], unique=True, partialFilterExpression={"code": {"$type": "string"}}),
+        IndexModel([("type", ASCENDING), ("status", ASCENDING)]),
+        IndexModel([("status", ASCENDING)]),
+        IndexModel([("creator_id", ASCENDING)]),
+    ])
+    await db.auctions.create_indexes([
+        IndexModel([("id", ASCENDING)], unique=True),
+    ])
+    await db.users.create_indexes([
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("username", ASCENDING)]),
+        IndexModel([("email", ASCENDING)]),
+    ])
+
+    # Auction state store
+    await db.auction_rooms.create_indexes([IndexModel([("id", ASCENDING)], unique=True)])
+    await db.live_auctions.create_indexes([IndexModel([("room_id", ASCENDING)], unique=True)])
+    await db.auction_budgets.create_indexes([IndexModel([("user_id", ASCENDING)], unique=True)])
+
+async def drop_index_if_exists(collection, name: str):
+    """Drop an index, ignoring one that was never created"""
+    try:
+        await collection.drop_index(name)
+    except OperationFailure as e:
+        if e.code != 27:  # IndexNotFound
+            raise
+
+async def create_keyset_indexes(db):
+    """Extend the filter indexes with id so filtered pages seek instead of sorting"""
+    await db.players.create_indexes([
+        IndexModel([("role", ASCENDING), ("id", ASCENDING)]),
+        IndexModel([("team", ASCENDING), ("id", ASCENDING)]),
+        IndexModel([("is_hot_pick", ASCENDING), ("id", ASCENDING)]),
+    ])
+    await db.teams.create_indexes([
+        IndexModel([("owner_id", ASCENDING), ("id", ASCENDING)]),
+    ])
+    await db.leagues.create_indexes([
+        IndexModel([("type", ASCENDING), ("status", ASCENDING), ("id", ASCENDING)]),
+        IndexModel([("status", ASCENDING), ("id", ASCENDING)]),
+        IndexModel([("creator_id", ASCENDING), ("id", ASCENDING)]),
+    ])
+
+    # The new indexes cover every query the old prefixes served
+    for collection, name in [
+        (db.players, "role_1"), (db.players, "team_1"), (db.players, "is_hot_pick_1"),
+        (db.teams, "owner_id_1"),
+        (db.leagues, "type_1_status_1"), (db.leagues, "status_1"), (db.leagues, "creator_id_1"),
+    ]:
+        await drop_index_if_exists(collection, name)
+
+async def create_auction_result_indexes(db):
+    """Index finished auction results, which are saved by auction id"""
+    await db.auction_results.create_indexes([
+        IndexModel([("auction_id", ASCENDING)], unique=True),
+        IndexModel([("player_id", ASCENDING)]),
+    ])
+
+async def create_league_memberships(db):
+    """Move embedded league participants into an indexed membership collection with a member count"""
+    await db.league_memberships.create_indexes([
+        IndexModel([("league_id", ASCENDING), ("team_id", ASCENDING)], unique=True),
+        IndexModel([("league_id", ASCENDING), ("id", ASCENDING)]),
+        IndexModel([("team_id", ASCENDING)]),
+    ])
+
+    async for league in db.leagues.find({"participants": {"$exists": True}}, {"_id": 0, "id": 1, "participants": 1}):
+        for team_id in dict.fromkeys(league["participants"] or []):
+            membership = membership_document(league["id"], team_id)
+            await db.league_memberships.update_one(
+                {"league_id": league["id"], "team_id": team_id},
+                {"$setOnInsert": {"id": membership["id"], "joined_at": membership["joined_at"]}},
+                upsert=True
+            )
+        # Counted rather than taken from the array, so a rerun after a crash converges
+        member_count = await db.league_memberships.count_documents({"league_id": league["id"]})
+        await db.leagues.update_one(
+            {"id": league["id"]},
+            {"$set": {"member_count": member_count}, "$unset": {"participants": ""}}
+        )
+    await db.leagues.update_many({"member_count": {"$exists": False}}, {"$set": {"member_count": 0}})
+
+async def create_performance_event_indexes(db):
+    """Index recorded player performance events by player and match"""
+    await db.performance_events.create_indexes([
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("player_id", ASCENDING)]),
+        IndexModel([("match_id", ASCENDING)]),
+    ])
+
+async def create_league_standings_indexes(db):
+    """Index persisted league standings by league"""
+    await db.league_standings.create_indexes([IndexModel([("id", ASCENDING)], unique=True)])
+
+def estimated_count(total: str, rate: str, scale: int) -> dict:
+    """Estimate a counter as total * scale / rate from seeded stats, zero without a rate"""
+    return {"$cond": [
+        {"$gt": [f"$stats.{rate}", 0]},
+        {"$toInt": {"$round": [
+            {"$divide": [{"$multiply": [{"$ifNull": [f"$stats.{total}", 0]}, scale]}, f"$stats.{rate}"]}, 0
+        ]}},
+        0,
+    ]}
+
+async def backfill_player_stat_counters(db):
+    """Give players the counters that match feeds add to and derive averages from
+
+    Balls faced and dismissals are estimated from the seeded strike rate and
+    average. Seed data has no overs bowled, so bowling counters start at zero.
+    """
+    await db.players.update_many({"stats.balls_faced": {"$exists": False}}, [{"$set": {
+        "stats.balls_faced": estimated_count("runs", "strike_rate", 100),
+        "stats.dismissals": estimated_count("runs", "average", 1),
+        "stats.balls_bowled": {"$ifNull": ["$stats.balls_bowled", 0]},
+        "stats.runs_conceded": {"$ifNull": ["$stats.runs_conceded", 0]},
+    }}])
+
+async def create_auction_analytics_indexes(db):
+    """Index the bid log by auction and results by completion time, which analytics read from"""
+    await db.auction_bids.create_indexes([
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("auction_id", ASCENDING)]),
+    ])
+    await db.auction_results.create_indexes([IndexModel([("created_at", ASCENDING)])])
+
+# Ordered migrations: (version, name, migrate(db)); never renumber or edit an applied one
+MIGRATIONS: List[Tuple[int, str, Callable[..., Awaitable[None]]]] = [
+    (1, "initial_indexes", create_initial_indexes),
+    (2, "keyset_pagination_indexes", create_keyset_indexes),
+    (3, "auction_result_indexes", create_auction_result_indexes),
+    (4, "league_memberships", create_league_memberships),
+    (5, "performance_event_indexes", create_performance_event_indexes),
+    (6, "league_standings_indexes", create_league_standings_indexes),
+    (7, "player_stat_counters", backfill_player_stat_counters),
+    (8, "auction_analytics_indexes", create_auction_analytics_indexes),
+]
+
+# Queries the app runs, checked against their plans: (collection, filter)
+KNOWN_QUERIES: List[Tuple[str, dict]] = [
+    ("players", {"id": "player-1"}),
+    ("players", {"role": "Batsman"}),
+    ("players", {"team": "India"}),
+    ("players", {"is_hot_pick": True}),
+    ("teams", {"id": "team-1"}),
+    ("teams", {"owner_id": "user-1"}),
+    ("leagues", {"id": "league-1"}),
+    ("leagues", {"code": "ABC123"}),
+    ("leagues", {"type": "public", "status": "active"}),
+    ("leagues", {"status": "active"}),
+    ("leagues", {"creator_id": "user-1"}),
+    ("league_memberships", {"league_id": "league-1", "team_id": "team-1"}),
+    ("league_memberships", {"team_id": "team-1"}),
+    ("performance_events", {"player_id": "player-1"}),
+    ("auction_bids", {"auction_id": "auction-1"}),
+    ("auction_results", {"created_at": {"$gte": "2024-01-01"}}),
+    ("auctions", {"id": "auction-1"}),
+    ("users", {"id": "user-1"}),
+    ("users", {"username": "cricketfan"}),
+    ("users", {"email": "fan@example.com"}),
+]
+
+async def applied_versions(db) -> List[int]:
+    """Get the versions already applied to this database"""
+    documents = await db[MIGRATIONS_COLLECTION].find({}, {"_id": 0, "version": 1}).to_list(length=None)
+    return sorted(document["version"] for document in documents)
+
+async def run_migrations(db) -> List[int]:
+    """Apply pending migrations in order and return the versions applied"""
+    applied = set(await applied_versions(db))
+    ran = []
+    for version, name, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+        logger.info(f"Applying migration {version}: {name}")
+        # Migrations are idempotent, so workers starting together can't corrupt anything
+        await migrate(db)
+        await db[MIGRATIONS_COLLECTION].update_one(
+            {"version": version},
+            {"$setOnInsert": {"version": version, "name": name, "applied_at": datetime.utcnow()}},
+            upsert=True
+        )
+        ran.append(version)
+    return ran
+
+def plan_stages(plan: dict) -> List[dict]:
+    """Flatten a winning plan into its stages"""
+    stages = [plan]
+    for child in [plan.get("inputStage"), *plan.get("inputStages", [])]:
+        if child:
+            stages.extend(plan_stages(child))
+    return stages
+
+async def check_query_plans(db) -> List[dict]:
+    """Explain the known queries and report whether each one uses an index"""
+    report = []
+    for collection, query in KNOWN_QUERIES:
+        explanation = await db[collection].find(query).explain()
+        winning_plan = explanation["queryPlanner"]["winningPlan"]
+        # Slot-based engine plans nest the classic plan under queryPlan
+        stages = plan_stages(winning_plan.get("queryPlan", winning_plan))
+        stage_names = [stage.get("stage") for stage in stages]
+        index_names = [stage["indexName"] for stage in stages if stage.get("indexName")]
+        uses_index = "COLLSCAN" not in stage_names and bool(index_names)
+        if not uses_index:
+            logger.warning(f"Query on {collection} {query} does a collection scan")
+        report.append({
+            "collection": collection,
+            "filter": query,
+            "stages": stage_names,
+            "indexes": index_names,
+            "uses_index": uses_index,
+        })
+    return report
+
+async def main(explain: bool):
+    from services.mongo import db, close_client
+
+    ran = await run_migrations(db)
+    print(f"Applied migrations: {ran or 'none pending'}")
+    print(f"Database is at version {max(await applied_versions(db), default=0)}")
+    if explain:
+        for check in await check_query_plans(db):
+            status = "IXSCAN" if check["uses_index"] else "COLLSCAN"
+            print(f"{status:8} {check['collection']:10} {check['filter']} -> {', '.join(check['indexes']) or '-'}")
+    close_client()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply database migrations and index bootstrap")
+    parser.add_argument("--explain", action="store_true", help="Report query plans for known queries")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    asyncio.run(main(args.explain))
@@ -0,0 +1,161 @@
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+from typing import Dict
+from dotenv import load_dotenv
+from pathlib import Path
+import logging
+import os
+import threading
+import time
+
+# Load environment variables
+ROOT_DIR = Path(__file__).parent.parent
+load_dotenv(ROOT_DIR / '.env')
+
+logger = logging.getLogger(__name__)
+
+# Commands slower than this are logged
+SLOW_COMMAND_MS = float(os.environ.get("MONGO_SLOW_COMMAND_MS", "100"))
+
+def pool_options() -> dict:
+    """Connection pool settings, overridable through MONGO_* environment variables"""
+    return {
+        "maxPoolSize": int(os.environ.get("MONGO_MAX_POOL_SIZE", "100")),
+        "minPoolSize": int(os.environ.get("MONGO_MIN_POOL_SIZE", "0")),
+        "maxIdleTimeMS": int(os.environ.get("MONGO_MAX_IDLE_TIME_MS", "300000")),
+        "waitQueueTimeoutMS": int(os.environ.get("MONGO_WAIT_QUEUE_TIMEOUT_MS", "5000")),
+        "serverSelectionTimeoutMS": int(os.environ.get("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+    }
+
+class MongoMetrics(monitoring.CommandListener, monitoring.ConnectionPoolListener):
+    """Command latency and connection pool counters collected from pymongo events"""
+
+    def __init__(self, slow_command_ms: float = SLOW_COMMAND_MS):
+        self.slow_command_ms = slow_command_ms
+        # pymongo calls listeners from Motor's executor threads
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        # Per command: {name: {"count", "failures", "total_ms", "max_ms"}}
+        self.commands: Dict[str, Dict[str, float]] = {}
+        self.slow_commands = 0
+        self.pool = {
+            "connections_created": 0,
+            "connections_closed": 0,
+            "checked_out": 0,
+            "checkouts": 0,
+            "checkout_failures": 0,
+            "checkout_wait_total_ms": 0.0,
+            "checkout_wait_max_ms": 0.0,
+            "pools_cleared": 0,
+        }
+
+    # Commands
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self.record_command(event, failed=False)
+
+    def failed(self, event):
+        self.record_command(event, failed=True)
+
+    def record_command(self, event, failed: bool):
+        """Add a finished command to the latency counters"""
+        duration_ms = event.duration_micros / 1000
+        with self.lock:
+            stats = self.commands.setdefault(
+                event.command_name, {"count": 0, "failures": 0, "total_ms": 0.0, "max_ms": 0.0}
+            )
+            stats["count"] += 1
+            stats["failures"] += failed
+            stats["total_ms"] += duration_ms
+            stats["max_ms"] = max(stats["max_ms"], duration_ms)
+            slow = duration_ms >= self.slow_command_ms
+            self.slow_commands += slow
+        if slow:
+            logger.warning(f"Slow MongoDB command {event.command_name} took {duration_ms:.1f}ms")
+
+    # Connection pool
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self.lock:
+            self.pool["pools_cleared"] += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self.lock:
+            self.pool["connections_created"] += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self.lock:
+            self.pool["connections_closed"] += 1
+
+    def connection_check_out_started(self, event):
+        # Checkout starts and finishes on the same thread
+        self.local.checkout_started = time.monotonic()
+
+    def connection_check_out_failed(self, event):
+        self.checkout_finished()
+        with self.lock:
+            self.pool["checkout_failures"] += 1
+
+    def connection_checked_out(self, event):
+        wait_ms = self.checkout_finished()
+        with self.lock:
+            self.pool["checkouts"] += 1
+            self.pool["checked_out"] += 1
+            self.pool["checkout_wait_total_ms"] += wait_ms
+            self.pool["checkout_wait_max_ms"] = max(self.pool["checkout_wait_max_ms"], wait_ms)
+
+    def connection_checked_in(self, event):
+        with self.lock:
+            self.pool["checked_out"] -= 1
+
+    def checkout_finished(self) -> float:
+        """Time in ms this thread waited for a pooled connection"""
+        started = getattr(self.local, "checkout_started", None)
+        self.local.checkout_started = None
+        return (time.monotonic() - started) * 1000 if started is not None else 0.0
+
+    def snapshot(self) -> dict:
+        """Current counters, with averages"""
+        with self.lock:
+            commands = {
+                name: {**stats, "avg_ms": round(stats["total_ms"] / stats["count"], 3) if stats["count"] else 0.0}
+                for name, stats in self.commands.items()
+            }
+            pool = dict(self.pool)
+            slow_commands = self.slow_commands
+        pool["checkout_wait_avg_ms"] = (
+            round(pool["checkout_wait_total_ms"] / pool["checkouts"], 3) if pool["checkouts"] else 0.0
+        )
+        return {
+            "pool_options": pool_options(),
+            "pool": pool,
+            "commands": commands,
+            "slow_commands": slow_commands,
+            "slow_command_ms": self.slow_command_ms,
+        }
+
+# One client, and so one pool, for the whole app
+metrics = MongoMetrics()
+client = AsyncIOMotorClient(os.environ['MONGO_URL'], event_listeners=[metrics], **pool_options())
+db = client[os.environ['DB_NAME']]
+
+def get_database():
+    """Get the shared database handle"""
+    return db
+
+def close_client():
+    """Close the shared client on shutdown"""
+    client.close()
@@ -0,0 +1,49 @@
+from fastapi import HTTPException, Response
+from typing import Dict, List, Optional, Tuple
+
+from services.database import DatabaseService
+from services.serialization import TrustedJSONResponse
+
+# Response header carrying the cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+async def fetch_page(
+    collection,
+    filter_dict: dict = {},
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    projection: Optional[Dict[str, int]] = None
+) -> Tuple[List[dict], Optional[str]]:
+    """Fetch one page and the next page's cursor, rejecting malformed cursors"""
+    try:
+        return await DatabaseService.get_page(collection, filter_dict, limit, cursor, projection)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+async def paginate(
+    response: Response,
+    collection,
+    filter_dict: dict = {},
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    projection: Optional[Dict[str, int]] = None
+) -> List[dict]:
+    """Fetch one page for a list endpoint, putting the next cursor in a response header"""
+    documents, next_cursor = await fetch_page(collection, filter_dict, limit, cursor, projection)
+    
+    # The body stays a plain list, so existing clients keep working
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return documents
+
+async def paginated_response(
+    collection,
+    filter_dict: dict = {},
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    projection: Optional[Dict[str, int]] = None
+) -> TrustedJSONResponse:
+    """Fetch one page as a ready-encoded response, skipping response_model validation"""
+    documents, next_cursor = await fetch_page(collection, filter_dict, limit, cursor, projection)
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return TrustedJSONResponse(documents, headers=headers)
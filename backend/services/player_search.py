@@ -0,0 +1,243 @@
+import bisect
+import heapq
+import logging
+import re
+import unicodedata
+from typing import Dict, List, Optional, Set, Tuple
+
+from services.backplane import Backplane
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CHANNEL = "search:players"
+
+# Indexed fields and how much a match in each counts towards the score
+FIELD_WEIGHTS = {"name": 1.0, "team": 0.6, "role": 0.4}
+
+# Score of a query token matching a player token exactly, as a prefix, or approximately
+EXACT_SCORE = 3.0
+PREFIX_SCORE = 2.0
+FUZZY_SCORE = 1.5
+
+# Minimum trigram similarity for a typo-tolerant match
+FUZZY_THRESHOLD = 0.3
+
+def normalize(text: str) -> str:
+    """Lowercase and strip accents and punctuation"""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return re.sub(r"[^a-z0-9]+", " ", text.lower()).strip()
+
+def tokenize(text: str) -> List[str]:
+    """Split text into normalized tokens"""
+    return normalize(text).split()
+
+def trigrams(token: str) -> Set[str]:
+    """Trigrams of a token, padded so short tokens and word starts count"""
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class PlayerSearchIndex:
+    """In-memory prefix and trigram index over player names, teams and roles
+
+    Every worker keeps its own index; writes reach the others through the backplane.
+    """
+
+    def __init__(self):
+        self.backplane: Optional[Backplane] = None
+        self.worker_id: Optional[str] = None
+        self.reset()
+
+    def reset(self):
+        # Indexed players: {player_id: {"id", "name", "team", "role"}}
+        self.players: Dict[str, dict] = {}
+        # Each player's tokens with their best field weight: {player_id: {token: weight}}
+        self.player_tokens: Dict[str, Dict[str, float]] = {}
+        # Token postings: {token: {player_id: best field weight}}
+        self.postings: Dict[str, Dict[str, float]] = {}
+        # Sorted distinct tokens, for prefix ranges
+        self.tokens: List[str] = []
+        # Trigram postings over distinct tokens: {trigram: {token, ...}}
+        self.trigram_tokens: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.players)
+
+    async def start(self, backplane: Backplane, worker_id: str):
+        """Receive index changes published by other workers"""
+        self.backplane = backplane
+        self.worker_id = worker_id
+        await backplane.subscribe(SEARCH_CHANNEL, self.handle_remote_change)
+
+    async def index(self, player: dict):
+        """Index a written player, here and on every other worker"""
+        self.add(player)
+        await self.publish({"player": {"id": player["id"], **{field: player.get(field) for field in FIELD_WEIGHTS}}})
+
+    async def unindex(self, player_id: str):
+        """Drop a deleted player, here and on every other worker"""
+        self.remove(player_id)
+        await self.publish({"removed": player_id})
+
+    async def publish(self, change: dict):
+        """Send an index change to the other workers"""
+        if self.backplane is not None:
+            await self.backplane.publish(SEARCH_CHANNEL, {"origin": self.worker_id, **change})
+
+    async def handle_remote_change(self, channel: str, message: dict):
+        """Apply an index change published by another worker"""
+        if message.get("origin") == self.worker_id:
+            return
+        if "removed" in message:
+            self.remove(message["removed"])
+        else:
+            self.add(message["player"])
+
+    async def load(self, collection):
+        """Rebuild the index from the players collection"""
+        self.reset()
+        async for player in collection.find({}, {"_id": 0, "id": 1, "name": 1, "team": 1, "role": 1}):
+            self.add(player)
+        logger.info(f"Indexed {len(self.players)} players for search")
+
+    def add(self, player: dict):
+        """Index a player, replacing any previous version of it"""
+        player_id = player["id"]
+        if player_id in self.players:
+            self.remove(player_id)
+
+        entry = {"id": player_id, **{field: player.get(field) or "" for field in FIELD_WEIGHTS}}
+        self.players[player_id] = entry
+        player_tokens = self.player_tokens[player_id] = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(entry[field]):
+                player_tokens[token] = max(player_tokens.get(token, 0.0), weight)
+
+        for token, weight in player_tokens.items():
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = {}
+                bisect.insort(self.tokens, token)
+                for trigram in trigrams(token):
+                    self.trigram_tokens.setdefault(trigram, set()).add(token)
+            posting[player_id] = weight
+
+    def remove(self, player_id: str):
+        """Drop a player from the index"""
+        if self.players.pop(player_id, None) is None:
+            return
+        for token in self.player_tokens.pop(player_id):
+            posting = self.postings[token]
+            del posting[player_id]
+            if not posting:
+                # Last player with this token: forget the token entirely
+                del self.postings[token]
+                del self.tokens[bisect.bisect_left(self.tokens, token)]
+                for trigram in trigrams(token):
+                    tokens = self.trigram_tokens[trigram]
+                    tokens.discard(token)
+                    if not tokens:
+                        del self.trigram_tokens[trigram]
+
+    def prefix_tokens(self, prefix: str) -> List[str]:
+        """Indexed tokens starting with a prefix"""
+        start = bisect.bisect_left(self.tokens, prefix)
+        end = bisect.bisect_left(self.tokens, prefix + "\uffff")
+        return self.tokens[start:end]
+
+    def fuzzy_tokens(self, token: str) -> List[Tuple[str, float]]:
+        """Indexed tokens similar to a (possibly misspelt) token, with their similarity"""
+        query_trigrams = trigrams(token)
+        shared: Dict[str, int] = {}
+        for trigram in query_trigrams:
+            for candidate in self.trigram_tokens.get(trigram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+
+        matches = []
+        for candidate, count in shared.items():
+            # Dice coefficient over the two trigram sets
+            similarity = 2 * count / (len(query_trigrams) + len(candidate) + 1)
+            if similarity >= FUZZY_THRESHOLD:
+                matches.append((candidate, similarity))
+        return matches
+
+    def expand(self, token: str, prefix: bool) -> List[Tuple[str, float]]:
+        """Indexed tokens a query token matches, with the score each match is worth"""
+        matches = []
+        if token in self.postings:
+            matches.append((token, EXACT_SCORE))
+        if prefix:
+            for candidate in self.prefix_tokens(token):
+                if candidate != token:
+                    # Closer completions rank higher
+                    matches.append((candidate, PREFIX_SCORE * len(token) / len(candidate)))
+        if not matches and len(token) >= 3:
+            # Nothing matches as typed: fall back to typo-tolerant matching
+            matches = [(candidate, FUZZY_SCORE * similarity) for candidate, similarity in self.fuzzy_tokens(token)]
+        return matches
+
+    def score_matches(
+        self,
+        matches: List[Tuple[str, float]],
+        within: Optional[Dict[str, float]] = None
+    ) -> Dict[str, float]:
+        """Best score per player over a token's matches, optionally only for players already matched"""
+        scores: Dict[str, float] = {}
+        if within is not None and len(within) < sum(len(self.postings[candidate]) for candidate, _ in matches):
+            # Fewer players left than postings to walk: probe from the players' side
+            if len(matches) <= 4:
+                for candidate, score in matches:
+                    posting = self.postings[candidate]
+                    for player_id in within:
+                        weight = posting.get(player_id)
+                        if weight is not None:
+                            scores[player_id] = max(scores.get(player_id, 0.0), score * weight)
+                return scores
+            
+            # Many matching tokens (a short or misspelt word): check each player's own tokens
+            match_scores = dict(matches)
+            for player_id in within:
+                for token, weight in self.player_tokens[player_id].items():
+                    if token in match_scores:
+                        scores[player_id] = max(scores.get(player_id, 0.0), match_scores[token] * weight)
+            return scores
+
+        for candidate, score in matches:
+            for player_id, weight in self.postings[candidate].items():
+                if within is None or player_id in within:
+                    scores[player_id] = max(scores.get(player_id, 0.0), score * weight)
+        return scores
+
+    def search(self, query: str, limit: int = 20, prefix: bool = True) -> List[dict]:
+        """Ranked players matching every token of a query"""
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return []
+
+        # Earlier tokens are complete words; only the last one may still be being typed
+        expansions = [
+            self.expand(token, prefix and index == len(query_tokens) - 1)
+            for index, token in enumerate(query_tokens)
+        ]
+        # Most selective token first, so later ones only probe the survivors
+        expansions.sort(key=lambda matches: sum(len(self.postings[candidate]) for candidate, _ in matches))
+
+        totals: Optional[Dict[str, float]] = None
+        for matches in expansions:
+            scores = self.score_matches(matches, totals)
+            totals = scores if totals is None else {player_id: totals[player_id] + score for player_id, score in scores.items()}
+            if not totals:
+                return []
+
+        ranked = heapq.nsmallest(limit, totals.items(), key=lambda item: (-item[1], self.players[item[0]]["name"]))
+        return [{**self.players[player_id], "score": round(score, 3)} for player_id, score in ranked]
+
+    def suggest(self, prefix: str, limit: int = 8) -> List[dict]:
+        """Autocomplete suggestions for a partially typed query"""
+        return [
+            {"id": player["id"], "name": player["name"], "team": player["team"]}
+            for player in self.search(prefix, limit, prefix=True)
+        ]
+
+# Global player search index
+player_search = PlayerSearchIndex()
@@ -0,0 +1,214 @@
+import asyncio
+import bisect
+import hashlib
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from services.backplane import Backplane
+from services.state_store import AuctionStateStore, InMemoryStateStore
+
+logger = logging.getLogger(__name__)
+
+CLUSTER_CHANNEL = "cluster"
+
+def ring_hash(key: str) -> int:
+    """Stable 64-bit hash used to place workers and rooms on the ring"""
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+class HashRing:
+    """Consistent hash ring with virtual nodes"""
+
+    def __init__(self, nodes: List[str], replicas: int = 64):
+        self.replicas = replicas
+        self.points: List[int] = []
+        self.owners: List[str] = []
+        for point, node in sorted(
+            (ring_hash(f"{node}#{i}"), node) for node in nodes for i in range(replicas)
+        ):
+            self.points.append(point)
+            self.owners.append(node)
+
+    def owner(self, key: str) -> Optional[str]:
+        """Get the node that owns a key"""
+        if not self.points:
+            return None
+        index = bisect.bisect(self.points, ring_hash(key)) % len(self.points)
+        return self.owners[index]
+
+class RoomOwnership:
+    """Assigns rooms to workers by consistent hashing, guarded by renewable leases
+
+    Heartbeats only spread who holds which room; the lease itself is a write to
+    the state store, so two workers with different views can't both hold a room.
+    """
+
+    def __init__(
+        self,
+        worker_id: str,
+        backplane: Backplane,
+        store: Optional[AuctionStateStore] = None,
+        lease_ttl: float = 10.0,
+        heartbeat_interval: float = 3.0,
+        discovery_timeout: float = 1.0,
+        on_change: Optional[Callable[[], Awaitable[None]]] = None
+    ):
+        self.worker_id = worker_id
+        self.backplane = backplane
+        # Where leases are taken, shared by every worker when the store is
+        self.store: AuctionStateStore = store or InMemoryStateStore()
+        self.lease_ttl = lease_ttl
+        self.heartbeat_interval = heartbeat_interval
+        self.discovery_timeout = discovery_timeout
+        self.on_change = on_change
+        # Live workers: {worker_id: lease_expires_at}
+        self.members: Dict[str, float] = {}
+        # Rooms leased by other workers: {worker_id: {room_id, ...}}
+        self.member_rooms: Dict[str, Set[str]] = {}
+        # Rooms this worker holds a lease on
+        self.held_rooms: Set[str] = set()
+        self.ring = HashRing([worker_id])
+        # Ring lookups cached until membership changes: {room_id: worker_id}
+        self.owner_cache: Dict[str, str] = {}
+        self.heartbeat_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Join the cluster and start renewing leases"""
+        await self.backplane.subscribe(CLUSTER_CHANNEL, self.handle_cluster_message)
+        await self.send_heartbeat(hello=True)
+        if self.backplane.distributed:
+            # Give live workers a moment to answer before claiming any room
+            await asyncio.sleep(self.discovery_timeout)
+        self.heartbeat_task = asyncio.create_task(self.heartbeat_loop())
+
+    async def stop(self):
+        """Leave the cluster, handing all rooms over immediately"""
+        if self.heartbeat_task:
+            self.heartbeat_task.cancel()
+            self.heartbeat_task = None
+        for room_id in list(self.held_rooms):
+            await self.release(room_id)
+        await self.backplane.publish(CLUSTER_CHANNEL, {"type": "leave", "worker_id": self.worker_id})
+        await self.backplane.unsubscribe(CLUSTER_CHANNEL, self.handle_cluster_message)
+
+    def owner_of(self, room_id: str) -> str:
+        """Get the worker a room is assigned to"""
+        owner = self.owner_cache.get(room_id)
+        if owner is None:
+            owner = self.ring.owner(room_id) or self.worker_id
+            self.owner_cache[room_id] = owner
+        return owner
+
+    def is_owner(self, room_id: str) -> bool:
+        """Check whether a room is assigned to this worker"""
+        return self.owner_of(room_id) == self.worker_id
+
+    def lease_holder(self, room_id: str) -> Optional[str]:
+        """Get the live worker holding a room's lease, if any"""
+        if room_id in self.held_rooms:
+            return self.worker_id
+        now = time.monotonic()
+        for worker_id, rooms in self.member_rooms.items():
+            if room_id in rooms and self.members.get(worker_id, 0) > now:
+                return worker_id
+        return None
+
+    async def acquire(self, room_id: str) -> bool:
+        """Take the lease on a room if it's assigned here and no live worker holds it"""
+        if not self.is_owner(room_id):
+            return False
+        holder = self.lease_holder(room_id)
+        if holder is not None and holder != self.worker_id:
+            return False
+        if not await self.store.acquire_lease(room_id, self.worker_id, self.lease_ttl):
+            # Held by a worker this one hasn't heard from yet
+            self.held_rooms.discard(room_id)
+            return False
+        self.held_rooms.add(room_id)
+        return True
+
+    def holds(self, room_id: str) -> bool:
+        """Check whether this worker holds a room's lease"""
+        return room_id in self.held_rooms
+
+    async def release(self, room_id: str):
+        """Give up the lease on a room"""
+        self.held_rooms.discard(room_id)
+        await self.store.release_lease(room_id, self.worker_id)
+
+    async def renew_leases(self) -> bool:
+        """Extend every held lease in the store; True if any of them was lost"""
+        lost = False
+        for room_id in list(self.held_rooms):
+            if not await self.store.acquire_lease(room_id, self.worker_id, self.lease_ttl):
+                logger.warning(f"Worker {self.worker_id} lost the lease on room {room_id}")
+                self.held_rooms.discard(room_id)
+                lost = True
+        return lost
+
+    async def heartbeat_loop(self):
+        """Renew leases and expire workers that stopped renewing theirs"""
+        while True:
+            try:
+                await asyncio.sleep(self.heartbeat_interval)
+                lost = await self.renew_leases()
+                await self.send_heartbeat()
+                if self.expire_members():
+                    await self.membership_changed()
+                elif lost and self.on_change:
+                    await self.on_change()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Room ownership heartbeat failed: {e}")
+
+    async def send_heartbeat(self, hello: bool = False):
+        """Announce this worker and renew all of its room leases"""
+        await self.backplane.publish(CLUSTER_CHANNEL, {
+            "type": "heartbeat",
+            "worker_id": self.worker_id,
+            "rooms": sorted(self.held_rooms),
+            "hello": hello
+        })
+
+    def expire_members(self) -> bool:
+        """Drop workers whose lease ran out"""
+        now = time.monotonic()
+        expired = [worker_id for worker_id, expires_at in self.members.items() if expires_at <= now]
+        for worker_id in expired:
+            logger.warning(f"Worker {worker_id} lease expired, reassigning its rooms")
+            del self.members[worker_id]
+            self.member_rooms.pop(worker_id, None)
+        return bool(expired)
+
+    async def handle_cluster_message(self, channel: str, message: dict):
+        """Track membership and leases announced by other workers"""
+        worker_id = message.get("worker_id")
+        if worker_id == self.worker_id:
+            return
+
+        if message.get("type") == "heartbeat":
+            changed = worker_id not in self.members
+            self.members[worker_id] = time.monotonic() + self.lease_ttl
+            self.member_rooms[worker_id] = set(message.get("rooms", ()))
+            if message.get("hello"):
+                # Answer a starting worker right away so it sees the cluster and its leases
+                await self.send_heartbeat()
+        elif message.get("type") == "leave":
+            changed = self.members.pop(worker_id, None) is not None
+            self.member_rooms.pop(worker_id, None)
+        else:
+            return
+
+        if changed:
+            await self.membership_changed()
+        elif self.on_change:
+            # Lease sets changed, rooms waiting for a release may now be taken over
+            await self.on_change()
+
+    async def membership_changed(self):
+        """Rebuild the ring and let the owner of this object rebalance rooms"""
+        self.ring = HashRing([self.worker_id, *self.members])
+        self.owner_cache.clear()
+        if self.on_change:
+            await self.on_change()
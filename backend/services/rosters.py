@@ -0,0 +1,67 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from services.database import DatabaseService
+
+def add_player_operation(team_id: str, player: dict) -> Tuple[dict, dict]:
+    """Filter and update that add a player to a roster only if it has room, budget and no such player yet"""
+    price = player["purchase_price"]
+    guard = {
+        "id": team_id,
+        "players.player_id": {"$ne": player["player_id"]},
+        "$expr": {"$and": [
+            {"$lt": [{"$size": {"$ifNull": ["$players", []]}}, "$max_players"]},
+            {"$lte": [{"$add": ["$spent", price]}, "$budget"]},
+        ]},
+    }
+    update = {
+        "$push": {"players": player},
+        "$inc": {"spent": price, "remaining": -price},
+        "$set": {"updated_at": datetime.utcnow()},
+    }
+    return guard, update
+
+def remove_player_operation(team_id: str, player_id: str) -> Tuple[dict, List[dict]]:
+    """Filter and pipeline update that remove a rostered player and refund its purchase price"""
+    guard = {"id": team_id, "players.player_id": player_id}
+    # Ids are data, never field paths
+    literal_id = {"$literal": player_id}
+    refund = {"$sum": {"$map": {
+        "input": {"$filter": {"input": "$players", "cond": {"$eq": ["$$this.player_id", literal_id]}}},
+        "in": "$$this.purchase_price",
+    }}}
+    update = [
+        {"$set": {"spent": {"$subtract": ["$spent", refund]}}},
+        {"$set": {
+            "players": {"$filter": {"input": "$players", "cond": {"$ne": ["$$this.player_id", literal_id]}}},
+            "remaining": {"$subtract": ["$budget", "$spent"]},
+            "updated_at": datetime.utcnow(),
+        }},
+    ]
+    return guard, update
+
+async def add_roster_player(collection, team_id: str, player: dict) -> Optional[dict]:
+    """Atomically add a player to a team, returning the team as updated or None if a guard failed"""
+    guard, update = add_player_operation(team_id, player)
+    return await DatabaseService.find_and_update(collection, guard, update)
+
+async def remove_roster_player(collection, team_id: str, player_id: str) -> Optional[dict]:
+    """Atomically remove a player from a team, returning the team as updated or None if it isn't rostered"""
+    guard, update = remove_player_operation(team_id, player_id)
+    return await DatabaseService.find_and_update(collection, guard, update)
+
+async def rejected_roster_add(collection, team_id: str, player: dict) -> HTTPException:
+    """Explain why a guarded roster add didn't apply"""
+    team = await DatabaseService.get_document(
+        collection, team_id, {"players.player_id": 1, "max_players": 1, "spent": 1, "budget": 1}
+    )
+    if not team:
+        return HTTPException(status_code=404, detail="Team not found")
+    players = team.get("players", [])
+    if any(rostered["player_id"] == player["player_id"] for rostered in players):
+        return HTTPException(status_code=400, detail="Player already in team")
+    if len(players) >= team["max_players"]:
+        return HTTPException(status_code=400, detail="Team is full")
+    return HTTPException(status_code=400, detail="Insufficient budget")
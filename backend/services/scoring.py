@@ -0,0 +1,273 @@
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from services.backplane import Backplane
+
+logger = logging.getLogger(__name__)
+
+# Fantasy points per unit of each performance stat; fours and sixes are bonuses on top of their runs
+POINTS = {
+    "runs": 1.0,
+    "fours": 1.0,
+    "sixes": 2.0,
+    "wickets": 25.0,
+    "catches": 8.0,
+    "stumpings": 12.0,
+    "run_outs": 6.0,
+}
+STATS = list(POINTS)
+POINT_WEIGHTS = np.array([POINTS[stat] for stat in STATS])
+
+# Multiplier on a rostered player's points by their role in the team; anyone else scores 1x
+ROLE_MULTIPLIERS = {"Captain": 2.0, "Vice Captain": 1.5}
+
+# Events replayed per batch when loading
+REPLAY_BATCH_SIZE = 10_000
+
+# Channel carrying applied events and roster changes between workers
+SCORING_CHANNEL = "scoring:updates"
+
+def grow(array: np.ndarray, size: int) -> np.ndarray:
+    """An array with room for at least size rows, doubling so appends stay amortized O(1)"""
+    if size <= len(array):
+        return array
+    grown = np.zeros((max(size, 2 * len(array), 64),) + array.shape[1:], dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+class ScoringEngine:
+    """Live fantasy points for every player and team, updated per performance event
+
+    Each player keeps a posting of the teams that roster them and the role
+    multiplier they carry there, so an event's points reach every affected
+    team, across every league, in one vectorized scatter-add rather than by
+    re-summing rosters.
+    """
+
+    def __init__(self):
+        # Row of each player in the player arrays: {player_id: row}
+        self.player_rows: Dict[str, int] = {}
+        self.player_ids: List[str] = []
+        self.player_stats = np.zeros((0, len(STATS)), dtype=np.int64)
+        self.player_points = np.zeros(0)
+        # Row of each team in team_points: {team_id: row}; a deleted team's row is left empty
+        self.team_rows: Dict[str, int] = {}
+        self.team_ids: List[str] = []
+        self.team_points = np.zeros(0)
+        # Teams whose points changed since standings last took them
+        self.changed = np.zeros(0, dtype=bool)
+        # Each team's roster: {team row: (player rows, multipliers)}
+        self.rosters: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        # Teams rostering each player: [{team row: multiplier}, ...] by player row
+        self.postings: List[Dict[int, float]] = []
+        # The postings as arrays, built on a player's first event after a roster change
+        self.posting_arrays: List[Optional[Tuple[np.ndarray, np.ndarray]]] = []
+        self.events_applied = 0
+        self.backplane: Optional[Backplane] = None
+        self.worker_id: Optional[str] = None
+
+    async def start(self, backplane: Backplane, worker_id: str):
+        """Receive events and roster changes applied by other workers"""
+        self.backplane = backplane
+        self.worker_id = worker_id
+        await backplane.subscribe(SCORING_CHANNEL, self.handle_remote_update)
+
+    async def load(self, teams, events):
+        """Rebuild from the teams' rosters and a replay of every recorded event"""
+        self.__init__()
+        async for team in teams.find({}, {"_id": 0, "id": 1, "players": 1}):
+            self.set_roster(team["id"], team.get("players") or [])
+        batch: List[dict] = []
+        async for event in events.find({}, {"_id": 0, "player_id": 1, **{stat: 1 for stat in STATS}}):
+            batch.append(event)
+            if len(batch) >= REPLAY_BATCH_SIZE:
+                self.apply(batch)
+                batch = []
+        self.apply(batch)
+        logger.info(f"Scored {self.events_applied} events for {len(self.team_rows)} teams")
+
+    def player_row(self, player_id: str) -> int:
+        """A player's row, adding the player if it's new"""
+        row = self.player_rows.get(player_id)
+        if row is None:
+            row = self.player_rows[player_id] = len(self.player_ids)
+            self.player_ids.append(player_id)
+            self.player_stats = grow(self.player_stats, row + 1)
+            self.player_points = grow(self.player_points, row + 1)
+            self.postings.append({})
+            self.posting_arrays.append(None)
+        return row
+
+    def team_row(self, team_id: str) -> int:
+        """A team's row, adding the team if it's new"""
+        row = self.team_rows.get(team_id)
+        if row is None:
+            row = self.team_rows[team_id] = len(self.team_ids)
+            self.team_ids.append(team_id)
+            self.team_points = grow(self.team_points, row + 1)
+            self.changed = grow(self.changed, row + 1)
+        return row
+
+    def set_roster(self, team_id: str, players: List[dict]):
+        """Replace a team's roster, rescoring just that team from its players' current points"""
+        row = self.team_row(team_id)
+        self.clear_roster(row)
+        player_rows = np.array([self.player_row(player["player_id"]) for player in players], dtype=np.int64)
+        multipliers = np.array([ROLE_MULTIPLIERS.get(player.get("role"), 1.0) for player in players])
+        for player_row, multiplier in zip(player_rows.tolist(), multipliers.tolist()):
+            self.postings[player_row][row] = multiplier
+            self.posting_arrays[player_row] = None
+        self.rosters[row] = (player_rows, multipliers)
+        self.team_points[row] = self.player_points[player_rows] @ multipliers
+        self.changed[row] = True
+
+    def remove_team(self, team_id: str):
+        """Stop scoring a deleted team"""
+        row = self.team_rows.pop(team_id, None)
+        if row is not None:
+            self.clear_roster(row)
+            self.team_points[row] = 0.0
+            self.changed[row] = True
+
+    def clear_roster(self, row: int):
+        """Take a team out of its players' postings"""
+        player_rows, _ = self.rosters.pop(row, (np.zeros(0, dtype=np.int64), None))
+        for player_row in player_rows.tolist():
+            self.postings[player_row].pop(row, None)
+            self.posting_arrays[player_row] = None
+
+    def posting(self, player_row: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(team rows, multipliers) of the teams rostering a player"""
+        arrays = self.posting_arrays[player_row]
+        if arrays is None:
+            posting = self.postings[player_row]
+            arrays = self.posting_arrays[player_row] = (
+                np.fromiter(posting.keys(), dtype=np.int64, count=len(posting)),
+                np.fromiter(posting.values(), dtype=np.float64, count=len(posting)),
+            )
+        return arrays
+
+    def apply(self, events: List[dict]) -> Dict[str, float]:
+        """Apply performance events, returning each affected player's new points
+
+        Events for the same player are summed first, then every rostering
+        team's points move by that player's delta times its multiplier.
+        """
+        if not events:
+            return {}
+        rows = np.array([self.player_row(event["player_id"]) for event in events], dtype=np.int64)
+        counts = np.array([[event.get(stat, 0) for stat in STATS] for event in events], dtype=np.int64)
+        players, inverse = np.unique(rows, return_inverse=True)
+        player_counts = np.zeros((len(players), len(STATS)), dtype=np.int64)
+        np.add.at(player_counts, inverse, counts)
+        deltas = player_counts @ POINT_WEIGHTS
+
+        self.player_stats[players] += player_counts
+        self.player_points[players] += deltas
+        if len(players) == 1:
+            # One player, as for a single ball: its teams are distinct, so a plain fancy add is exact
+            team_rows, multipliers = self.posting(int(players[0]))
+            self.team_points[team_rows] += deltas[0] * multipliers
+            self.changed[team_rows] = True
+        else:
+            postings = [self.posting(player) for player in players.tolist()]
+            team_rows = np.concatenate([team_rows for team_rows, _ in postings])
+            team_deltas = np.concatenate([delta * multipliers for delta, (_, multipliers) in zip(deltas, postings)])
+            # Teams rostering several of the players get each one's delta
+            np.add.at(self.team_points, team_rows, team_deltas)
+            self.changed[team_rows] = True
+
+        self.events_applied += len(events)
+        return {self.player_ids[player]: float(self.player_points[player]) for player in players.tolist()}
+
+    def take_changed(self) -> Dict[str, Optional[float]]:
+        """Teams whose points changed since the last call, with their points (None if deleted)"""
+        rows = np.flatnonzero(self.changed[:len(self.team_ids)])
+        self.changed[rows] = False
+        changes: Dict[str, Optional[float]] = {}
+        for row, points in zip(rows.tolist(), self.team_points[rows].tolist()):
+            team_id = self.team_ids[row]
+            changes[team_id] = points if self.team_rows.get(team_id) == row else None
+        return changes
+
+    def player_score(self, player_id: str) -> dict:
+        """A player's points and stat totals (zero if they haven't featured yet)"""
+        row = self.player_rows.get(player_id)
+        stats = self.player_stats[row].tolist() if row is not None else [0] * len(STATS)
+        return {
+            "player_id": player_id,
+            "points": float(self.player_points[row]) if row is not None else 0.0,
+            "stats": dict(zip(STATS, stats)),
+        }
+
+    def team_score(self, team_id: str) -> Optional[dict]:
+        """A team's points with each rostered player's contribution, or None if it isn't scored"""
+        row = self.team_rows.get(team_id)
+        if row is None:
+            return None
+        player_rows, multipliers = self.rosters.get(row, (np.zeros(0, dtype=np.int64), np.zeros(0)))
+        contributions = self.player_points[player_rows] * multipliers
+        return {
+            "team_id": team_id,
+            "points": float(self.team_points[row]),
+            "players": [
+                {
+                    "player_id": self.player_ids[player_row],
+                    "multiplier": multiplier,
+                    "points": points,
+                }
+                for player_row, multiplier, points in zip(
+                    player_rows.tolist(), multipliers.tolist(), contributions.tolist()
+                )
+            ],
+        }
+
+    def team_scores(self, team_ids: Iterable[str]) -> List[dict]:
+        """Points of some teams, highest first; teams that aren't scored are left out"""
+        team_ids = [team_id for team_id in team_ids if team_id in self.team_rows]
+        points = self.team_points[np.array([self.team_rows[team_id] for team_id in team_ids], dtype=np.int64)]
+        order = np.argsort(-points, kind="stable")
+        return [{"team_id": team_ids[index], "points": float(points[index])} for index in order.tolist()]
+
+    async def record(self, events: List[dict]) -> Dict[str, float]:
+        """Apply events here and on every other worker"""
+        updated = self.apply(events)
+        await self.publish({"events": [
+            {"player_id": event["player_id"], **{stat: event.get(stat, 0) for stat in STATS}} for event in events
+        ]})
+        return updated
+
+    async def update_team(self, team_id: str, players: Optional[List[dict]]):
+        """Apply a team's new roster, or its deletion if players is None, here and on every other worker"""
+        self.apply_team(team_id, players)
+        await self.publish({"team_id": team_id, "players": players})
+
+    def apply_team(self, team_id: str, players: Optional[List[dict]]):
+        if players is None:
+            self.remove_team(team_id)
+        else:
+            self.set_roster(team_id, players)
+
+    async def publish(self, message: dict):
+        if self.backplane is not None:
+            await self.backplane.publish(SCORING_CHANNEL, {"origin": self.worker_id, **message})
+
+    async def handle_remote_update(self, channel: str, message: dict):
+        """Apply events or a roster change published by another worker"""
+        if message.get("origin") == self.worker_id:
+            return
+        if "events" in message:
+            self.apply(message["events"])
+        else:
+            self.apply_team(message["team_id"], message["players"])
+
+    def stats(self) -> dict:
+        return {
+            "players": len(self.player_rows),
+            "teams": len(self.team_rows),
+            "events_applied": self.events_applied,
+        }
+
+scoring_engine = ScoringEngine()
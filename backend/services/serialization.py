@@ -0,0 +1,30 @@
+from typing import Any
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+# Serializes documents as stored, whatever their shape; built once because building compiles a serializer
+document_adapter = TypeAdapter(Any)
+
+def encode_trusted(content: Any) -> bytes:
+    """Encode data read back from the database straight to JSON bytes
+
+    Documents were validated when they were written, so reads skip model
+    construction and validation entirely and are serialized in one pass by
+    pydantic-core (datetimes, enums and nested documents included).
+    """
+    return document_adapter.dump_json(content)
+
+class TrustedJSONResponse(Response):
+    """JSON response for trusted database reads
+
+    Returning a Response bypasses FastAPI's response_model validation and
+    jsonable_encoder, which otherwise walk every document again. Routes on
+    this path declare no response_model, since it would never be applied:
+    what they return is the stored document, shaped only by projections.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return encode_trusted(content)
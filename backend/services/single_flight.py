@@ -0,0 +1,80 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Longest a shared computation may run before it's abandoned, in seconds
+DEFAULT_TIMEOUT = 5.0
+
+class SingleFlight:
+    """Runs one computation per key at a time and hands its result to every concurrent caller
+
+    Results are shared, so callers must not mutate them.
+    """
+
+    # Every group, for the metrics endpoint: {name: group}
+    groups: Dict[str, "SingleFlight"] = {}
+
+    def __init__(self, name: str, timeout: float = DEFAULT_TIMEOUT):
+        self.name = name
+        self.timeout = timeout
+        # In-flight computations: {key: task}
+        self.inflight: Dict[Hashable, asyncio.Task] = {}
+        self.leaders = 0
+        self.collapsed = 0
+        self.timeouts = 0
+        self.failures = 0
+        SingleFlight.groups[name] = self
+
+    async def do(self, key: Hashable, compute: Callable[[], Awaitable[T]], timeout: Optional[float] = None) -> T:
+        """Get compute()'s result, sharing a computation already running for the key
+
+        The first caller's timeout bounds the computation for everyone sharing
+        it; a computation that overruns is cancelled and the next caller
+        starts afresh.
+        """
+        task = self.inflight.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(self.run(key, compute, timeout or self.timeout))
+            self.inflight[key] = task
+        else:
+            self.collapsed += 1
+        # Shielded, so a caller that goes away doesn't cancel the others' result
+        return await asyncio.shield(task)
+
+    async def run(self, key: Hashable, compute: Callable[[], Awaitable[T]], timeout: float) -> T:
+        """Run one computation, forgetting it once it's done"""
+        try:
+            return await asyncio.wait_for(compute(), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            logger.warning(f"{self.name} read for {key!r} timed out after {timeout}s")
+            raise HTTPException(status_code=504, detail="Timed out reading data")
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            self.inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        """Counters: computations run, and callers that shared one instead"""
+        calls = self.leaders + self.collapsed
+        return {
+            "in_flight": len(self.inflight),
+            "leaders": self.leaders,
+            "collapsed": self.collapsed,
+            "collapse_rate": round(self.collapsed / calls, 4) if calls else 0.0,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "timeout_seconds": self.timeout,
+        }
+
+def single_flight_stats() -> dict:
+    """Counters for every single-flight group"""
+    return {name: group.stats() for name, group in SingleFlight.groups.items()}
@@ -0,0 +1,261 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+from pymongo import UpdateOne
+
+from services.backplane import Backplane
+from services.leaderboard import Leaderboard
+from services.scoring import ScoringEngine, scoring_engine
+
+logger = logging.getLogger(__name__)
+
+# Seconds between folding changed team points into the standings
+REFRESH_INTERVAL = 1.0
+
+# Seconds between writing changed standings and ranks to MongoDB
+PERSIST_INTERVAL = 30.0
+
+# Channel carrying league membership changes between workers
+STANDINGS_CHANNEL = "standings:memberships"
+
+class Standings:
+    """Materialized league standings and a global user leaderboard
+
+    Team points come from the scoring engine; every REFRESH_INTERVAL the
+    teams whose points changed are folded into their leagues' boards and
+    their owners' totals on the global board, so reads never scan or sort.
+    Changed standings, and the points and rank of users whose points changed,
+    are written back every PERSIST_INTERVAL; live ranks are read from the
+    boards. Every worker holds and persists the same state, so the writes are
+    idempotent.
+    """
+
+    def __init__(self, engine: ScoringEngine):
+        self.engine = engine
+        # Each league's teams by points: {league_id: board}
+        self.leagues: Dict[str, Leaderboard] = {}
+        # Leagues each team is in: {team_id: {league_id, ...}}
+        self.team_leagues: Dict[str, Set[str]] = {}
+        # Users by the points of all their teams
+        self.users = Leaderboard()
+        self.team_owners: Dict[str, str] = {}
+        self.team_points: Dict[str, float] = {}
+        self.user_points: Dict[str, float] = {}
+        # Written out at the next persist
+        self.dirty_leagues: Set[str] = set()
+        self.dirty_users: Set[str] = set()
+        self.teams_collection = None
+        self.users_collection = None
+        self.standings_collection = None
+        self.backplane: Optional[Backplane] = None
+        self.worker_id: Optional[str] = None
+        self.tasks: List[asyncio.Task] = []
+
+    async def load(self, memberships, teams):
+        """Build every board from the league memberships and the scoring engine's current points"""
+        self.__init__(self.engine)
+        self.teams_collection = teams
+        async for team in teams.find({}, {"_id": 0, "id": 1, "owner_id": 1}):
+            self.team_owners[team["id"]] = team.get("owner_id")
+        async for membership in memberships.find({}, {"_id": 0, "league_id": 1, "team_id": 1}):
+            self.team_leagues.setdefault(membership["team_id"], set()).add(membership["league_id"])
+            self.leagues.setdefault(membership["league_id"], Leaderboard())
+        self.engine.take_changed()
+        self.fold({
+            team_id: float(self.engine.team_points[row]) for team_id, row in self.engine.team_rows.items()
+        })
+        logger.info(f"Built standings for {len(self.leagues)} leagues and {len(self.users)} users")
+
+    async def start(self, backplane: Backplane, worker_id: str, users, standings):
+        """Follow other workers' membership changes and keep the standings fresh and persisted"""
+        self.backplane = backplane
+        self.worker_id = worker_id
+        self.users_collection = users
+        self.standings_collection = standings
+        await backplane.subscribe(STANDINGS_CHANNEL, self.handle_remote_membership)
+        self.tasks = [
+            asyncio.create_task(self.refresh_loop()),
+            asyncio.create_task(self.persist_loop()),
+        ]
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    async def refresh_loop(self):
+        while True:
+            await asyncio.sleep(REFRESH_INTERVAL)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Error refreshing standings: {e}")
+
+    async def persist_loop(self):
+        while True:
+            await asyncio.sleep(PERSIST_INTERVAL)
+            try:
+                await self.persist()
+            except Exception as e:
+                logger.error(f"Error persisting standings: {e}")
+
+    async def refresh(self):
+        """Fold the teams whose points changed into the boards"""
+        changes = self.engine.take_changed()
+        # Teams created since the boards were built
+        unknown = [
+            team_id for team_id, points in changes.items()
+            if points is not None and team_id not in self.team_owners
+        ]
+        if unknown and self.teams_collection is not None:
+            owners = self.teams_collection.find({"id": {"$in": unknown}}, {"_id": 0, "id": 1, "owner_id": 1})
+            async for team in owners:
+                self.team_owners[team["id"]] = team.get("owner_id")
+        self.fold(changes)
+
+    def fold(self, changes: Dict[str, Optional[float]]):
+        """Apply teams' new points (None for a deleted team) to their leagues and owners"""
+        league_changes: Dict[str, Dict[str, Optional[float]]] = {}
+        user_changes: Dict[str, Optional[float]] = {}
+        for team_id, points in changes.items():
+            for league_id in self.team_leagues.get(team_id, ()):
+                league_changes.setdefault(league_id, {})[team_id] = points
+
+            owner = self.team_owners.get(team_id)
+            previous = self.team_points.pop(team_id, 0.0)
+            if points is not None:
+                self.team_points[team_id] = points
+            else:
+                self.team_owners.pop(team_id, None)
+            if owner:
+                user_changes[owner] = self.user_points[owner] = (
+                    self.user_points.get(owner, 0.0) + (points or 0.0) - previous
+                )
+
+        for league_id, league_teams in league_changes.items():
+            self.leagues[league_id].update(league_teams)
+        self.dirty_leagues.update(league_changes)
+        self.dirty_users.update(user_changes)
+        self.users.update(user_changes)
+
+    async def update_membership(self, league_id: str, team_id: str, joined: bool):
+        """Apply a team joining or leaving a league, here and on every other worker"""
+        self.apply_membership(league_id, team_id, joined)
+        if self.backplane is not None:
+            await self.backplane.publish(STANDINGS_CHANNEL, {
+                "origin": self.worker_id, "league_id": league_id, "team_id": team_id, "joined": joined
+            })
+
+    async def remove_league(self, league_id: str):
+        """Drop a deleted league's standings, here and on every other worker"""
+        self.apply_membership(league_id, None, False)
+        if self.backplane is not None:
+            await self.backplane.publish(STANDINGS_CHANNEL, {
+                "origin": self.worker_id, "league_id": league_id, "team_id": None, "joined": False
+            })
+
+    def apply_membership(self, league_id: str, team_id: Optional[str], joined: bool):
+        if team_id is None:
+            for board_team_id in self.leagues.pop(league_id, Leaderboard()).points:
+                self.team_leagues.get(board_team_id, set()).discard(league_id)
+            self.dirty_leagues.discard(league_id)
+            return
+        board = self.leagues.setdefault(league_id, Leaderboard())
+        if joined:
+            self.team_leagues.setdefault(team_id, set()).add(league_id)
+            board.set(team_id, self.team_points.get(team_id, 0.0))
+        else:
+            self.team_leagues.get(team_id, set()).discard(league_id)
+            board.discard(team_id)
+        self.dirty_leagues.add(league_id)
+
+    async def handle_remote_membership(self, channel: str, message: dict):
+        """Apply a membership change published by another worker"""
+        if message.get("origin") != self.worker_id:
+            self.apply_membership(message["league_id"], message["team_id"], message["joined"])
+
+    def league_standings(self, league_id: str, limit: int) -> Optional[List[dict]]:
+        """A league's top teams, or None if it has no standings"""
+        board = self.leagues.get(league_id)
+        return board.top(limit) if board is not None else None
+
+    def league_position(self, league_id: str, team_id: str, window: int) -> Optional[dict]:
+        """A team's rank in a league with the teams around it, or None if it isn't in the league"""
+        board = self.leagues.get(league_id)
+        around = board.around(team_id, window) if board is not None else None
+        if around is None:
+            return None
+        return {"team_id": team_id, "rank": board.rank(team_id), "points": board.points[team_id],
+                "teams": len(board), "around": around}
+
+    def user_position(self, user_id: str, window: int) -> Optional[dict]:
+        """A user's global rank with the users around them, or None if they have no scored teams"""
+        around = self.users.around(user_id, window)
+        if around is None:
+            return None
+        return {"user_id": user_id, "rank": self.users.rank(user_id), "points": self.users.points[user_id],
+                "users": len(self.users), "around": around}
+
+    def standings_document(self, league_id: str) -> dict:
+        board = self.leagues[league_id]
+        return {"id": league_id, "standings": board.top(len(board)), "updated_at": datetime.utcnow()}
+
+    async def persist(self):
+        """Write changed league standings, and the users whose points changed"""
+        leagues, self.dirty_leagues = self.dirty_leagues, set()
+        users, self.dirty_users = self.dirty_users, set()
+        operations = [
+            UpdateOne({"id": league_id}, {"$set": self.standings_document(league_id)}, upsert=True)
+            for league_id in leagues if league_id in self.leagues
+        ]
+        if operations:
+            await self.standings_collection.bulk_write(operations, ordered=False)
+
+        # A stored rank is as of the user's last points change; others moving
+        # past them would rewrite most of the board, so reads use the live board
+        operations = [
+            UpdateOne(
+                {"id": user_id}, {"$set": {"rank": self.users.rank(user_id), "points": self.users.points[user_id]}}
+            )
+            for user_id in users if user_id in self.users.points
+        ]
+        if operations:
+            await self.users_collection.bulk_write(operations, ordered=False)
+
+    async def record_result(self, league_id: str) -> Optional[dict]:
+        """Settle a completed league: the top team's owner wins, every other owner loses
+
+        Wins and losses are incremented and win_rate (a percentage) recomputed
+        inside each user's update, so concurrent results can't lose a count.
+        """
+        await self.refresh()
+        board = self.leagues.get(league_id)
+        if not board:
+            return None
+        standings = self.standings_document(league_id)
+        winner_team_id = standings["standings"][0]["id"]
+        winner = self.team_owners.get(winner_team_id)
+        owners = {self.team_owners.get(entry["id"]) for entry in standings["standings"]} - {None}
+        operations = [
+            UpdateOne({"id": owner}, [
+                {"$set": {
+                    "wins": {"$add": [{"$ifNull": ["$wins", 0]}, int(owner == winner)]},
+                    "losses": {"$add": [{"$ifNull": ["$losses", 0]}, int(owner != winner)]},
+                }},
+                {"$set": {"win_rate": {"$round": [
+                    {"$multiply": [100, {"$divide": ["$wins", {"$max": [1, {"$add": ["$wins", "$losses"]}]}]}]}, 1
+                ]}}},
+            ])
+            for owner in owners
+        ]
+        if operations:
+            await self.users_collection.bulk_write(operations, ordered=False)
+        await self.standings_collection.update_one(
+            {"id": league_id}, {"$set": {**standings, "completed": True}}, upsert=True
+        )
+        return {"league_id": league_id, "winner_team_id": winner_team_id, "winner_user_id": winner}
+
+league_standings = Standings(scoring_engine)
@@ -0,0 +1,331 @@
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from models.auction import AuctionRoom, PlayerAuction
+
+# Budget given to a user the first time they connect
+DEFAULT_BUDGET = 100_000_000  # £100M
+
+class AuctionStateStore:
+    """Storage for auction rooms, live auction state and user budgets"""
+
+    # Rooms
+    async def get_room(self, room_id: str) -> Optional[AuctionRoom]:
+        """Get an auction room"""
+        raise NotImplementedError
+
+    async def save_room(self, room: AuctionRoom):
+        """Create or replace an auction room"""
+        raise NotImplementedError
+
+    async def list_rooms(self) -> List[AuctionRoom]:
+        """Get all auction rooms"""
+        raise NotImplementedError
+
+    # Live auctions
+    async def get_auction(self, room_id: str) -> Optional[PlayerAuction]:
+        """Get the live auction in a room"""
+        raise NotImplementedError
+
+    async def create_auction(self, auction: PlayerAuction) -> PlayerAuction:
+        """Store a new live auction for its room, starting at version 1"""
+        raise NotImplementedError
+
+    async def compare_and_set_auction(
+        self,
+        room_id: str,
+        expected_version: int,
+        changes: dict
+    ) -> Optional[PlayerAuction]:
+        """Apply changes only if the auction is still at expected_version; None if it moved on"""
+        raise NotImplementedError
+
+    async def delete_auction(self, room_id: str):
+        """Remove the live auction from a room"""
+        raise NotImplementedError
+
+    # Budgets
+    async def ensure_budget(self, user_id: str, default: int = DEFAULT_BUDGET) -> int:
+        """Get a user's budget, initializing it on first use"""
+        raise NotImplementedError
+
+    async def get_budget(self, user_id: str, default: int = 0) -> int:
+        """Get a user's remaining budget"""
+        raise NotImplementedError
+
+    async def debit_budget(self, user_id: str, amount: int) -> Optional[int]:
+        """Atomically take amount from a user's budget; the new value, or None if it doesn't cover amount"""
+        raise NotImplementedError
+
+    # Room leases
+    async def acquire_lease(self, room_id: str, holder: str, ttl: float) -> bool:
+        """Take or renew a room's lease for ttl seconds; False while another holder's lease is live"""
+        raise NotImplementedError
+
+    async def release_lease(self, room_id: str, holder: str):
+        """Give up a room's lease if holder still has it"""
+        raise NotImplementedError
+
+class InMemoryStateStore(AuctionStateStore):
+    """Process-local store for single-worker deployments"""
+
+    def __init__(self):
+        self.rooms: Dict[str, AuctionRoom] = {}
+        self.auctions: Dict[str, PlayerAuction] = {}
+        self.budgets: Dict[str, int] = {}
+        # Room leases: {room_id: (holder, expires_at)}
+        self.leases: Dict[str, Tuple[str, float]] = {}
+
+    async def get_room(self, room_id: str) -> Optional[AuctionRoom]:
+        """Get an auction room"""
+        return self.rooms.get(room_id)
+
+    async def save_room(self, room: AuctionRoom):
+        """Create or replace an auction room"""
+        self.rooms[room.id] = room
+
+    async def list_rooms(self) -> List[AuctionRoom]:
+        """Get all auction rooms"""
+        return list(self.rooms.values())
+
+    async def get_auction(self, room_id: str) -> Optional[PlayerAuction]:
+        """Get the live auction in a room"""
+        auction = self.auctions.get(room_id)
+        # Callers own the returned copy; the stored state only changes through this store
+        return auction.copy(deep=True) if auction else None
+
+    async def create_auction(self, auction: PlayerAuction) -> PlayerAuction:
+        """Store a new live auction for its room, starting at version 1"""
+        stored = auction.copy(update={"version": 1}, deep=True)
+        self.auctions[auction.room_id] = stored
+        return stored.copy(deep=True)
+
+    async def compare_and_set_auction(
+        self,
+        room_id: str,
+        expected_version: int,
+        changes: dict
+    ) -> Optional[PlayerAuction]:
+        """Apply changes only if the auction is still at expected_version; None if it moved on"""
+        # No await between the check and the write, so this is atomic on the event loop
+        current = self.auctions.get(room_id)
+        if current is None or current.version != expected_version:
+            return None
+        updated = current.copy(update={**changes, "version": expected_version + 1}, deep=True)
+        self.auctions[room_id] = updated
+        return updated.copy(deep=True)
+
+    async def delete_auction(self, room_id: str):
+        """Remove the live auction from a room"""
+        self.auctions.pop(room_id, None)
+
+    async def ensure_budget(self, user_id: str, default: int = DEFAULT_BUDGET) -> int:
+        """Get a user's budget, initializing it on first use"""
+        return self.budgets.setdefault(user_id, default)
+
+    async def get_budget(self, user_id: str, default: int = 0) -> int:
+        """Get a user's remaining budget"""
+        return self.budgets.get(user_id, default)
+
+    async def debit_budget(self, user_id: str, amount: int) -> Optional[int]:
+        """Atomically take amount from a user's budget; the new value, or None if it doesn't cover amount"""
+        # No await between the check and the write, so this is atomic on the event loop
+        budget = self.budgets.get(user_id)
+        if budget is None or budget < amount:
+            return None
+        self.budgets[user_id] = budget - amount
+        return self.budgets[user_id]
+
+    async def acquire_lease(self, room_id: str, holder: str, ttl: float) -> bool:
+        """Take or renew a room's lease for ttl seconds; False while another holder's lease is live"""
+        now = time.monotonic()
+        current = self.leases.get(room_id)
+        if current is not None and current[0] != holder and current[1] > now:
+            return False
+        self.leases[room_id] = (holder, now + ttl)
+        return True
+
+    async def release_lease(self, room_id: str, holder: str):
+        """Give up a room's lease if holder still has it"""
+        current = self.leases.get(room_id)
+        if current is not None and current[0] == holder:
+            del self.leases[room_id]
+
+class MongoStateStore(AuctionStateStore):
+    """Store shared by every worker, kept in MongoDB"""
+
+    def __init__(self, db):
+        self.rooms = db.auction_rooms
+        self.auctions = db.live_auctions
+        self.budgets = db.auction_budgets
+        self.leases = db.room_leases
+
+    async def get_room(self, room_id: str) -> Optional[AuctionRoom]:
+        """Get an auction room"""
+        document = await self.rooms.find_one({"id": room_id}, {"_id": 0})
+        return AuctionRoom(**document) if document else None
+
+    async def save_room(self, room: AuctionRoom):
+        """Create or replace an auction room"""
+        await self.rooms.replace_one({"id": room.id}, room.dict(), upsert=True)
+
+    async def list_rooms(self) -> List[AuctionRoom]:
+        """Get all auction rooms"""
+        documents = await self.rooms.find({}, {"_id": 0}).to_list(length=None)
+        return [AuctionRoom(**document) for document in documents]
+
+    async def get_auction(self, room_id: str) -> Optional[PlayerAuction]:
+        """Get the live auction in a room"""
+        document = await self.auctions.find_one({"room_id": room_id}, {"_id": 0})
+        return PlayerAuction(**document) if document else None
+
+    async def create_auction(self, auction: PlayerAuction) -> PlayerAuction:
+        """Store a new live auction for its room, starting at version 1"""
+        stored = auction.copy(update={"version": 1})
+        await self.auctions.replace_one({"room_id": auction.room_id}, stored.dict(), upsert=True)
+        return stored
+
+    async def compare_and_set_auction(
+        self,
+        room_id: str,
+        expected_version: int,
+        changes: dict
+    ) -> Optional[PlayerAuction]:
+        """Apply changes only if the auction is still at expected_version; None if it moved on"""
+        document = await self.auctions.find_one_and_update(
+            {"room_id": room_id, "version": expected_version},
+            {"$set": changes, "$inc": {"version": 1}},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+        return PlayerAuction(**document) if document else None
+
+    async def delete_auction(self, room_id: str):
+        """Remove the live auction from a room"""
+        await self.auctions.delete_one({"room_id": room_id})
+
+    async def ensure_budget(self, user_id: str, default: int = DEFAULT_BUDGET) -> int:
+        """Get a user's budget, initializing it on first use"""
+        document = await self.budgets.find_one_and_update(
+            {"user_id": user_id},
+            {"$setOnInsert": {"budget": default}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return document["budget"]
+
+    async def get_budget(self, user_id: str, default: int = 0) -> int:
+        """Get a user's remaining budget"""
+        document = await self.budgets.find_one({"user_id": user_id})
+        return document["budget"] if document else default
+
+    async def debit_budget(self, user_id: str, amount: int) -> Optional[int]:
+        """Atomically take amount from a user's budget; the new value, or None if it doesn't cover amount"""
+        document = await self.budgets.find_one_and_update(
+            {"user_id": user_id, "budget": {"$gte": amount}},
+            {"$inc": {"budget": -amount}},
+            return_document=ReturnDocument.AFTER
+        )
+        return document["budget"] if document else None
+
+    async def acquire_lease(self, room_id: str, holder: str, ttl: float) -> bool:
+        """Take or renew a room's lease for ttl seconds; False while another holder's lease is live"""
+        now = datetime.now(timezone.utc)
+        try:
+            # Matches only a lease this holder has or one that ran out; otherwise the
+            # upsert collides with the live lease on _id
+            await self.leases.find_one_and_update(
+                {"_id": room_id, "$or": [{"holder": holder}, {"expires_at": {"$lte": now}}]},
+                {"$set": {"holder": holder, "expires_at": now + timedelta(seconds=ttl)}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            return False
+        return True
+
+    async def release_lease(self, room_id: str, holder: str):
+        """Give up a room's lease if holder still has it"""
+        await self.leases.delete_one({"_id": room_id, "holder": holder})
+
+class CachedStateStore(AuctionStateStore):
+    """Hot in-process read cache for rooms in front of a shared store"""
+
+    def __init__(self, store: AuctionStateStore, room_ttl: float = 2.0):
+        self.store = store
+        self.room_ttl = room_ttl
+        # Cached rooms: {room_id: (expires_at, room)}
+        self.room_cache: Dict[str, Tuple[float, Optional[AuctionRoom]]] = {}
+
+    async def get_room(self, room_id: str) -> Optional[AuctionRoom]:
+        """Get an auction room, from the cache while it's fresh"""
+        cached = self.room_cache.get(room_id)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        room = await self.store.get_room(room_id)
+        self.room_cache[room_id] = (time.monotonic() + self.room_ttl, room)
+        return room
+
+    async def save_room(self, room: AuctionRoom):
+        """Write a room through to the store and the cache"""
+        await self.store.save_room(room)
+        self.room_cache[room.id] = (time.monotonic() + self.room_ttl, room)
+
+    async def list_rooms(self) -> List[AuctionRoom]:
+        """Get all auction rooms"""
+        return await self.store.list_rooms()
+
+    async def get_auction(self, room_id: str) -> Optional[PlayerAuction]:
+        """Get the live auction in a room"""
+        return await self.store.get_auction(room_id)
+
+    async def create_auction(self, auction: PlayerAuction) -> PlayerAuction:
+        """Store a new live auction for its room, starting at version 1"""
+        return await self.store.create_auction(auction)
+
+    async def compare_and_set_auction(
+        self,
+        room_id: str,
+        expected_version: int,
+        changes: dict
+    ) -> Optional[PlayerAuction]:
+        """Apply changes only if the auction is still at expected_version; None if it moved on"""
+        return await self.store.compare_and_set_auction(room_id, expected_version, changes)
+
+    async def delete_auction(self, room_id: str):
+        """Remove the live auction from a room"""
+        await self.store.delete_auction(room_id)
+
+    async def ensure_budget(self, user_id: str, default: int = DEFAULT_BUDGET) -> int:
+        """Get a user's budget, initializing it on first use"""
+        return await self.store.ensure_budget(user_id, default)
+
+    async def get_budget(self, user_id: str, default: int = 0) -> int:
+        """Get a user's remaining budget"""
+        return await self.store.get_budget(user_id, default)
+
+    async def debit_budget(self, user_id: str, amount: int) -> Optional[int]:
+        """Atomically take amount from a user's budget; the new value, or None if it doesn't cover amount"""
+        return await self.store.debit_budget(user_id, amount)
+
+    async def acquire_lease(self, room_id: str, holder: str, ttl: float) -> bool:
+        """Take or renew a room's lease for ttl seconds; False while another holder's lease is live"""
+        return await self.store.acquire_lease(room_id, holder, ttl)
+
+    async def release_lease(self, room_id: str, holder: str):
+        """Give up a room's lease if holder still has it"""
+        await self.store.release_lease(room_id, holder)
+
+def create_state_store(kind: Optional[str]) -> AuctionStateStore:
+    """Build a state store: "memory" (default) or "mongo" for multi-worker deployments"""
+    if not kind or kind == "memory":
+        return InMemoryStateStore()
+
+    if kind == "mongo":
+        from services.mongo import db
+        return CachedStateStore(MongoStateStore(db))
+
+    raise ValueError(f"Unsupported auction state store: {kind}")
@@ -1,37 +1,132 @@
 import asyncio
 import json
-from typing import Dict, List, Set, Optional
+import os
+from collections import deque
+from typing import Deque, Dict, List, Set, Optional, Tuple
 from datetime import datetime, timedelta
 from fastapi import WebSocket, WebSocketDisconnect
 from pydantic import BaseModel
+from pymongo import ReplaceOne
 import uuid
 
 from models.user import User, UserSession, Bid
 from models.auction import AuctionRoom, PlayerAuction, AuctionEvent, BidAttempt, AuctionResult
+from services.database import auction_results_collection, auction_bids_collection
+from services.idempotency import IdempotencyTable
+from services.backplane import Backplane, LocalBackplane, create_backplane
+from services.room_ownership import RoomOwnership
+from services.state_store import AuctionStateStore, InMemoryStateStore, DEFAULT_BUDGET, create_state_store
+
+# Number of room events kept per room for resume-from-offset on reconnect
+REPLAY_BUFFER_SIZE = 512
+
+# Backplane channel carrying auction state snapshots for failover
+ROOM_STATE_CHANNEL = "cluster:rooms"
+
+# Compare-and-set attempts before a bid gives up on a contended auction
+BID_CAS_ATTEMPTS = 5
+
+# Seconds a dropped user stays in their rooms before user_left, so a quick reconnect resumes unnoticed
+LEAVE_GRACE_SECONDS = 15.0
 
 class ConnectionManager:
-    def __init__(self):
+    def __init__(self, backplane: Optional[Backplane] = None, store: Optional[AuctionStateStore] = None):
+        # Identifies this worker process on the backplane
+        self.worker_id = f"worker_{uuid.uuid4().hex[:8]}"
+        # Pub/sub transport shared with other workers
+        self.backplane: Backplane = backplane or LocalBackplane()
+        # Rooms, live auction state, budgets and room leases (shared between workers when externalized)
+        self.store: AuctionStateStore = store or InMemoryStateStore()
+        # Which worker runs each room's timer and bid processing
+        self.ownership = RoomOwnership(self.worker_id, self.backplane, self.store, on_change=self.rebalance_rooms)
         # WebSocket connections: {user_id: websocket}
         self.active_connections: Dict[str, WebSocket] = {}
         # Room participants: {room_id: {user_id1, user_id2, ...}}
         self.room_participants: Dict[str, Set[str]] = {}
+        # Room subscriptions per connection: {user_id: {room_id1, room_id2, ...}}
+        self.user_rooms: Dict[str, Set[str]] = {}
+        # Display names of connected users: {user_id: username}
+        self.usernames: Dict[str, str] = {}
         # User sessions: {user_id: UserSession}
         self.user_sessions: Dict[str, UserSession] = {}
-        # Active auctions: {room_id: PlayerAuction}
+        # Active auctions, mirrored from the store as a hot read cache: {room_id: PlayerAuction}
         self.active_auctions: Dict[str, PlayerAuction] = {}
         # Auction timers: {auction_id: asyncio.Task}
         self.auction_timers: Dict[str, asyncio.Task] = {}
         # Bid history: {auction_id: [Bid, ...]}
         self.bid_history: Dict[str, List[Bid]] = {}
-        # User budgets: {user_id: remaining_budget}
-        self.user_budgets: Dict[str, int] = {}
+        # Bid outcomes by client bid ID: {auction_id: IdempotencyTable}
+        self.bid_outcomes: Dict[str, IdempotencyTable] = {}
+        # Room event sequence numbers: {room_id: last_seq}
+        self.room_sequences: Dict[str, int] = {}
+        # Replay buffers: {room_id: deque[(seq, encoded_event)]}
+        self.room_event_buffers: Dict[str, Deque[Tuple[int, str]]] = {}
+        # Highest seq no longer replayable because it was evicted: {room_id: seq}
+        self.room_replay_floor: Dict[str, int] = {}
+        # Identifies a room's run of sequence numbers; seqs from another epoch can't be replayed
+        self.room_epochs: Dict[str, str] = {}
+        # Live room events held back while a user's missed events replay: {(user_id, room_id): [(seq, payload)]}
+        self.resuming: Dict[Tuple[str, str], List[Tuple[int, str]]] = {}
+        # Disconnected users waiting out the grace period before leaving their rooms: {user_id: task}
+        self.pending_leaves: Dict[str, asyncio.Task] = {}
+        self.leave_grace = LEAVE_GRACE_SECONDS
+
+    async def start(self, backplane: Optional[Backplane] = None, store: Optional[AuctionStateStore] = None):
+        """Start the backplane and join the cluster
+
+        BACKPLANE_URL selects a networked backplane and AUCTION_STATE_STORE=mongo
+        a shared state store.
+        """
+        if backplane is not None:
+            self.backplane = backplane
+        elif os.environ.get("BACKPLANE_URL"):
+            self.backplane = create_backplane(os.environ["BACKPLANE_URL"])
+        if store is not None:
+            self.store = store
+        elif os.environ.get("AUCTION_STATE_STORE"):
+            self.store = create_state_store(os.environ["AUCTION_STATE_STORE"])
+        self.ownership.backplane = self.backplane
+        self.ownership.store = self.store
+        await self.backplane.start()
+        await self.backplane.subscribe(f"worker:{self.worker_id}", self.handle_worker_command)
+        await self.backplane.subscribe(ROOM_STATE_CHANNEL, self.handle_room_snapshot)
+        await self.ownership.start()
+
+    async def stop(self):
+        """Hand rooms over to other workers and stop the backplane"""
+        for room_id in list(self.ownership.held_rooms):
+            auction = self.active_auctions.get(room_id)
+            if auction and auction.id in self.auction_timers:
+                self.auction_timers.pop(auction.id).cancel()
+            await self.replicate_room(room_id)
+        await self.ownership.stop()
+        await self.backplane.close()
 
     async def connect(self, websocket: WebSocket, user_id: str, username: str):
         """Connect a user to the WebSocket"""
         await websocket.accept()
         
-        # Store connection
+        # Back within the grace period: the user never left their rooms
+        pending_leave = self.pending_leaves.pop(user_id, None)
+        if pending_leave is not None:
+            pending_leave.cancel()
+        
+        # Store connection before closing the one it replaces, so the old socket's
+        # disconnect finds itself superseded and leaves the new registration alone
+        previous = self.active_connections.get(user_id)
         self.active_connections[user_id] = websocket
+        self.usernames[user_id] = username
+        
+        # One connection per user: close the previous socket instead of orphaning it
+        if previous is not None and previous is not websocket:
+            try:
+                await previous.close(code=4009, reason="Superseded by a new connection")
+            except:
+                pass
+        
+        if previous is None:
+            # Personal messages from the worker running a room arrive on this channel
+            await self.backplane.subscribe(f"user:{user_id}", self.handle_remote_personal_message)
         
         # Create user session
         session = UserSession(
@@ -43,8 +138,7 @@ class ConnectionManager:
         self.user_sessions[user_id] = session
         
         # Initialize user budget if not exists
-        if user_id not in self.user_budgets:
-            self.user_budgets[user_id] = 100_000_000  # £100M default
+        budget = await self.store.ensure_budget(user_id)
         
         print(f"User {username} ({user_id}) connected")
         
@@ -54,31 +148,60 @@ class ConnectionManager:
             "user_id": user_id,
             "username": username,
             "session_id": session.session_id,
-            "budget": self.user_budgets[user_id],
+            "budget": budget,
             "timestamp": datetime.now().isoformat()
         }, user_id)
 
-    async def disconnect(self, user_id: str):
+    async def disconnect(self, user_id: str, websocket: Optional[WebSocket] = None):
         """Disconnect a user"""
+        # A superseded socket closing must not tear down its replacement
+        if websocket is not None and self.active_connections.get(user_id) is not websocket:
+            return
+        
         if user_id in self.active_connections:
             del self.active_connections[user_id]
+            await self.backplane.unsubscribe(f"user:{user_id}", self.handle_remote_personal_message)
         
         if user_id in self.user_sessions:
             del self.user_sessions[user_id]
+        for key in [key for key in self.resuming if key[0] == user_id]:
+            del self.resuming[key]
         
-        # Remove from all rooms
-        for room_id in list(self.room_participants.keys()):
-            if user_id in self.room_participants[room_id]:
-                await self.leave_room(user_id, room_id)
+        # Leave subscribed rooms only if the user doesn't come back in time
+        if self.leave_grace > 0 and self.user_rooms.get(user_id):
+            if user_id not in self.pending_leaves:
+                self.pending_leaves[user_id] = asyncio.create_task(self.leave_after_grace(user_id))
+        else:
+            await self.leave_all_rooms(user_id)
         
         print(f"User {user_id} disconnected")
 
-    async def join_room(self, user_id: str, username: str, room_id: str):
-        """Add user to auction room"""
+    async def leave_after_grace(self, user_id: str):
+        """Leave a disconnected user's rooms once the grace period passes without a reconnect"""
+        await asyncio.sleep(self.leave_grace)
+        self.pending_leaves.pop(user_id, None)
+        if user_id not in self.active_connections:
+            await self.leave_all_rooms(user_id)
+
+    async def leave_all_rooms(self, user_id: str):
+        """Remove a user from every room they're subscribed to"""
+        for room_id in list(self.user_rooms.get(user_id, ())):
+            await self.leave_room(user_id, room_id)
+        self.user_rooms.pop(user_id, None)
+        self.usernames.pop(user_id, None)
+
+    async def add_participant(self, user_id: str, room_id: str):
+        """Track a user in a room, following the room on the backplane on first local member"""
         if room_id not in self.room_participants:
             self.room_participants[room_id] = set()
+            await self.backplane.subscribe(f"room:{room_id}", self.handle_remote_room_event)
         
         self.room_participants[room_id].add(user_id)
+        self.user_rooms.setdefault(user_id, set()).add(room_id)
+
+    async def join_room(self, user_id: str, username: str, room_id: str):
+        """Add user to auction room"""
+        await self.add_participant(user_id, room_id)
         
         # Broadcast user joined event
         await self.broadcast_to_room({
@@ -93,13 +216,91 @@ class ConnectionManager:
         # Send room state to new user
         await self.send_room_state(user_id, room_id)
 
+    async def resume_room(self, user_id: str, room_id: str, last_seq: int, epoch: Optional[str] = None) -> bool:
+        """Re-attach a reconnecting user and replay only the events it missed
+
+        Live events for the room are held back until the replay is sent, so the
+        client receives every seq in order. A user back within the grace period
+        never left, so the resume is silent; one whose user_left already went
+        out is announced again.
+        """
+        key = (user_id, room_id)
+        held = self.resuming[key] = []
+        try:
+            rejoined = user_id not in self.room_participants.get(room_id, ())
+            await self.add_participant(user_id, room_id)
+            if rejoined:
+                await self.broadcast_to_room({
+                    "type": "user_joined",
+                    "room_id": room_id,
+                    "user_id": user_id,
+                    "username": self.usernames.get(user_id, "Unknown"),
+                    "participants_count": len(self.room_participants[room_id]),
+                    "timestamp": datetime.now().isoformat()
+                }, room_id)
+            
+            # Read together with no await in between, so held events are exactly those after sent_seq
+            missed = self.events_since(room_id, last_seq, epoch)
+            sent_seq = self.room_sequences.get(room_id, 0)
+            if missed is None:
+                # Gap too large, or an offset from another epoch: fall back to a full snapshot
+                sent_seq = await self.send_room_state(user_id, room_id)
+            else:
+                for payload in missed:
+                    if not await self.send_encoded(payload, user_id):
+                        return False
+                await self.send_personal_message({
+                    "type": "resume_complete",
+                    "channel": room_id,
+                    "room_id": room_id,
+                    "replayed": len(missed),
+                    "seq": sent_seq,
+                    "epoch": self.room_epochs.get(room_id),
+                    "timestamp": datetime.now().isoformat()
+                }, user_id)
+            
+            # Events held during the replay; more may arrive while these are sent
+            while held:
+                seq, payload = held.pop(0)
+                if seq > sent_seq and not await self.send_encoded(payload, user_id):
+                    return False
+            return missed is not None
+        finally:
+            if self.resuming.get(key) is held:
+                del self.resuming[key]
+
+    def events_since(self, room_id: str, last_seq: int, epoch: Optional[str] = None) -> Optional[List[str]]:
+        """Get encoded room events after last_seq, or None if they can't all be replayed"""
+        # A seq only means something within the epoch it was issued in
+        if epoch is None or epoch != self.room_epochs.get(room_id):
+            return None
+        current_seq = self.room_sequences.get(room_id, 0)
+        if last_seq < self.room_replay_floor.get(room_id, 0) or last_seq > current_seq:
+            return None
+        
+        buffer = self.room_event_buffers.get(room_id)
+        if not buffer or last_seq == current_seq:
+            return []
+        
+        # Sequence numbers are monotonic, so skip from the newest end
+        missed = []
+        for seq, payload in reversed(buffer):
+            if seq <= last_seq:
+                break
+            missed.append(payload)
+        missed.reverse()
+        return missed
+
     async def leave_room(self, user_id: str, room_id: str):
         """Remove user from auction room"""
+        if user_id in self.user_rooms:
+            self.user_rooms[user_id].discard(room_id)
+        
         if room_id in self.room_participants and user_id in self.room_participants[room_id]:
             self.room_participants[room_id].remove(user_id)
             
             # Get username for broadcast
-            username = self.user_sessions.get(user_id, {}).get("username", "Unknown")
+            username = self.usernames.get(user_id, "Unknown")
             
             # Broadcast user left event
             await self.broadcast_to_room({
@@ -114,9 +315,23 @@ class ConnectionManager:
             # Clean up empty rooms
             if len(self.room_participants[room_id]) == 0:
                 del self.room_participants[room_id]
+                await self.backplane.unsubscribe(f"room:{room_id}", self.handle_remote_room_event)
+                self.drop_room_stream(room_id)
 
-    async def start_auction(self, room_id: str, player_data: dict):
-        """Start a new player auction in a room"""
+    async def start_auction(self, room_id: str, player_data: dict, forwarded: bool = False) -> Optional[PlayerAuction]:
+        """Start a new player auction in a room (None if another worker runs the room)"""
+        runner = self.room_runner(room_id)
+        if runner != self.worker_id or not await self.ownership.acquire(room_id):
+            if not forwarded:
+                await self.forward_to_worker(runner, {
+                    "type": "start_auction",
+                    "room_id": room_id,
+                    "player_data": player_data
+                })
+            else:
+                print(f"Dropping start_auction for {room_id}: room is moving between workers")
+            return None
+        
         auction = PlayerAuction(
             room_id=room_id,
             player_id=player_data["id"],
@@ -125,14 +340,18 @@ class ConnectionManager:
             player_position=player_data["position"],
             player_image=player_data["image"],
             player_stats=player_data.get("stats", {}),
+            base_price=player_data.get("basePrice"),
             starting_bid=1_000_000,
             current_bid=1_000_000,
             status="active",
             started_at=datetime.now()
         )
         
+        auction = await self.store.create_auction(auction)
         self.active_auctions[room_id] = auction
         self.bid_history[auction.id] = []
+        self.bid_outcomes[auction.id] = IdempotencyTable()
+        await self.mark_auction_started(room_id, auction)
         
         # Start auction timer
         timer_task = asyncio.create_task(self.auction_timer(auction.id, room_id))
@@ -145,41 +364,153 @@ class ConnectionManager:
             "auction": auction.dict(),
             "timestamp": datetime.now().isoformat()
         }, room_id)
+        await self.replicate_room(room_id)
+        
+        return auction
 
-    async def place_bid(self, user_id: str, username: str, room_id: str, bid_amount: int):
+    async def mark_auction_started(self, room_id: str, auction: PlayerAuction):
+        """Take a started auction's player off the room's queue"""
+        room = await self.store.get_room(room_id)
+        if room is None:
+            return
+        room.status = "active"
+        room.current_auction = auction.id
+        if auction.player_id in room.auction_queue:
+            room.auction_queue.remove(auction.player_id)
+        await self.store.save_room(room)
+    
+    async def place_bid(
+        self,
+        user_id: str,
+        username: str,
+        room_id: str,
+        bid_amount: int,
+        bid_id: Optional[str] = None,
+        forwarded: bool = False
+    ):
         """Process a bid attempt"""
+        runner = self.room_runner(room_id)
+        # A mirrored auction takes no bids here until this worker holds the room's lease
+        unleased = runner == self.worker_id and room_id in self.active_auctions and not self.ownership.holds(room_id)
+        if runner != self.worker_id or unleased:
+            if forwarded or unleased:
+                # Ownership is changing hands; the client retries with the same bid_id
+                await self.send_personal_message({
+                    "type": "bid_error",
+                    "channel": room_id,
+                    "message": "Auction room is moving to another server, please retry",
+                    "bid_id": bid_id,
+                    "timestamp": datetime.now().isoformat()
+                }, user_id)
+                return False
+            # The worker running the room reports the outcome to the bidder
+            await self.forward_to_worker(runner, {
+                "type": "place_bid",
+                "user_id": user_id,
+                "username": username,
+                "room_id": room_id,
+                "bid_amount": bid_amount,
+                "bid_id": bid_id
+            })
+            return None
+        
         if room_id not in self.active_auctions:
             await self.send_personal_message({
                 "type": "bid_error",
+                "channel": room_id,
                 "message": "No active auction in this room",
+                "bid_id": bid_id,
                 "timestamp": datetime.now().isoformat()
             }, user_id)
             return False
         
         auction = self.active_auctions[room_id]
-        user_budget = self.user_budgets.get(user_id, 0)
         
-        # Validate bid
-        if bid_amount < auction.minimum_next_bid:
-            await self.send_personal_message({
-                "type": "bid_error",
-                "message": f"Minimum bid is £{auction.minimum_next_bid:,}",
-                "timestamp": datetime.now().isoformat()
-            }, user_id)
-            return False
+        # Retried bid: answer with the original outcome, nothing is re-processed
+        outcomes = self.bid_outcomes.get(auction.id)
+        dedup_key = f"{user_id}:{bid_id}" if bid_id and outcomes is not None else None
+        outcome = None
+        if dedup_key:
+            previous = outcomes.get(dedup_key)
+            if previous is not None:
+                # A retry racing the original waits for its outcome
+                success, response = await asyncio.shield(previous)
+                await self.send_personal_message({**response, "duplicate": True}, user_id)
+                return success
+            # Claim the bid ID before the first await so a racing retry finds it
+            outcome = asyncio.get_running_loop().create_future()
+            outcomes.put(dedup_key, outcome)
         
-        if bid_amount > user_budget:
-            await self.send_personal_message({
-                "type": "bid_error",
-                "message": f"Insufficient budget. You have £{user_budget:,} remaining",
-                "timestamp": datetime.now().isoformat()
-            }, user_id)
-            return False
+        try:
+            success, response = await self.apply_bid(user_id, username, room_id, bid_amount, bid_id)
+        except Exception:
+            if outcome is not None:
+                # Let a later retry process the bid again
+                outcomes.discard(dedup_key)
+                outcome.set_result((False, self.bid_error(room_id, bid_id, "Bid could not be processed, please retry")))
+            raise
+        
+        if outcome is not None:
+            outcome.set_result((success, response))
+        await self.send_personal_message(response, user_id)
+        return success
+
+    async def apply_bid(
+        self,
+        user_id: str,
+        username: str,
+        room_id: str,
+        bid_amount: int,
+        bid_id: Optional[str]
+    ) -> Tuple[bool, dict]:
+        """Validate a bid and commit it with compare-and-set, re-validating if the state moved"""
+        user_budget = await self.store.get_budget(user_id)
+        
+        for _ in range(BID_CAS_ATTEMPTS):
+            auction = self.active_auctions.get(room_id)
+            if auction is None:
+                return False, self.bid_error(room_id, bid_id, "No active auction in this room")
+            
+            # Validate bid
+            if bid_amount < auction.minimum_next_bid:
+                return False, self.bid_error(room_id, bid_id, f"Minimum bid is £{auction.minimum_next_bid:,}")
+            
+            if bid_amount > user_budget:
+                return False, self.bid_error(
+                    room_id, bid_id, f"Insufficient budget. You have £{user_budget:,} remaining"
+                )
+            
+            changes = {
+                "current_bid": bid_amount,
+                "minimum_next_bid": bid_amount + auction.bid_increment,
+                "current_winner": user_id,
+                "current_winner_username": username,
+                "total_bids": auction.total_bids + 1,
+                "last_bid_time": datetime.now(),
+                # Extend timer if bid placed in last 30 seconds
+                "time_remaining": max(auction.time_remaining, 30)
+            }
+            
+            # Add user to participants if not already there
+            if user_id not in auction.participants:
+                changes["participants"] = auction.participants + [user_id]
+                changes["participant_usernames"] = auction.participant_usernames + [username]
+            
+            updated = await self.store.compare_and_set_auction(room_id, auction.version, changes)
+            if updated is not None:
+                break
+            
+            # Lost a race (timer tick or a concurrent bid): re-validate against the latest state
+            await self.refresh_auction(room_id)
+        else:
+            return False, self.bid_error(room_id, bid_id, "Auction is busy, please retry")
+        
+        self.active_auctions[room_id] = updated
         
         # Process successful bid
         bid = Bid(
-            auction_id=auction.id,
-            player_id=auction.player_id,
+            auction_id=updated.id,
+            player_id=updated.player_id,
             user_id=user_id,
             username=username,
             amount=bid_amount,
@@ -187,52 +518,66 @@ class ConnectionManager:
         )
         
         # Mark previous winning bid as no longer winning
-        for prev_bid in self.bid_history[auction.id]:
+        history = self.bid_history.setdefault(updated.id, [])
+        for prev_bid in history:
             prev_bid.is_winning = False
         
         # Add new bid to history
-        self.bid_history[auction.id].append(bid)
-        
-        # Update auction state
-        auction.current_bid = bid_amount
-        auction.minimum_next_bid = bid_amount + auction.bid_increment
-        auction.current_winner = user_id
-        auction.current_winner_username = username
-        auction.total_bids += 1
-        auction.last_bid_time = datetime.now()
-        
-        # Add user to participants if not already there
-        if user_id not in auction.participants:
-            auction.participants.append(user_id)
-            auction.participant_usernames.append(username)
-        
-        # Extend timer if bid placed in last 30 seconds
-        if auction.time_remaining < 30:
-            auction.time_remaining = 30
+        history.append(bid)
         
         # Broadcast bid update
         await self.broadcast_to_room({
             "type": "bid_placed",
             "room_id": room_id,
-            "auction_id": auction.id,
+            "auction_id": updated.id,
             "bid": bid.dict(),
             "auction_state": {
-                "current_bid": auction.current_bid,
-                "minimum_next_bid": auction.minimum_next_bid,
-                "current_winner": auction.current_winner_username,
-                "total_bids": auction.total_bids,
-                "time_remaining": auction.time_remaining,
-                "participants_count": len(auction.participants)
+                "current_bid": updated.current_bid,
+                "minimum_next_bid": updated.minimum_next_bid,
+                "current_winner": updated.current_winner_username,
+                "total_bids": updated.total_bids,
+                "time_remaining": updated.time_remaining,
+                "participants_count": len(updated.participants)
             },
             "timestamp": datetime.now().isoformat()
         }, room_id)
-        
-        return True
+        await self.replicate_room(room_id)
+        
+        return True, {
+            "type": "bid_confirmed",
+            "channel": room_id,
+            "message": f"Bid of £{bid_amount:,} placed successfully",
+            "bid_id": bid_id,
+            "new_budget": user_budget,
+            "timestamp": datetime.now().isoformat()
+        }
+
+    def bid_error(self, room_id: str, bid_id: Optional[str], message: str) -> dict:
+        """Build a bid_error message for a bidder"""
+        return {
+            "type": "bid_error",
+            "channel": room_id,
+            "message": message,
+            "bid_id": bid_id,
+            "timestamp": datetime.now().isoformat()
+        }
+
+    async def refresh_auction(self, room_id: str) -> Optional[PlayerAuction]:
+        """Reload a room's live auction from the store"""
+        latest = await self.store.get_auction(room_id)
+        if latest is None:
+            self.active_auctions.pop(room_id, None)
+        else:
+            self.active_auctions[room_id] = latest
+        return latest
 
     async def auction_timer(self, auction_id: str, room_id: str):
         """Handle auction countdown timer"""
         try:
             while room_id in self.active_auctions:
+                if not self.ownership.holds(room_id):
+                    # Lease lost: the worker that took it runs the clock from the stored state
+                    break
                 auction = self.active_auctions[room_id]
                 
                 if auction.time_remaining <= 0:
@@ -248,43 +593,65 @@ class ConnectionManager:
                     "auction_id": auction.id,
                     "time_remaining": auction.time_remaining,
                     "timestamp": datetime.now().isoformat()
-                }, room_id)
+                }, room_id, replayable=False)
                 
                 await asyncio.sleep(update_interval)
-                auction.time_remaining -= update_interval
+                await self.tick_auction(room_id, update_interval)
+                await self.replicate_room(room_id)
                 
         except asyncio.CancelledError:
             print(f"Auction timer cancelled for {auction_id}")
 
+    async def tick_auction(self, room_id: str, elapsed: int):
+        """Count down the auction clock through the store"""
+        for _ in range(BID_CAS_ATTEMPTS):
+            auction = self.active_auctions.get(room_id)
+            if auction is None:
+                return
+            updated = await self.store.compare_and_set_auction(
+                room_id, auction.version, {"time_remaining": auction.time_remaining - elapsed}
+            )
+            if updated is not None:
+                self.active_auctions[room_id] = updated
+                return
+            await self.refresh_auction(room_id)
+
     async def end_auction(self, room_id: str):
         """End the current auction in a room"""
         if room_id not in self.active_auctions:
             return
         
         auction = self.active_auctions[room_id]
-        auction.status = "sold" if auction.current_winner else "unsold"
         auction.ended_at = datetime.now()
         
-        # Cancel timer
+        # Cancel timer (unless the timer itself is ending the auction)
         if auction.id in self.auction_timers:
-            self.auction_timers[auction.id].cancel()
-            del self.auction_timers[auction.id]
+            timer_task = self.auction_timers.pop(auction.id)
+            if timer_task is not asyncio.current_task():
+                timer_task.cancel()
         
-        # Update winner's budget if there's a winner
+        # Charge the winner, who may have spent their budget in another room since bidding
         if auction.current_winner:
-            self.user_budgets[auction.current_winner] -= auction.current_bid
+            await self.charge_winner(auction)
+        auction.status = "sold" if auction.current_winner else "unsold"
         
         # Create auction result
         result = AuctionResult(
             auction_id=auction.id,
+            room_id=room_id,
             player_id=auction.player_id,
             player_name=auction.player_name,
+            player_team=auction.player_team,
+            player_position=auction.player_position,
+            base_price=auction.base_price,
+            starting_bid=auction.starting_bid,
             winning_bid=auction.current_bid,
             winner_user_id=auction.current_winner,
             winner_username=auction.current_winner_username,
             total_bids=auction.total_bids,
             participants_count=len(auction.participants),
-            auction_duration=300 - auction.time_remaining
+            auction_duration=300 - auction.time_remaining,
+            started_at=auction.started_at
         )
         
         # Broadcast auction ended
@@ -297,41 +664,292 @@ class ConnectionManager:
         }, room_id)
         
         # Clean up
-        del self.active_auctions[room_id]
-        if auction.id in self.bid_history:
-            del self.bid_history[auction.id]
+        await self.store.delete_auction(room_id)
+        self.active_auctions.pop(room_id, None)
+        bids = self.bid_history.pop(auction.id, [])
+        self.bid_outcomes.pop(auction.id, None)
+        await self.replicate_room(room_id)
+        await self.ownership.release(room_id)
+        self.drop_room_stream(room_id)
+        
+        # Keep a durable record for exports and analytics
+        await self.save_result(result, bids)
+
+    async def charge_winner(self, auction: PlayerAuction):
+        """Debit the winning bid, falling back to the next highest bidder who can still pay theirs"""
+        candidates = [(auction.current_winner, auction.current_winner_username, auction.current_bid)]
+        seen = {auction.current_winner}
+        for bid in reversed(self.bid_history.get(auction.id, [])):
+            if bid.user_id not in seen:
+                seen.add(bid.user_id)
+                candidates.append((bid.user_id, bid.username, bid.amount))
+        
+        for user_id, username, amount in candidates:
+            if await self.store.debit_budget(user_id, amount) is not None:
+                auction.current_winner = user_id
+                auction.current_winner_username = username
+                auction.current_bid = amount
+                return
+            print(f"Budget of {user_id} no longer covers {amount} for {auction.id}")
+        
+        auction.current_winner = None
+        auction.current_winner_username = None
+    
+    async def save_result(self, result: AuctionResult, bids: List[Bid]):
+        """Persist a finished auction's bid log, then its result"""
+        try:
+            # Saved first, so analytics that see the result also see its bids
+            if bids:
+                await auction_bids_collection.bulk_write([
+                    ReplaceOne({"id": bid.id}, self.bid_document(bid, result), upsert=True) for bid in bids
+                ], ordered=False)
+            await auction_results_collection.replace_one({"auction_id": result.auction_id}, result.dict(), upsert=True)
+        except Exception as e:
+            print(f"Failed to save result of {result.auction_id}: {e}")
+
+    def bid_document(self, bid: Bid, result: AuctionResult) -> dict:
+        """A bid as logged for analytics, with the seconds since its auction opened"""
+        offset = (bid.timestamp - result.started_at).total_seconds() if result.started_at else None
+        return {**bid.dict(), "room_id": result.room_id, "offset_seconds": offset}
+
+    def room_runner(self, room_id: str) -> str:
+        """Worker that processes a room: its lease holder, else its ring owner"""
+        return self.ownership.lease_holder(room_id) or self.ownership.owner_of(room_id)
+
+    async def forward_to_worker(self, worker_id: str, command: dict):
+        """Send a room command to the worker running that room"""
+        await self.backplane.publish(f"worker:{worker_id}", {**command, "origin": self.worker_id})
+
+    async def handle_worker_command(self, channel: str, command: dict):
+        """Run a room command forwarded by another worker"""
+        command_type = command.get("type")
+        room_id = command["room_id"]
+        
+        if command_type == "place_bid":
+            await self.place_bid(
+                command["user_id"],
+                command["username"],
+                room_id,
+                command["bid_amount"],
+                command.get("bid_id"),
+                forwarded=True
+            )
+        elif command_type == "start_auction":
+            await self.start_auction(room_id, command["player_data"], forwarded=True)
+        elif command_type == "broadcast":
+            await self.broadcast_to_room(command["message"], room_id, command.get("replayable", True), forwarded=True)
+
+    async def replicate_room(self, room_id: str):
+        """Publish the latest auction state so another worker can take the room over"""
+        auction = self.active_auctions.get(room_id)
+        await self.backplane.publish(ROOM_STATE_CHANNEL, {
+            "origin": self.worker_id,
+            "room_id": room_id,
+            "seq": self.room_sequences.get(room_id, 0),
+            "epoch": self.room_epochs.get(room_id),
+            "auction": auction.dict() if auction else None,
+            "bid_history": [bid.dict() for bid in self.bid_history.get(auction.id, [])] if auction else []
+        })
+
+    async def handle_room_snapshot(self, channel: str, snapshot: dict):
+        """Mirror auction state published by the worker running a room"""
+        room_id = snapshot["room_id"]
+        if snapshot.get("origin") == self.worker_id or self.ownership.holds(room_id):
+            return
+        
+        previous = self.active_auctions.pop(room_id, None)
+        if previous is not None:
+            self.bid_history.pop(previous.id, None)
+        
+        if snapshot["auction"] is not None:
+            auction = PlayerAuction(**snapshot["auction"])
+            self.active_auctions[room_id] = auction
+            self.bid_history[auction.id] = [Bid(**bid) for bid in snapshot["bid_history"]]
+        
+        epoch = snapshot.get("epoch")
+        if epoch is not None and epoch != self.room_epochs.get(room_id):
+            # Events before the snapshot were never seen here, so none of them can be replayed
+            self.reset_room_stream(room_id, epoch)
+            self.room_replay_floor[room_id] = snapshot["seq"]
+        self.room_sequences[room_id] = max(self.room_sequences.get(room_id, 0), snapshot["seq"])
+
+    async def rebalance_rooms(self):
+        """Hand off rooms this worker no longer owns and take over orphaned ones"""
+        for room_id, auction in list(self.active_auctions.items()):
+            running = auction.id in self.auction_timers
+            
+            if running and not (self.ownership.is_owner(room_id) and self.ownership.holds(room_id)):
+                # Scaled out or lease lost: stop here and hand the latest state to the new owner
+                self.auction_timers.pop(auction.id).cancel()
+                if self.ownership.holds(room_id):
+                    await self.replicate_room(room_id)
+                    await self.ownership.release(room_id)
+                await self.ownership.send_heartbeat()
+            
+            elif not running and await self.ownership.acquire(room_id):
+                # Previous owner died or handed over: resume from the latest stored state
+                print(f"Worker {self.worker_id} taking over auction room {room_id}")
+                latest = await self.store.get_auction(room_id)
+                if latest is None:
+                    # Store isn't shared with the previous owner: seed it from the replicated mirror
+                    latest = await self.store.create_auction(auction)
+                auction = self.active_auctions[room_id] = latest
+                self.bid_outcomes.setdefault(auction.id, IdempotencyTable())
+                self.auction_timers[auction.id] = asyncio.create_task(self.auction_timer(auction.id, room_id))
+                await self.ownership.send_heartbeat()
 
     async def send_personal_message(self, message: dict, user_id: str):
         """Send message to specific user"""
+        payload = json.dumps(message, default=str)
         if user_id in self.active_connections:
-            try:
-                await self.active_connections[user_id].send_text(json.dumps(message))
-            except:
-                # Connection closed, clean up
-                await self.disconnect(user_id)
+            await self.send_encoded(payload, user_id)
+        else:
+            # The user's socket may be held by another worker
+            await self.backplane.publish(f"user:{user_id}", {"origin": self.worker_id, "payload": payload})
+
+    async def handle_remote_personal_message(self, channel: str, message: dict):
+        """Deliver a personal message sent by another worker"""
+        if message.get("origin") != self.worker_id:
+            await self.send_encoded(message["payload"], channel.split(":", 1)[1])
+
+    async def send_encoded(self, payload: str, user_id: str) -> bool:
+        """Send an already encoded message to a specific user"""
+        websocket = self.active_connections.get(user_id)
+        if websocket is None:
+            return False
+        try:
+            await websocket.send_text(payload)
+            return True
+        except:
+            # Connection closed, clean up (unless the user has reconnected meanwhile)
+            await self.disconnect(user_id, websocket)
+            return False
+
+    def room_epoch(self, room_id: str) -> str:
+        """Get the epoch of a room's sequence, starting a new one if this worker has none"""
+        epoch = self.room_epochs.get(room_id)
+        if epoch is None:
+            epoch = self.room_epochs[room_id] = uuid.uuid4().hex[:8]
+        return epoch
+
+    def reset_room_stream(self, room_id: str, epoch: Optional[str]):
+        """Start following a room's sequence afresh under a new epoch"""
+        self.room_sequences.pop(room_id, None)
+        self.room_event_buffers.pop(room_id, None)
+        self.room_replay_floor.pop(room_id, None)
+        if epoch is None:
+            self.room_epochs.pop(room_id, None)
+        else:
+            self.room_epochs[room_id] = epoch
+
+    def drop_room_stream(self, room_id: str):
+        """Forget a room's sequence and replay buffer once this worker neither follows nor runs it"""
+        if room_id not in self.room_participants and room_id not in self.active_auctions:
+            self.reset_room_stream(room_id, None)
+
+    def record_room_event(self, message: dict, room_id: str, replayable: bool = True) -> str:
+        """Stamp a room event with the next sequence number and encode it once"""
+        seq = self.room_sequences.get(room_id, 0) + 1
+        self.room_sequences[room_id] = seq
+        message["channel"] = room_id
+        message["seq"] = seq
+        message["epoch"] = self.room_epoch(room_id)
+        payload = json.dumps(message, default=str)
+        
+        if replayable:
+            self.buffer_room_event(room_id, seq, payload)
+        
+        return payload
+
+    def buffer_room_event(self, room_id: str, seq: int, payload: str):
+        """Append an encoded event to the room's replay buffer"""
+        buffer = self.room_event_buffers.get(room_id)
+        if buffer is None:
+            buffer = deque(maxlen=REPLAY_BUFFER_SIZE)
+            self.room_event_buffers[room_id] = buffer
+        if len(buffer) == buffer.maxlen:
+            # Oldest event is about to be evicted and can no longer be replayed
+            self.room_replay_floor[room_id] = buffer[0][0]
+        buffer.append((seq, payload))
+
+    async def broadcast_to_room(self, message: dict, room_id: str, replayable: bool = True, forwarded: bool = False):
+        """Broadcast message to all users in a room, on this worker and through the backplane"""
+        runner = self.room_runner(room_id)
+        if runner != self.worker_id and not forwarded:
+            # The worker running the room is the single sequencer for its events
+            await self.forward_to_worker(runner, {
+                "type": "broadcast",
+                "room_id": room_id,
+                "message": message,
+                "replayable": replayable
+            })
+            return
+        
+        payload = self.record_room_event(message, room_id, replayable)
+        
+        await self.deliver_to_room(payload, room_id, message["seq"])
+        
+        await self.backplane.publish(f"room:{room_id}", {
+            "origin": self.worker_id,
+            "seq": message["seq"],
+            "epoch": message["epoch"],
+            "replayable": replayable,
+            "payload": payload
+        })
+
+    async def handle_remote_room_event(self, channel: str, event: dict):
+        """Deliver a room event published by another worker to local sockets"""
+        if event.get("origin") == self.worker_id:
+            return
+        
+        room_id = channel.split(":", 1)[1]
+        seq = event["seq"]
+        if event.get("epoch") != self.room_epochs.get(room_id):
+            # The runner restarted the room's sequence (a new worker or a restart)
+            self.reset_room_stream(room_id, event.get("epoch"))
+        current_seq = self.room_sequences.get(room_id, 0)
+        
+        if seq > current_seq + 1:
+            # Events were missed while this worker wasn't following the room
+            self.room_replay_floor[room_id] = max(self.room_replay_floor.get(room_id, 0), seq - 1)
+        self.room_sequences[room_id] = max(current_seq, seq)
+        
+        if event.get("replayable", True):
+            self.buffer_room_event(room_id, seq, event["payload"])
+        
+        await self.deliver_to_room(event["payload"], room_id, seq)
 
-    async def broadcast_to_room(self, message: dict, room_id: str):
-        """Broadcast message to all users in a room"""
+    async def deliver_to_room(self, payload: str, room_id: str, seq: int):
+        """Send an encoded event to the room's sockets held by this worker"""
         if room_id in self.room_participants:
             disconnected_users = []
-            for user_id in self.room_participants[room_id]:
-                if user_id in self.active_connections:
+            for user_id in list(self.room_participants[room_id]):
+                held = self.resuming.get((user_id, room_id))
+                if held is not None:
+                    # Sent once the user's replay is done
+                    held.append((seq, payload))
+                elif user_id in self.active_connections:
+                    websocket = self.active_connections[user_id]
                     try:
-                        await self.active_connections[user_id].send_text(json.dumps(message))
+                        await websocket.send_text(payload)
                     except:
-                        disconnected_users.append(user_id)
+                        disconnected_users.append((user_id, websocket))
             
-            # Clean up disconnected users
-            for user_id in disconnected_users:
-                await self.disconnect(user_id)
+            # Clean up disconnected users (only the sockets that failed)
+            for user_id, websocket in disconnected_users:
+                await self.disconnect(user_id, websocket)
 
-    async def send_room_state(self, user_id: str, room_id: str):
-        """Send current room state to a user"""
+    async def send_room_state(self, user_id: str, room_id: str) -> int:
+        """Send current room state to a user, returning the seq it's current as of"""
+        user_budget = await self.store.get_budget(user_id, DEFAULT_BUDGET)
         room_state = {
             "type": "room_state",
+            "channel": room_id,
             "room_id": room_id,
             "participants_count": len(self.room_participants.get(room_id, [])),
-            "user_budget": self.user_budgets.get(user_id, 100_000_000),
+            "user_budget": user_budget,
+            "seq": self.room_sequences.get(room_id, 0),
+            "epoch": self.room_epochs.get(room_id),
             "timestamp": datetime.now().isoformat()
         }
         
@@ -342,6 +960,7 @@ class ConnectionManager:
             room_state["bid_history"] = [bid.dict() for bid in self.bid_history.get(auction.id, [])]
         
         await self.send_personal_message(room_state, user_id)
+        return room_state["seq"]
 
 # Global connection manager instance
 manager = ConnectionManager()
\ No newline at end of file
@@ -8,6 +8,12 @@ class AuctionWebSocketService {
     this.reconnectInterval = 5000;
     this.maxReconnectAttempts = 5;
     this.reconnectAttempts = 0;
+    this.lastSeq = null;
+    this.epoch = null;
+    // Bids sent but not yet confirmed or rejected, resent with the same bid_id after a reconnect
+    this.pendingBids = new Map();
+    this.currentAuctionId = null;
+    this.resuming = false;
   }
 
   // Connect to auction room WebSocket
@@ -17,13 +23,24 @@ class AuctionWebSocketService {
       return;
     }
 
+    // Only resume from an offset within the same room
+    if (this.roomId !== roomId) {
+      this.lastSeq = null;
+      this.epoch = null;
+      this.pendingBids.clear();
+      this.currentAuctionId = null;
+    }
+
     this.roomId = roomId;
     this.userId = userId;
     this.username = username;
 
     const backendUrl = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8001';
     const wsUrl = backendUrl.replace('http', 'ws');
-    const websocketUrl = `${wsUrl}/api/auctions/ws/${roomId}?user_id=${userId}&username=${encodeURIComponent(username)}`;
+    let websocketUrl = `${wsUrl}/api/auctions/ws/${roomId}?user_id=${userId}&username=${encodeURIComponent(username)}`;
+    if (this.lastSeq !== null && this.epoch) {
+      websocketUrl += `&last_seq=${this.lastSeq}&epoch=${encodeURIComponent(this.epoch)}`;
+    }
 
     console.log('Connecting to WebSocket:', websocketUrl);
 
@@ -33,6 +50,8 @@ class AuctionWebSocketService {
       this.ws.onopen = (event) => {
         console.log('WebSocket connected to room:', roomId);
         this.reconnectAttempts = 0;
+        // Unacknowledged bids are resent once the server has caught this connection up
+        this.resuming = this.pendingBids.size > 0;
         this.emit('connected', { roomId, userId, username });
       };
 
@@ -75,6 +94,14 @@ class AuctionWebSocketService {
   handleMessage(message) {
     const { type } = message;
 
+    // Remember the room offset, and the epoch it belongs to, so a reconnect only replays missed events
+    if (typeof message.seq === 'number') {
+      this.lastSeq = message.seq;
+      this.epoch = message.epoch || null;
+    }
+
+    this.trackBids(message);
+
     switch (type) {
       case 'connection_confirmed':
         this.emit('connectionConfirmed', message);
@@ -116,6 +143,10 @@ class AuctionWebSocketService {
         this.emit('roomState', message);
         break;
 
+      case 'resume_complete':
+        this.emit('resumeComplete', message);
+        break;
+
       case 'error':
         this.emit('error', message);
         break;
@@ -126,8 +157,53 @@ class AuctionWebSocketService {
     }
   }
 
-  // Send a bid
-  placeBid(amount) {
+  // Follow the live auction and settle pending bids as their outcomes arrive
+  trackBids(message) {
+    switch (message.type) {
+      case 'auction_started':
+        this.currentAuctionId = message.auction ? message.auction.id : null;
+        break;
+
+      case 'auction_ended':
+        this.currentAuctionId = null;
+        break;
+
+      case 'room_state':
+        this.currentAuctionId = message.current_auction ? message.current_auction.id : null;
+        break;
+
+      case 'bid_confirmed':
+      case 'bid_error':
+        if (message.bid_id) {
+          this.pendingBids.delete(message.bid_id);
+        }
+        break;
+
+      default:
+        break;
+    }
+
+    // A resume ends with resume_complete, or with room_state when the server fell back to a snapshot
+    if (this.resuming && (message.type === 'resume_complete' || message.type === 'room_state')) {
+      this.resuming = false;
+      this.resendPendingBids();
+    }
+  }
+
+  // Resend bids whose outcome was lost, with their original bid_id so the server answers instead of re-applying
+  resendPendingBids() {
+    this.pendingBids.forEach((pending, bidId) => {
+      // A bid only makes sense for the auction it was placed in
+      if (!this.currentAuctionId || pending.auctionId !== this.currentAuctionId) {
+        this.pendingBids.delete(bidId);
+        return;
+      }
+      this.send(pending.message);
+    });
+  }
+
+  // Send a bid; pass the same bidId when retrying so the server can deduplicate it
+  placeBid(amount, bidId = null) {
     if (!this.isConnected()) {
       console.error('WebSocket not connected');
       return false;
@@ -136,11 +212,13 @@ class AuctionWebSocketService {
     const message = {
       type: 'place_bid',
       amount: amount,
+      bid_id: bidId || `bid_${Date.now().toString(36)}_${Math.random().toString(36).slice(2, 10)}`,
       timestamp: new Date().toISOString()
     };
 
+    this.pendingBids.set(message.bid_id, { message, auctionId: this.currentAuctionId });
     this.send(message);
-    return true;
+    return message.bid_id;
   }
 
   // Get current room status
@@ -206,6 +284,11 @@ class AuctionWebSocketService {
     this.userId = null;
     this.username = null;
     this.reconnectAttempts = 0;
+    this.lastSeq = null;
+    this.epoch = null;
+    this.pendingBids.clear();
+    this.currentAuctionId = null;
+    this.resuming = false;
   }
 
   // Event listener management
@@ -0,0 +1,45 @@
+import sys
+from pathlib import Path
+
+import mongomock
+import pytest
+
+# The backend imports its modules as top-level packages (services, routes, models)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+class AsyncCursor:
+    """Awaitable front for a mongomock cursor, standing in for a Motor one"""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def limit(self, limit: int):
+        self.cursor = self.cursor.limit(limit)
+        return self
+
+    async def to_list(self, length=None):
+        return list(self.cursor)
+
+class AsyncCollection:
+    """Awaitable front for a mongomock collection, standing in for a Motor one"""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.name = collection.name
+
+    def find(self, *args, **kwargs):
+        return AsyncCursor(self.collection.find(*args, **kwargs))
+
+    def __getattr__(self, name):
+        method = getattr(self.collection, name)
+
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+
+        return call
+
+@pytest.fixture
+def mongo_db():
+    """Collections of a fresh in-memory database, by name"""
+    database = mongomock.MongoClient().db
+    return lambda name: AsyncCollection(database[name])
@@ -0,0 +1,94 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from models.auction import AuctionRoom
+from routes import auctions
+from services.backplane import LocalBackplane
+from services.state_store import InMemoryStateStore
+from services.websocket_manager import ConnectionManager
+
+def wait_for(condition, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+@pytest.fixture
+def manager(monkeypatch) -> ConnectionManager:
+    manager = ConnectionManager(LocalBackplane(), InMemoryStateStore())
+    manager.leave_grace = 0
+    monkeypatch.setattr(auctions, "manager", manager)
+    return manager
+
+@pytest.fixture
+def room(manager) -> AuctionRoom:
+    room = AuctionRoom(name="Test room", description="Reconnects", created_by="test")
+    manager.store.rooms[room.id] = room
+    return room
+
+def test_reconnect_ends_superseded_handler(monkeypatch, manager, room):
+    finished = []
+    receive_messages = auctions.receive_messages
+
+    async def tracked_receive_messages(websocket, user_id, handler):
+        try:
+            await receive_messages(websocket, user_id, handler)
+        finally:
+            finished.append(websocket)
+
+    monkeypatch.setattr(auctions, "receive_messages", tracked_receive_messages)
+    app = FastAPI()
+    app.include_router(auctions.router, prefix="/api")
+    url = f"/api/auctions/ws/{room.id}?user_id=user-1&username=fan"
+
+    with TestClient(app) as client:
+        with client.websocket_connect(url) as old:
+            assert [old.receive_json()["type"] for _ in range(3)] == [
+                "connection_confirmed", "user_joined", "room_state"
+            ]
+
+            with client.websocket_connect(url) as new:
+                assert new.receive_json()["type"] == "connection_confirmed"
+                with pytest.raises(WebSocketDisconnect) as closed:
+                    old.receive_json()
+                assert closed.value.code == 4009
+
+                # A message already in flight on the old socket is the last one it handles
+                old.send_json({"type": "ping"})
+                assert wait_for(lambda: len(finished) == 1)
+
+                new.send_json({"type": "ping"})
+                received = []
+                while received.count("pong") < 2:
+                    received.append(new.receive_json()["type"])
+                assert "error" not in received
+                assert len(finished) == 1
+
+                # The superseded socket's cleanup left the new registration alone
+                assert "user-1" in manager.active_connections
+                assert "user-1" in manager.room_participants[room.id]
+
+def test_queue_only_changes_where_the_auction_starts(manager, room):
+    room.auction_queue = [player["id"] for player in auctions.CRICKET_PLAYERS[:2]]
+    first, second = room.auction_queue
+
+    # Another live worker holds the room: the start is forwarded and the queue left alone
+    manager.ownership.members["worker_other"] = time.monotonic() + 60
+    manager.ownership.member_rooms["worker_other"] = {room.id}
+    response = asyncio.run(auctions.start_next_auction(room.id))
+    assert response["auction"] is None
+    assert manager.store.rooms[room.id].auction_queue == [first, second]
+
+    manager.ownership.member_rooms["worker_other"] = set()
+    response = asyncio.run(auctions.start_next_auction(room.id))
+    assert response["auction"]["player_id"] == first
+    stored = manager.store.rooms[room.id]
+    assert stored.auction_queue == [second]
+    assert stored.current_auction == response["auction"]["id"]
@@ -0,0 +1,42 @@
+import asyncio
+
+from services.bids import place_player_bid, rejected_bid
+
+# mongomock re-reads an updated document through the guard it no longer matches, so
+# these check the stored player rather than what the guarded update returned
+
+def test_first_bid_applies_to_null_or_missing_current_bid(mongo_db):
+    async def scenario():
+        players = mongo_db("players")
+        await players.insert_many([{"id": "null-bid", "current_bid": None}, {"id": "no-bid"}])
+
+        for player_id in ("null-bid", "no-bid"):
+            await place_player_bid(players, player_id, 1_000_000, "Team A")
+            stored = await players.find_one({"id": player_id})
+            assert (stored["current_bid"], stored["bidders"]) == (1_000_000, ["Team A"])
+
+    asyncio.run(scenario())
+
+def test_bid_applies_only_above_the_stored_one(mongo_db):
+    async def scenario():
+        players = mongo_db("players")
+        await players.insert_one({"id": "player-1", "current_bid": 2_000_000, "bidders": ["Team A"]})
+
+        await place_player_bid(players, "player-1", 2_000_000, "Team B")
+        stored = await players.find_one({"id": "player-1"})
+        assert (stored["current_bid"], stored["bidders"]) == (2_000_000, ["Team A"])
+        error = await rejected_bid(players, "player-1")
+        assert error.detail == "Bid must be higher than current bid of 2000000"
+
+        await place_player_bid(players, "player-1", 2_500_000, "Team B")
+        stored = await players.find_one({"id": "player-1"})
+        assert (stored["current_bid"], stored["bidders"]) == (2_500_000, ["Team A", "Team B"])
+
+    asyncio.run(scenario())
+
+def test_rejected_bid_on_unknown_player_is_not_found(mongo_db):
+    async def scenario():
+        error = await rejected_bid(mongo_db("players"), "missing")
+        assert error.status_code == 404
+
+    asyncio.run(scenario())
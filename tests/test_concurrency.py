@@ -0,0 +1,211 @@
+import asyncio
+import json
+
+import pytest
+
+from models.auction import PlayerAuction
+from models.user import Bid
+from services import websocket_manager
+from services.backplane import LocalBackplane
+from services.idempotency import IdempotencyTable
+from services.rosters import add_roster_player, rejected_roster_add
+from services.state_store import InMemoryStateStore
+from services.websocket_manager import ConnectionManager
+
+@pytest.fixture
+def manager(monkeypatch) -> ConnectionManager:
+    manager = ConnectionManager(LocalBackplane(), InMemoryStateStore())
+
+    async def save_result(result, bids):
+        manager.saved_results.append(result)
+
+    manager.saved_results = []
+    monkeypatch.setattr(manager, "save_result", save_result)
+    return manager
+
+def live_auction(room_id: str = "room-1", **fields) -> PlayerAuction:
+    return PlayerAuction(
+        room_id=room_id, player_id="player-1", player_name="Player One",
+        player_team="Team", player_position="Batsman", player_image="", **fields
+    )
+
+def bid(auction: PlayerAuction, user_id: str, amount: int) -> Bid:
+    return Bid(auction_id=auction.id, player_id=auction.player_id, user_id=user_id, username=user_id, amount=amount)
+
+def test_debit_never_goes_negative():
+    async def scenario():
+        store = InMemoryStateStore()
+        assert await store.debit_budget("nobody", 1) is None
+        assert "nobody" not in store.budgets
+
+        store.budgets["user-1"] = 10
+        assert await store.debit_budget("user-1", 11) is None
+        assert await store.debit_budget("user-1", 10) == 0
+        assert store.budgets["user-1"] == 0
+
+    asyncio.run(scenario())
+
+def test_winner_who_cannot_pay_falls_back_to_next_bidder(manager):
+    auction = live_auction(current_bid=5_000_000, current_winner="user-2", current_winner_username="user-2")
+    manager.active_auctions[auction.room_id] = auction
+    manager.bid_history[auction.id] = [
+        bid(auction, "user-1", 3_000_000), bid(auction, "user-2", 5_000_000)
+    ]
+    # user-2 spent their budget in another room since bidding
+    manager.store.budgets.update({"user-1": 10_000_000, "user-2": 4_000_000})
+
+    asyncio.run(manager.end_auction(auction.room_id))
+
+    result = manager.saved_results[0]
+    assert (result.winner_user_id, result.winning_bid) == ("user-1", 3_000_000)
+    assert manager.store.budgets == {"user-1": 7_000_000, "user-2": 4_000_000}
+
+def test_unsold_when_no_bidder_can_pay(manager):
+    auction = live_auction(current_bid=5_000_000, current_winner="user-2", current_winner_username="user-2")
+    manager.active_auctions[auction.room_id] = auction
+    manager.bid_history[auction.id] = [bid(auction, "user-2", 5_000_000)]
+    manager.store.budgets["user-2"] = 1_000_000
+
+    asyncio.run(manager.end_auction(auction.room_id))
+
+    assert manager.saved_results[0].winner_user_id is None
+    assert manager.store.budgets == {"user-2": 1_000_000}
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, payload: str):
+        self.sent.append(json.loads(payload))
+
+async def running_auction(manager: ConnectionManager, room_id: str = "room-1") -> PlayerAuction:
+    """A live auction this worker holds the lease on, with no timer"""
+    auction = await manager.store.create_auction(live_auction(room_id))
+    manager.active_auctions[room_id] = auction
+    manager.bid_outcomes[auction.id] = IdempotencyTable()
+    assert await manager.ownership.acquire(room_id)
+    return auction
+
+def connect(manager: ConnectionManager, user_id: str) -> FakeSocket:
+    socket = manager.active_connections[user_id] = FakeSocket()
+    manager.usernames[user_id] = user_id
+    return socket
+
+def test_stale_version_loses_compare_and_set():
+    async def scenario():
+        store = InMemoryStateStore()
+        auction = await store.create_auction(live_auction())
+        assert await store.compare_and_set_auction(auction.room_id, 1, {"current_bid": 2_000_000})
+        assert await store.compare_and_set_auction(auction.room_id, 1, {"current_bid": 3_000_000}) is None
+
+        stored = await store.get_auction(auction.room_id)
+        assert (stored.version, stored.current_bid) == (2, 2_000_000)
+
+    asyncio.run(scenario())
+
+def test_bid_revalidates_after_losing_a_race(manager):
+    async def scenario():
+        auction = await running_auction(manager)
+        manager.store.budgets["user-1"] = 50_000_000
+        # A timer tick lands in the store after this worker read the auction
+        await manager.store.compare_and_set_auction(auction.room_id, auction.version, {"time_remaining": 250})
+
+        success, response = await manager.apply_bid("user-1", "user-1", auction.room_id, 2_000_000, "bid-1")
+        assert success, response
+        stored = await manager.store.get_auction(auction.room_id)
+        assert (stored.version, stored.total_bids, stored.time_remaining) == (3, 1, 250)
+
+        # A concurrent higher bid lands the same way: the retry rejects the now too-low bid
+        await manager.store.compare_and_set_auction(
+            auction.room_id, stored.version, {"current_bid": 5_000_000, "minimum_next_bid": 5_500_000}
+        )
+        success, response = await manager.apply_bid("user-1", "user-1", auction.room_id, 3_000_000, "bid-2")
+        assert not success
+        assert response["message"] == "Minimum bid is £5,500,000"
+
+    asyncio.run(scenario())
+
+def test_duplicate_bid_id_is_answered_not_reapplied(manager):
+    async def scenario():
+        auction = await running_auction(manager)
+        manager.store.budgets["user-1"] = 50_000_000
+        socket = connect(manager, "user-1")
+
+        assert await manager.place_bid("user-1", "user-1", auction.room_id, 2_000_000, "bid-1")
+        assert await manager.place_bid("user-1", "user-1", auction.room_id, 2_000_000, "bid-1")
+
+        confirmations = [message for message in socket.sent if message["type"] == "bid_confirmed"]
+        assert [message.get("duplicate", False) for message in confirmations] == [False, True]
+        stored = await manager.store.get_auction(auction.room_id)
+        assert stored.total_bids == 1
+        assert len(manager.bid_history[auction.id]) == 1
+
+    asyncio.run(scenario())
+
+def test_resume_past_the_replay_buffer_falls_back_to_a_snapshot(monkeypatch, manager):
+    monkeypatch.setattr(websocket_manager, "REPLAY_BUFFER_SIZE", 4)
+
+    async def scenario():
+        room_id = "room-1"
+        socket = connect(manager, "user-1")
+        await manager.add_participant("user-1", room_id)
+        for number in range(10):
+            await manager.broadcast_to_room({"type": "note", "number": number}, room_id)
+        epoch = manager.room_epochs[room_id]
+
+        # Within the buffer: only the missed events, then resume_complete
+        socket.sent.clear()
+        assert await manager.resume_room("user-1", room_id, 8, epoch)
+        assert [message["type"] for message in socket.sent] == ["note", "note", "resume_complete"]
+        assert [message["seq"] for message in socket.sent[:2]] == [9, 10]
+
+        # Seq 2 was evicted: the client gets a snapshot instead of a partial replay
+        socket.sent.clear()
+        assert not await manager.resume_room("user-1", room_id, 1, epoch)
+        assert [message["type"] for message in socket.sent] == ["room_state"]
+        assert socket.sent[0]["seq"] == 10
+
+        # A seq from another epoch can't be replayed either
+        socket.sent.clear()
+        assert not await manager.resume_room("user-1", room_id, 8, "stale")
+        assert [message["type"] for message in socket.sent] == ["room_state"]
+
+    asyncio.run(scenario())
+
+def team(**fields) -> dict:
+    return {"id": "team-1", "players": [], "max_players": 2, "budget": 10_000_000, "spent": 0,
+            "remaining": 10_000_000, **fields}
+
+def purchase(player_id: str, price: int) -> dict:
+    return {"player_id": player_id, "purchase_price": price}
+
+# mongomock re-reads an updated document through the guard it no longer matches, so
+# these check the stored team rather than what the guarded update returned
+
+def test_roster_add_refused_when_team_is_full(mongo_db):
+    async def scenario():
+        teams = mongo_db("teams")
+        await teams.insert_one(team(players=[purchase("p1", 1), purchase("p2", 1)], spent=2))
+
+        await add_roster_player(teams, "team-1", purchase("p3", 1))
+        assert len((await teams.find_one({"id": "team-1"}))["players"]) == 2
+        error = await rejected_roster_add(teams, "team-1", purchase("p3", 1))
+        assert error.detail == "Team is full"
+
+    asyncio.run(scenario())
+
+def test_roster_add_refused_over_budget(mongo_db):
+    async def scenario():
+        teams = mongo_db("teams")
+        await teams.insert_one(team(spent=8_000_000, remaining=2_000_000))
+
+        await add_roster_player(teams, "team-1", purchase("p1", 3_000_000))
+        assert (await teams.find_one({"id": "team-1"}))["spent"] == 8_000_000
+        error = await rejected_roster_add(teams, "team-1", purchase("p1", 3_000_000))
+        assert error.detail == "Insufficient budget"
+
+        await add_roster_player(teams, "team-1", purchase("p1", 2_000_000))
+        stored = await teams.find_one({"id": "team-1"})
+        assert (stored["spent"], stored["remaining"]) == (10_000_000, 0)
+
+    asyncio.run(scenario())
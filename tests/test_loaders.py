@@ -0,0 +1,51 @@
+import asyncio
+
+from services.backplane import LocalBackplane
+from services.cache import CACHE_CHANNEL, ReadCache
+from services.loaders import DataLoader
+
+def test_loader_serves_cached_documents_until_invalidated(mongo_db):
+    async def scenario():
+        teams = mongo_db("teams")
+        await teams.insert_many([{"id": "team-1", "name": "Alpha"}, {"id": "team-2", "name": "Beta"}])
+        cache = ReadCache()
+
+        first = DataLoader(teams, cache=cache)
+        assert [team["name"] for team in await first.load_many(["team-1", "team-2"])] == ["Alpha", "Beta"]
+        assert first.queries == 1
+
+        # A later request's loader finds both in the document tier
+        second = DataLoader(teams, cache=cache)
+        assert [team["name"] for team in await second.load_many(["team-1", "team-2"])] == ["Alpha", "Beta"]
+        assert second.queries == 0
+        assert (await cache.get_document(teams, "team-1"))["name"] == "Alpha"
+
+        await teams.update_one({"id": "team-1"}, {"$set": {"name": "Gamma"}})
+        await cache.invalidate("teams", "team-1")
+        third = DataLoader(teams, cache=cache)
+        assert [team["name"] for team in await third.load_many(["team-1", "team-2"])] == ["Gamma", "Beta"]
+        assert third.queries == 1
+
+    asyncio.run(scenario())
+
+def test_batch_invalidation_reaches_other_workers_in_one_message(mongo_db):
+    async def scenario():
+        players = mongo_db("players")
+        await players.insert_many([{"id": "player-1"}, {"id": "player-2"}])
+        backplane = LocalBackplane()
+        here, there = ReadCache(), ReadCache()
+        await here.start(backplane, "worker_a")
+        await there.start(backplane, "worker_b")
+        messages = []
+
+        async def record(channel, message):
+            messages.append(message)
+        await backplane.subscribe(CACHE_CHANNEL, record)
+
+        for player_id in ("player-1", "player-2"):
+            await there.get_document(players, player_id)
+        await here.invalidate_many("players", ["player-1", "player-2"])
+        assert len(messages) == 1
+        assert there.cached_documents("players", ["player-1", "player-2"]) == {}
+
+    asyncio.run(scenario())
@@ -0,0 +1,23 @@
+import asyncio
+
+from services.backplane import LocalBackplane
+from services.player_search import PlayerSearchIndex
+
+def test_writes_reach_every_worker_index():
+    async def scenario():
+        backplane = LocalBackplane()
+        here, there = PlayerSearchIndex(), PlayerSearchIndex()
+        await here.start(backplane, "worker_a")
+        await there.start(backplane, "worker_b")
+
+        await here.index({"id": "player-1", "name": "Virat Kohli", "team": "RCB", "role": "Batsman", "stats": {}})
+        assert [player["id"] for player in there.search("kohli")] == ["player-1"]
+        assert "stats" not in there.players["player-1"]
+
+        await here.index({"id": "player-1", "name": "Virat Kohli", "team": "India", "role": "Batsman"})
+        assert there.search("rcb") == []
+
+        await there.unindex("player-1")
+        assert here.search("kohli") == []
+
+    asyncio.run(scenario())
@@ -0,0 +1,38 @@
+import asyncio
+
+from services.backplane import LocalBackplane
+from services.room_ownership import RoomOwnership
+from services.state_store import InMemoryStateStore
+
+def test_lease_is_exclusive_without_gossip():
+    async def scenario():
+        store = InMemoryStateStore()
+        # Separate backplanes: neither worker hears the other's heartbeats
+        first = RoomOwnership("worker_a", LocalBackplane(), store)
+        second = RoomOwnership("worker_b", LocalBackplane(), store)
+
+        assert await first.acquire("room-1")
+        assert not await second.acquire("room-1")
+        assert not second.holds("room-1")
+
+        await first.release("room-1")
+        assert await second.acquire("room-1")
+
+        # The first worker renews and finds its lease taken
+        first.held_rooms.add("room-1")
+        assert await first.renew_leases()
+        assert not first.holds("room-1")
+
+    asyncio.run(scenario())
+
+def test_expired_lease_can_be_taken_over():
+    async def scenario():
+        store = InMemoryStateStore()
+        first = RoomOwnership("worker_a", LocalBackplane(), store, lease_ttl=0.01)
+        second = RoomOwnership("worker_b", LocalBackplane(), store)
+
+        assert await first.acquire("room-1")
+        await asyncio.sleep(0.02)
+        assert await second.acquire("room-1")
+
+    asyncio.run(scenario())
@@ -0,0 +1,41 @@
+from collections import Counter
+
+import server
+
+def served_routes():
+    return [(method, route.path) for route in server.app.routes for method in getattr(route, "methods", None) or ()]
+
+def test_no_route_is_registered_twice():
+    duplicates = [route for route, count in Counter(served_routes()).items() if count > 1]
+    assert duplicates == []
+
+def test_guarded_writes_are_served():
+    routes = set(served_routes())
+    for route in [
+        ("POST", "/api/players/{player_id}/bid"),
+        ("POST", "/api/teams/{team_id}/players"),
+        ("DELETE", "/api/teams/{team_id}/players/{player_id}"),
+        ("POST", "/api/leagues/{league_id}/join"),
+        ("POST", "/api/leagues/join-by-code"),
+        ("DELETE", "/api/leagues/{league_id}/leave"),
+        ("POST", "/api/users/{user_id}/teams/{team_id}"),
+    ]:
+        assert route in routes, route
+
+def test_unauthenticated_crud_is_not_served():
+    routes = set(served_routes())
+    for route in [
+        ("POST", "/api/players/"),
+        ("PUT", "/api/players/{player_id}"),
+        ("DELETE", "/api/players/{player_id}"),
+        ("POST", "/api/teams/"),
+        ("PUT", "/api/teams/{team_id}"),
+        ("DELETE", "/api/teams/{team_id}"),
+        ("POST", "/api/leagues/"),
+        ("PUT", "/api/leagues/{league_id}"),
+        ("DELETE", "/api/leagues/{league_id}"),
+        ("POST", "/api/users/"),
+        ("PUT", "/api/users/{user_id}"),
+        ("DELETE", "/api/users/{user_id}"),
+    ]:
+        assert route not in routes, route
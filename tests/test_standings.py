@@ -0,0 +1,28 @@
+import asyncio
+
+from services.scoring import scoring_engine
+from services.standings import Standings
+
+def test_persist_writes_only_users_whose_points_changed(mongo_db):
+    async def scenario():
+        users = mongo_db("users")
+        await users.insert_many([{"id": "user-1"}, {"id": "user-2"}])
+        standings = Standings(scoring_engine)
+        standings.users_collection = users
+        standings.standings_collection = mongo_db("standings")
+        standings.team_owners = {"team-1": "user-1", "team-2": "user-2"}
+
+        standings.fold({"team-1": 10.0, "team-2": 20.0})
+        await standings.persist()
+        assert (await users.find_one({"id": "user-1"}))["rank"] == 2
+        await users.update_one({"id": "user-2"}, {"$set": {"rank": None}})
+
+        # user-1 overtakes user-2, but only user-1's points changed
+        standings.fold({"team-1": 30.0})
+        await standings.persist()
+        assert (await users.find_one({"id": "user-1"}))["rank"] == 1
+        assert (await users.find_one({"id": "user-1"}))["points"] == 30.0
+        assert (await users.find_one({"id": "user-2"}))["rank"] is None
+        assert standings.user_position("user-2", 1)["rank"] == 2
+
+    asyncio.run(scenario())